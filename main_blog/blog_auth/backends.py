@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import AllowAllUsersModelBackend
+
+UserModel = get_user_model()
+
+
+class ProfileModelBackend(AllowAllUsersModelBackend):
+    """
+    Authentication backend which loads the user together with his
+    BlogProfile (one query with join), because most pages need the profile
+    (e.g. User.check_is_adult). Inactive users can log in, they are sent
+    to create their profile. With blog_auth.middleware.CachedAuthenticationMiddleware
+    the user loaded here is kept in the cache between requests.
+    Set in settings: AUTHENTICATION_BACKENDS = ['blog_auth.backends.ProfileModelBackend']
+    """
+
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related('user_profile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,96 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.crypto import constant_time_compare
+
+USER_KEY = 'blog_auth:user:%s:%s'
+
+
+def _fields(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _user_fields(user_model):
+    """
+    The password hash is not cached. It is deferred on users built from
+    snapshots, so their save() leaves it alone and reading it loads it.
+    """
+    return [name for name in _fields(user_model) if name != 'password']
+
+
+def _models():
+    user_model = get_user_model()
+    return user_model, user_model._meta.get_field('user_profile').related_model
+
+
+def _schema():
+    """
+    Hash of the snapshot fields, snapshots of an older schema aren't read.
+    """
+    user_model, profile_model = _models()
+    return md5(','.join(_user_fields(user_model) + _fields(profile_model)).encode()).hexdigest()[:8]
+
+
+def user_cache_key(user_pk):
+    return USER_KEY % (_schema(), user_pk)
+
+
+def invalidate_users(user_pks, using=None):
+    """
+    Remove cached snapshots, called on every save of users and profiles and
+    after UPDATEs changing them. Keys are deleted when the transaction of
+    using commits (at once outside of one), so no request caches the rows
+    before the change is visible, and a rollback keeps them.
+    """
+    keys = [user_cache_key(user_pk) for user_pk in user_pks]
+    transaction.on_commit(lambda: cache.delete_many(keys), using=using)
+
+
+def user_snapshot(user):
+    """
+    Compact snapshot of the user and the profile: the auth hash and tuples
+    of the field values, all of them but the password.
+    """
+    user_model, profile_model = _models()
+    profile = user.user_profile
+    return (
+        user.get_session_auth_hash(),
+        user._state.db,
+        tuple(getattr(user, name) for name in _user_fields(user_model)),
+        None if profile is None else tuple(getattr(profile, name) for name in _fields(profile_model))
+    )
+
+
+def user_from_snapshot(snapshot):
+    user_model, profile_model = _models()
+    _, db, user_values, profile_values = snapshot
+    user = user_model.from_db(db, _user_fields(user_model), user_values)
+    if profile_values is not None:
+        user.user_profile = profile_model.from_db(db, _fields(profile_model), profile_values)
+    return user
+
+
+def get_cached_user(request):
+    """
+    Like django.contrib.auth.get_user, but the user with the profile comes
+    from the cache when its auth hash matches the session (a changed
+    password logs other sessions out as before). A miss loads and checks
+    the user the usual way and caches it.
+    """
+    session = request.session
+    user_pk = session.get(SESSION_KEY)
+    session_hash = session.get(HASH_SESSION_KEY)
+    if user_pk is None or session_hash is None or session.get(BACKEND_SESSION_KEY) not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+    key = user_cache_key(user_pk)
+    snapshot = cache.get(key)
+    if snapshot is not None and constant_time_compare(snapshot[0], session_hash):
+        return user_from_snapshot(snapshot)
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(key, user_snapshot(user), getattr(settings, 'USER_CACHE_TIMEOUT', 60 * 60))
+    return user
@@ -1,27 +1,134 @@
 from email.message import EmailMessage
+from queue import Empty, LifoQueue
+from threading import BoundedSemaphore
 from typing import List
-from smtplib import SMTP_SSL
+from smtplib import (
+    SMTP_SSL, SMTPDataError, SMTPRecipientsRefused, SMTPSenderRefused, SMTPServerDisconnected
+)
 
-from main_blog.settings import USER_EMAIL, PASSWORD_EMAIL 
+from main_blog.settings import USER_EMAIL, PASSWORD_EMAIL
 
-def send_email(mail_from:str, mail_to:List[str], mail_subject:str, message:str):
+SMTP_HOST = 'smtp.gmail.com'
+SMTP_PORT = 465
+
+def create_message(mail_from:str, mail_to:List[str], mail_subject:str, message:str):
     """
-    Tool send email if it succeeds return True else False.
+    Tool build email message ready to send.
     """
     msg = EmailMessage()
     msg.set_content(message)
     msg['Subject'] = mail_subject
     msg['From'] = mail_from
     msg['To'] = ', '.join(mail_to)
-    try:
-        serwer = SMTP_SSL('smtp.gmail.com', 465)
-        serwer.ehlo()
-        serwer.login(user=USER_EMAIL, password=PASSWORD_EMAIL)
-        serwer.send_message(msg)
-        serwer.quit()
-    except Exception:
-        return False
-    else:
-        return True
+    return msg
+
+def open_connection():
+    """
+    Tool open authenticated SMTP connection.
+    It can be used to send many messages, caller must close it.
+    """
+    serwer = SMTP_SSL(SMTP_HOST, SMTP_PORT)
+    serwer.ehlo()
+    serwer.login(user=USER_EMAIL, password=PASSWORD_EMAIL)
+    return serwer
+
+class SMTPConnectionPool:
+    """
+    Keeps up to size authenticated SMTP connections open and reuses them,
+    so TLS handshake and login are paid once per connection, not per message.
+    Connections are opened lazily by connection_factory (default open_connection).
+    """
+    # The server rejected this one message, the connection can still be used.
+    MESSAGE_ERRORS = (SMTPRecipientsRefused, SMTPSenderRefused, SMTPDataError)
+
+    def __init__(self, size=2, connection_factory=None):
+        self.size = size
+        self.connection_factory = connection_factory
+        self._idle = LifoQueue()
+        self._slots = BoundedSemaphore(size)
+
+    def _open(self):
+        factory = self.connection_factory or open_connection
+        return factory()
+
+    def _close(self, serwer):
+        if serwer is None:
+            return
+        try:
+            serwer.quit()
+        except Exception:
+            serwer.close()
 
+    def _checkout(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            return None
 
+    def _checkin(self, serwer):
+        if serwer is not None:
+            self._idle.put(serwer)
+        self._slots.release()
+
+    def send_messages(self, messages):
+        """
+        Send all messages over one pooled connection.
+        Return list with None for sent message or exception for failed one.
+        """
+        results = []
+        serwer = self._checkout()
+        try:
+            for message in messages:
+                try:
+                    if serwer is None:
+                        serwer = self._open()
+                    try:
+                        serwer.send_message(message)
+                    except (SMTPServerDisconnected, ConnectionError):
+                        # Connection was dropped (e.g. server idle timeout),
+                        # try once more over a new one.
+                        self._close(serwer)
+                        serwer = None
+                        serwer = self._open()
+                        serwer.send_message(message)
+                except self.MESSAGE_ERRORS as e:
+                    results.append(e)
+                except Exception as e:
+                    self._close(serwer)
+                    serwer = None
+                    results.append(e)
+                else:
+                    results.append(None)
+        finally:
+            self._checkin(serwer)
+        return results
+
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except Empty:
+                return
+
+_default_pool = None
+
+def get_connection_pool():
+    """
+    Tool return connection pool shared by the process.
+    """
+    global _default_pool
+    if _default_pool is None:
+        from django.conf import settings
+        _default_pool = SMTPConnectionPool(size=getattr(settings, 'EMAIL_POOL_SIZE', 2))
+    return _default_pool
+
+def send_email(mail_from:str, mail_to:List[str], mail_subject:str, message:str):
+    """
+    Tool send email if it succeeds return True else False.
+    Connection is taken from the shared pool.
+    """
+    msg = create_message(mail_from, mail_to, mail_subject, message)
+    error, = get_connection_pool().send_messages([msg])
+    return error is None
@@ -7,7 +7,8 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 
-from .models import BlogProfile, User
+from .countries import COUNTRIES
+from .models import DEFAULT_COUNTRY, BlogProfile, User
 from .email_tool import send_email
 
 class SignUpForm(UserCreationForm):
@@ -73,11 +74,24 @@ class SignUpForm(UserCreationForm):
             user.save()
         return user
 
+def country_choices():
+    """
+    Choices are resolved when the select is rendered or validated, so the
+    form doesn't copy the table of countries for every instance.
+    """
+    return COUNTRIES
+
 class CreateProfileForm(forms.ModelForm):
     birth_year_choices = (str(year) for year in range(1930, datetime.now().year - 3 ))
     date_birth = forms.DateField(
         widget=forms.SelectDateWidget(years=list(birth_year_choices))
     )
+    country = forms.ChoiceField(
+        choices=country_choices,
+        initial=DEFAULT_COUNTRY,
+        widget=forms.Select,
+        help_text=_('Enter your country.')
+    )
     class Meta:
         model = BlogProfile
         exclude = ['date_birth', 'number_article']
@@ -0,0 +1,57 @@
+import os
+import unicodedata
+
+from django.core.management.base import BaseCommand, CommandError
+
+import blog_auth
+
+COUNTRIES_MODULE = os.path.join(os.path.dirname(blog_auth.__file__), 'countries.py')
+
+
+def render_countries(countries, version):
+    """
+    Source of the countries module: (alpha_2, name) pairs sorted by name,
+    ignoring accents ("Åland Islands" goes before "Albania").
+    """
+    pairs = sorted(
+        ((country.alpha_2, country.name) for country in countries),
+        key=lambda pair: unicodedata.normalize('NFKD', pair[1]).encode('ascii', 'ignore').lower()
+    )
+    lines = [
+        f'# Generated by "manage.py generate_countries" from pycountry {version}, do not edit.',
+        '# Imported by blog_auth.models instead of pycountry, which loads its whole',
+        '# ISO 3166 database at import time.',
+        'COUNTRIES = (',
+    ]
+    lines.extend(f'    ({alpha_2!r}, {name!r}),' for alpha_2, name in pairs)
+    lines.append(')')
+    return '\n'.join(lines) + '\n'
+
+
+class Command(BaseCommand):
+    help = 'Write blog_auth/countries.py, the country choices of BlogProfile, from pycountry.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=COUNTRIES_MODULE, help='Path of the generated module.')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only check that the module is up to date with the installed pycountry.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            import pycountry
+        except ImportError:
+            raise CommandError('pycountry is needed to generate the countries module.')
+        source = render_countries(pycountry.countries, getattr(pycountry, '__version__', 'unknown'))
+        if options['check']:
+            with open(options['output'], encoding='utf-8') as module:
+                current = module.read()
+            # The version line may differ, the table must not.
+            if current.split('\n', 1)[1] != source.split('\n', 1)[1]:
+                raise CommandError(f"{options['output']} is out of date, run generate_countries.")
+            self.stdout.write('Countries module is up to date.')
+            return
+        with open(options['output'], 'w', encoding='utf-8') as module:
+            module.write(source)
+        self.stdout.write(f"Written {len(pycountry.countries)} countries to {options['output']}.")
@@ -0,0 +1,76 @@
+from time import sleep
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.timezone import timedelta
+
+from blog_auth import email_tool
+from blog_auth.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    help = 'Send emails waiting in the outbox, in batches over one SMTP connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=getattr(settings, 'OUTBOX_BATCH_SIZE', 50),
+            help='Number of emails sent over one connection.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5),
+            help='After this number of failed attempts the email is given up.'
+        )
+        parser.add_argument(
+            '--retry-delay', type=int, default=getattr(settings, 'OUTBOX_RETRY_DELAY', 60),
+            help='Seconds to the first retry, doubled after every next failure.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running and poll the outbox, instead of a single pass.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=5,
+            help='Seconds to wait when the outbox is empty (with --loop).'
+        )
+
+    def handle(self, *args, **options):
+        self.max_attempts = options['max_attempts']
+        self.retry_delay = timedelta(seconds=options['retry_delay'])
+        # Claimed emails are skipped by other workers until the lease expires.
+        self.lease = max(self.retry_delay, timedelta(minutes=5))
+        # One connection, kept open between batches and polls.
+        self.pool = email_tool.SMTPConnectionPool(size=1)
+        try:
+            while True:
+                sent, failed = 0, 0
+                while True:
+                    batch_sent, batch_failed = self.send_batch(options['batch_size'])
+                    sent, failed = sent + batch_sent, failed + batch_failed
+                    if batch_sent + batch_failed < options['batch_size']:
+                        break
+                if sent or failed:
+                    self.stdout.write(f'Sent: {sent}, failed: {failed}')
+                if not options['loop']:
+                    return
+                sleep(options['sleep'])
+        finally:
+            self.pool.close()
+
+    def send_batch(self, batch_size):
+        emails = OutboxEmail.objects.claim_due(batch_size=batch_size, lease=self.lease)
+        if not emails:
+            return 0, 0
+        results = self.pool.send_messages([email.as_message() for email in emails])
+        sent, failed = 0, 0
+        for email, error in zip(emails, results):
+            if error is None:
+                email.mark_sent()
+                sent += 1
+            else:
+                email.mark_failed(
+                    error=repr(error),
+                    max_attempts=self.max_attempts,
+                    retry_delay=self.retry_delay
+                )
+                failed += 1
+        return sent, failed
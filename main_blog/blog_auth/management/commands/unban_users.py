@@ -0,0 +1,32 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+
+from blog_auth.models import User
+
+
+class Command(BaseCommand):
+    help = 'Unban all users whose ban has ended and queue their emails (send them with send_outbox).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of users unbanned by one UPDATE.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running and check every --sleep seconds, instead of a single pass.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=60,
+            help='Seconds between checks (with --loop).'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            unbanned = User.objects.unban_expired(batch_size=options['batch_size'])
+            if unbanned or not options['loop']:
+                self.stdout.write(f'Unbanned users: {unbanned}')
+            if not options['loop']:
+                return
+            sleep(options['sleep'])
@@ -1,4 +1,8 @@
-from django.db import models
+from django.contrib.auth.models import UserManager
+from django.db import connection, models, transaction
+from django.utils.timezone import now
+
+from .cache import invalidate_users
 
 class BlogProfileManager(models.Manager):
     
@@ -12,4 +16,86 @@ class BlogProfileManager(models.Manager):
             **kwargs
         )
         profile.save()
-        return profile
\ No newline at end of file
+        return profile
+
+class BlogUserManager(UserManager):
+    UNBAN_SUBJECT = 'Unban'
+    UNBAN_MESSAGE = 'Your account has been unbanned.'
+
+    def unban_expired(self, batch_size=1000):
+        """
+        Unban all users whose ban has ended: one UPDATE and one bulk insert
+        of emails per batch, instead of a save per user.
+        Return the number of unbanned users.
+        """
+        from main_blog.settings import FROM_MAIL
+        from .models import OutboxEmail
+        current_time = now()
+        unbanned = 0
+        while True:
+            with transaction.atomic():
+                expired = self.get_queryset().filter(end_ban__lt=current_time).order_by('end_ban')
+                if connection.features.has_select_for_update_skip_locked:
+                    expired = expired.select_for_update(skip_locked=True)
+                users = list(expired.values_list('pk', 'email')[:batch_size])
+                if not users:
+                    return unbanned
+                self.get_queryset().filter(
+                    pk__in=[pk for pk, _ in users],
+                    end_ban__lt=current_time
+                ).update(is_ban=False, end_ban=None)
+                OutboxEmail.objects.enqueue_many(
+                    (FROM_MAIL, [email], self.UNBAN_SUBJECT, self.UNBAN_MESSAGE)
+                    for _, email in users
+                )
+            invalidate_users(pk for pk, _ in users)
+            unbanned += len(users)
+
+class OutboxEmailManager(models.Manager):
+
+    def enqueue(self, mail_from, mail_to, subject, message):
+        """
+        Store email in outbox. It is sent later by the send_outbox command.
+        """
+        email = self.model(
+            mail_from=mail_from,
+            mail_to=', '.join(mail_to),
+            subject=subject,
+            message=message
+        )
+        email.save()
+        return email
+
+    def enqueue_many(self, emails):
+        """
+        Store many emails with one INSERT. emails: iterable of
+        (mail_from, mail_to, subject, message) like enqueue arguments.
+        """
+        return self.bulk_create([
+            self.model(
+                mail_from=mail_from,
+                mail_to=', '.join(mail_to),
+                subject=subject,
+                message=message
+            ) for mail_from, mail_to, subject, message in emails
+        ])
+
+    def claim_due(self, batch_size, lease):
+        """
+        Return up to batch_size emails waiting to be sent and move their
+        next attempt by lease, so other workers don't take them meanwhile.
+        """
+        current_time = now()
+        with transaction.atomic():
+            due = self.get_queryset().filter(
+                sent_at__isnull=True,
+                failed=False,
+                next_attempt__lte=current_time
+            ).order_by('next_attempt', 'id')
+            if connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            emails = list(due[:batch_size])
+            self.get_queryset().filter(pk__in=[email.pk for email in emails]).update(
+                next_attempt=current_time + lease
+            )
+        return emails
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.5 on 2026-10-18 16:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_auth', '0002_auto_20190917_1645'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mail_from', models.CharField(max_length=100, verbose_name='from')),
+                ('mail_to', models.TextField(help_text='Recipients separated by comma.', verbose_name='to')),
+                ('subject', models.CharField(max_length=200, verbose_name='subject')),
+                ('message', models.TextField(verbose_name='message')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='created')),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now, verbose_name='next attempt')),
+                ('attempts', models.SmallIntegerField(default=0, verbose_name='number of attempts')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='sent at')),
+                ('failed', models.BooleanField(default=False, help_text='Set when all attempts to send the email failed.', verbose_name='failed')),
+                ('last_error', models.TextField(blank=True, verbose_name='last error')),
+            ],
+            options={
+                'verbose_name': 'outbox email',
+                'verbose_name_plural': 'outbox emails',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboxemail',
+            index=models.Index(fields=['sent_at', 'failed', 'next_attempt'], name='outbox_due_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.5 on 2026-10-18 16:45
+
+from datetime import date
+
+from django.db import migrations, models
+
+
+def fill_adult_since(apps, schema_editor):
+    BlogProfile = apps.get_model('blog_auth', 'BlogProfile')
+    for profile in BlogProfile.objects.only('id', 'date_birth').iterator():
+        date_birth = profile.date_birth
+        try:
+            profile.adult_since = date_birth.replace(year=date_birth.year + 18)
+        except ValueError:
+            profile.adult_since = date(year=date_birth.year + 18, month=3, day=1)
+        profile.save(update_fields=['adult_since'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_auth', '0003_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogprofile',
+            name='adult_since',
+            field=models.DateField(blank=True, editable=False, help_text='Day of the 18th birthday, set from date of birth.', null=True, verbose_name='adult since'),
+        ),
+        migrations.RunPython(fill_adult_since, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.5 on 2026-10-18 17:01
+
+import blog_auth.mangers
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_auth', '0004_blogprofile_adult_since'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', blog_auth.mangers.BlogUserManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(end_ban__isnull=False), fields=['end_ban'], name='user_end_ban_idx'),
+        ),
+    ]
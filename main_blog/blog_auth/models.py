@@ -1,16 +1,19 @@
 from datetime import date
 from functools import partial
-from pycountry import countries
 
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator, MinLengthValidator
-from django.utils.timezone import timedelta, now as date_now
+from django.utils.timezone import localdate, timedelta, now as date_now
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import AbstractUser
 
-from .email_tool import send_email
-from .mangers import BlogProfileManager
+from .countries import COUNTRIES
+from .email_tool import create_message
+from .mangers import BlogProfileManager, BlogUserManager, OutboxEmailManager
+
+ADULT_AGE = 18
+DEFAULT_COUNTRY = 'GB'
 
 class BlogProfile(models.Model):
     MALE_SEX = 'M'
@@ -19,7 +22,7 @@ class BlogProfile(models.Model):
         (MALE_SEX, 'Male'),
         (FEMALE_SEX, 'Female')
     ]
-    COUNTRY_CHOICES = list((country.alpha_2, country.name) for country in countries)
+    COUNTRY_CHOICES = COUNTRIES
     first_name_validator = RegexValidator(
         regex=r'^[a-zA-Z]*$',
         message=_('First name must contain only letters.')
@@ -51,7 +54,7 @@ class BlogProfile(models.Model):
         max_length=200,
         help_text=_('Enter your country.'),
         choices=COUNTRY_CHOICES,
-        default=COUNTRY_CHOICES[79]   
+        default=DEFAULT_COUNTRY
     )
     date_birth = models.DateField(
         verbose_name=_('date of birth'),
@@ -61,12 +64,35 @@ class BlogProfile(models.Model):
         verbose_name=_('Number of articles written by the user'),
         default=0
     )
+    adult_since = models.DateField(
+        verbose_name=_('adult since'),
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_('Day of the 18th birthday, set from date of birth.')
+    )
     objects = BlogProfileManager()
 
     class Meta:
         verbose_name = _('blogprofile')
         verbose_name_plural = _('blogprofiles')
 
+    @staticmethod
+    def get_adult_since(date_birth):
+        """
+        Return the 18th birthday. Who was born on 29 February
+        is adult on 1 March.
+        """
+        try:
+            return date_birth.replace(year=date_birth.year + ADULT_AGE)
+        except ValueError:
+            return date(year=date_birth.year + ADULT_AGE, month=3, day=1)
+
+    def save(self, *args, **kwargs):
+        if self.date_birth is not None:
+            self.adult_since = self.get_adult_since(self.date_birth)
+        super().save(*args, **kwargs)
+
 class User(AbstractUser):
     user_profile = models.ForeignKey(
         to=BlogProfile,
@@ -122,15 +148,24 @@ class User(AbstractUser):
     )
     first_name = None
     last_name = None
+    objects = BlogUserManager()
 
     class Meta(AbstractUser.Meta):
             swappable = 'AUTH_USER_MODEL'
+            indexes = [
+                # Only banned users have end_ban, the unban_users command scans them.
+                models.Index(
+                    fields=['end_ban'],
+                    name='user_end_ban_idx',
+                    condition=models.Q(end_ban__isnull=False)
+                ),
+            ]
 
     def get_full_name(self):
         """
         Return the first_name plus the last_name, with a space in between.
         """
-        full_name = '%s %s' % (self.user_profile.first_name, user.user_profile.last_name)
+        full_name = '%s %s' % (self.user_profile.first_name, self.user_profile.last_name)
         return full_name.strip()
 
     def get_short_name(self):
@@ -140,6 +175,8 @@ class User(AbstractUser):
     def unblocking_user(self):
         """
         If the lock time has expired, the method unblocks the user.
+        Bans are lifted in bulk by the unban_users command, this covers
+        a login between the end of the ban and the next run.
         """
         if self.end_ban is None:
             return      
@@ -180,31 +217,115 @@ class User(AbstractUser):
         return
 
     def send_email_user(self, subject:str, message:str, from_email:str=None, additional_email:list=[]):
-        """Send an email to this user."""
+        """Queue an email to this user in the outbox."""
         from main_blog.settings import FROM_MAIL
         if from_email is None:
             from_email = FROM_MAIL
         all_emails = [self.email] + additional_email
-        send_email(
+        OutboxEmail.objects.enqueue(
             mail_from=from_email,
             mail_to=all_emails,
-            mail_subject=subject,
+            subject=subject,
             message=message
         )
         return
 
     def check_is_adult(self):
-        date_birth = self.user_profile.date_birth
-        adult_age = date(
-            year=date_birth.year + 18,
-            month=date_birth.month,
-            day=date_birth.day
-        )
-        _date_now = date(
-            year=date_now().year,
-            month=date_now().month,
-            day=date_now().day
+        """
+        Return True if the user is at least 18 years old. The result is
+        kept on the instance, request.user asks the database at most once per request.
+        """
+        try:
+            return self._is_adult
+        except AttributeError:
+            pass
+        profile = self.user_profile
+        if profile is None:
+            self._is_adult = False
+            return self._is_adult
+        adult_since = profile.adult_since or profile.get_adult_since(profile.date_birth)
+        self._is_adult = adult_since <= localdate()
+        return self._is_adult
+
+
+class OutboxEmail(models.Model):
+    mail_from = models.CharField(
+        verbose_name=_('from'),
+        max_length=100
+    )
+    mail_to = models.TextField(
+        verbose_name=_('to'),
+        help_text=_('Recipients separated by comma.')
+    )
+    subject = models.CharField(
+        verbose_name=_('subject'),
+        max_length=200
+    )
+    message = models.TextField(
+        verbose_name=_('message')
+    )
+    created = models.DateTimeField(
+        verbose_name=_('created'),
+        default=date_now
+    )
+    next_attempt = models.DateTimeField(
+        verbose_name=_('next attempt'),
+        default=date_now
+    )
+    attempts = models.SmallIntegerField(
+        verbose_name=_('number of attempts'),
+        default=0
+    )
+    sent_at = models.DateTimeField(
+        verbose_name=_('sent at'),
+        blank=True,
+        null=True
+    )
+    failed = models.BooleanField(
+        verbose_name=_('failed'),
+        default=False,
+        help_text=_('Set when all attempts to send the email failed.')
+    )
+    last_error = models.TextField(
+        verbose_name=_('last error'),
+        blank=True
+    )
+    objects = OutboxEmailManager()
+
+    class Meta:
+        verbose_name = _('outbox email')
+        verbose_name_plural = _('outbox emails')
+        indexes = [
+            models.Index(fields=['sent_at', 'failed', 'next_attempt'], name='outbox_due_idx'),
+        ]
+
+    def as_message(self):
+        return create_message(
+            mail_from=self.mail_from,
+            mail_to=[email.strip() for email in self.mail_to.split(',')],
+            mail_subject=self.subject,
+            message=self.message
         )
-        return adult_age <= _date_now
-        
-        
+
+    def mark_sent(self):
+        self.attempts += 1
+        self.sent_at = date_now()
+        self.last_error = ''
+        self.save(update_fields=['attempts', 'sent_at', 'last_error'])
+
+    def mark_failed(self, error, max_attempts, retry_delay):
+        """
+        Schedule next attempt with exponential backoff:
+        retry_delay, 2 * retry_delay, 4 * retry_delay ...
+        After max_attempts the email is marked as failed.
+        """
+        self.attempts += 1
+        self.last_error = error
+        if self.attempts >= max_attempts:
+            self.failed = True
+        else:
+            self.next_attempt = date_now() + retry_delay * 2 ** (self.attempts - 1)
+        self.save(update_fields=['attempts', 'last_error', 'failed', 'next_attempt'])
+
+    def __str__(self):
+        return f'{self.subject} -> {self.mail_to}'
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_users
+from .models import BlogProfile, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, using, **kwargs):
+    invalidate_users([instance.pk], using=using)
+
+
+@receiver(post_save, sender=BlogProfile)
+@receiver(post_delete, sender=BlogProfile)
+def invalidate_cached_profile(sender, instance, using, **kwargs):
+    invalidate_users(
+        User.objects.using(using).filter(user_profile=instance).values_list('pk', flat=True),
+        using=using
+    )
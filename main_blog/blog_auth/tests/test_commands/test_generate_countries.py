@@ -0,0 +1,52 @@
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from blog_auth.countries import COUNTRIES
+from blog_auth.management.commands.generate_countries import render_countries
+
+try:
+    import pycountry
+except ImportError:
+    pycountry = None
+
+class Country:
+
+    def __init__(self, alpha_2, name):
+        self.alpha_2 = alpha_2
+        self.name = name
+
+class TestGenerateCountries(SimpleTestCase):
+
+    def test_render_countries(self):
+        source = render_countries(
+            [Country('PL', 'Poland'), Country('AX', 'Åland Islands'), Country('AL', 'Albania')],
+            '1.0'
+        )
+        namespace = {}
+        exec(source, namespace)
+        self.assertEqual(
+            namespace['COUNTRIES'],
+            (('AX', 'Åland Islands'), ('AL', 'Albania'), ('PL', 'Poland'))
+        )
+        self.assertIn('pycountry 1.0', source)
+
+    @skipUnless(pycountry, 'pycountry is not installed.')
+    def test_module_is_up_to_date(self):
+        out = StringIO()
+        call_command('generate_countries', '--check', stdout=out)
+        self.assertIn('up to date', out.getvalue())
+
+    @skipUnless(pycountry, 'pycountry is not installed.')
+    def test_generate(self):
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'countries.py')
+            call_command('generate_countries', '--output', output, stdout=StringIO())
+            namespace = {}
+            with open(output, encoding='utf-8') as module:
+                exec(module.read(), namespace)
+        self.assertEqual(namespace['COUNTRIES'], COUNTRIES)
@@ -0,0 +1,78 @@
+from smtplib import SMTPServerDisconnected
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.timezone import now, timedelta
+
+from blog_auth.forms import SignUpForm
+from blog_auth.models import OutboxEmail, User
+
+class TestSendOutboxCommand(TestCase):
+
+    def setUp(self):
+        self.user = self._create_user()
+
+    def _create_user(self):
+        return User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+        )
+
+    def _send_outbox(self, serwer, **options):
+        with mock.patch('blog_auth.email_tool.open_connection', return_value=serwer) as open_connection:
+            call_command('send_outbox', stdout=mock.Mock(), **options)
+        return open_connection
+
+    def test_send_email_user_only_enqueue(self):
+        with mock.patch('blog_auth.email_tool.open_connection') as open_connection:
+            self.user.send_email_user(subject='Test', message='Test message')
+        open_connection.assert_not_called()
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.mail_to, self.user.email)
+        self.assertIsNone(email.sent_at)
+
+    def test_sign_up_enqueue_email(self):
+        form = SignUpForm(data={
+            'username': 'tester2',
+            'nick': 'test2',
+            'email': 'tester2@gmail.com',
+            'password1': 'test123456',
+            'password2': 'test123456',
+        })
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.assertEqual(OutboxEmail.objects.get().subject, 'Registation')
+
+    def test_batch_is_sent_over_one_connection(self):
+        for number in range(5):
+            self.user.send_email_user(subject=f'Test {number}', message='Test message')
+        serwer = mock.Mock()
+        open_connection = self._send_outbox(serwer)
+        open_connection.assert_called_once()
+        self.assertEqual(serwer.send_message.call_count, 5)
+        self.assertFalse(OutboxEmail.objects.filter(sent_at__isnull=True).exists())
+
+    def test_failed_email_is_retried_with_backoff(self):
+        self.user.send_email_user(subject='Test', message='Test message')
+        serwer = mock.Mock()
+        serwer.send_message.side_effect = SMTPServerDisconnected('Connection lost')
+        self._send_outbox(serwer, retry_delay=60)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertIsNone(email.sent_at)
+        self.assertGreater(email.next_attempt, now() + timedelta(seconds=50))
+        self.assertIn('Connection lost', email.last_error)
+
+    def test_email_is_given_up_after_max_attempts(self):
+        self.user.send_email_user(subject='Test', message='Test message')
+        serwer = mock.Mock()
+        serwer.send_message.side_effect = SMTPServerDisconnected('Connection lost')
+        for _ in range(3):
+            OutboxEmail.objects.update(next_attempt=now())
+            self._send_outbox(serwer, max_attempts=3)
+        email = OutboxEmail.objects.get()
+        self.assertTrue(email.failed)
+        self.assertEqual(email.attempts, 3)
@@ -0,0 +1,50 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.timezone import now, timedelta
+
+from blog_auth.models import OutboxEmail, User
+
+class TestUnbanUsers(TestCase):
+
+    def setUp(self):
+        self.users = [self._create_user(number) for number in range(5)]
+
+    def _create_user(self, number):
+        return User.objects.create_user(
+            username=f'tester{number}',
+            email=f'tester{number}@example.com',
+            password='tester123',
+            nick=f'testowy{number}'
+        )
+
+    def _ban(self, user, end_ban):
+        User.objects.filter(pk=user.pk).update(is_ban=True, end_ban=end_ban)
+
+    def test_unban_expired(self):
+        for user in self.users[:3]:
+            self._ban(user, now() - timedelta(minutes=1))
+        self._ban(self.users[3], now() + timedelta(days=1))
+        out = StringIO()
+        self.assertEqual(User.objects.unban_expired(batch_size=10), 3)
+        call_command('unban_users', stdout=out)
+        self.assertIn('Unbanned users: 0', out.getvalue())
+        self.assertEqual(
+            set(User.objects.filter(is_ban=True).values_list('username', flat=True)),
+            {'tester3'}
+        )
+        self.assertFalse(User.objects.filter(end_ban__lt=now()).exists())
+        emails = OutboxEmail.objects.filter(subject='Unban')
+        self.assertEqual(
+            sorted(emails.values_list('mail_to', flat=True)),
+            ['tester0@example.com', 'tester1@example.com', 'tester2@example.com']
+        )
+
+    def test_batches(self):
+        for user in self.users:
+            self._ban(user, now() - timedelta(minutes=1))
+        out = StringIO()
+        call_command('unban_users', '--batch-size', '2', stdout=out)
+        self.assertIn('Unbanned users: 5', out.getvalue())
+        self.assertEqual(OutboxEmail.objects.count(), 5)
@@ -142,3 +142,18 @@ class TestCreateProfileForm(TestCase):
 
 
 
+
+    def test_country_field_invalid(self):
+        self.data_for_profile['country'] = 'XX'
+        form = CreateProfileForm(user=self.user, data=self.data_for_profile)
+        self.assertFalse(form.is_valid())
+        self.assertIn('country', form.errors)
+
+    def test_country_select_marks_selected(self):
+        unbound = str(CreateProfileForm(user=self.user)['country'])
+        self.assertIn('<option value="GB" selected>', unbound)
+        self.assertNotIn('<option value="PL" selected>', unbound)
+        bound = str(CreateProfileForm(user=self.user, data=self.data_for_profile)['country'])
+        self.assertIn('<option value="PL" selected>', bound)
+        self.assertNotIn('<option value="GB" selected>', bound)
+        self.assertEqual(bound.count('<option'), 249)
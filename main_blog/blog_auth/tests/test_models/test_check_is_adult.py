@@ -0,0 +1,63 @@
+from datetime import date
+
+from django.test import TestCase
+from django.utils.timezone import localdate
+
+from blog_auth.backends import ProfileModelBackend
+from blog_auth.models import BlogProfile, User
+
+class TestCheckIsAdult(TestCase):
+
+    def _create_user(self, date_birth=None):
+        profile = None
+        if date_birth is not None:
+            profile = BlogProfile.objects.create_profile(
+                first_name='Test',
+                last_name='Tester',
+                sex='M',
+                country='PL',
+                date_birth=date_birth
+            )
+        return User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+            user_profile=profile
+        )
+
+    def test_adult_since_is_set_on_save(self):
+        user = self._create_user(date_birth=date(year=1996, month=3, day=12))
+        self.assertEqual(user.user_profile.adult_since, date(year=2014, month=3, day=12))
+
+    def test_adult_since_born_29_february(self):
+        self.assertEqual(
+            BlogProfile.get_adult_since(date(year=2000, month=2, day=29)),
+            date(year=2018, month=3, day=1)
+        )
+
+    def test_adult(self):
+        user = self._create_user(date_birth=date(year=1996, month=3, day=12))
+        self.assertTrue(user.check_is_adult())
+
+    def test_not_adult(self):
+        today = localdate()
+        user = self._create_user(date_birth=date(year=today.year - 10, month=1, day=1))
+        self.assertFalse(user.check_is_adult())
+
+    def test_without_profile(self):
+        user = self._create_user()
+        self.assertFalse(user.check_is_adult())
+
+    def test_result_is_cached_on_user(self):
+        user = self._create_user(date_birth=date(year=1996, month=3, day=12))
+        user = ProfileModelBackend().get_user(user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(user.check_is_adult())
+            self.assertTrue(user.check_is_adult())
+
+    def test_backend_loads_profile_with_user(self):
+        user = self._create_user(date_birth=date(year=1996, month=3, day=12))
+        with self.assertNumQueries(1):
+            user = ProfileModelBackend().get_user(user.pk)
+            self.assertEqual(user.user_profile.first_name, 'Test')
@@ -0,0 +1,78 @@
+from smtplib import SMTP
+from time import perf_counter
+
+from django.test import SimpleTestCase
+
+from blog_auth.email_tool import SMTPConnectionPool, create_message
+from blog_auth.tests.smtp_server import LocalSMTPServer
+
+class TestSMTPConnectionPool(SimpleTestCase):
+    number_messages = 200
+
+    def setUp(self):
+        self.server = LocalSMTPServer().start()
+        self.messages = [
+            create_message(
+                mail_from='blog@localhost',
+                mail_to=['tester@localhost'],
+                mail_subject=f'Test {number}',
+                message='Test message'
+            )
+            for number in range(self.number_messages)
+        ]
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _open_connection(self):
+        serwer = SMTP('127.0.0.1', self.server.port)
+        serwer.ehlo()
+        return serwer
+
+    def _send_without_pool(self):
+        """The old way: connect, send and quit for every message."""
+        for message in self.messages:
+            serwer = self._open_connection()
+            serwer.send_message(message)
+            serwer.quit()
+
+    def _send_with_pool(self, pool):
+        for message in self.messages:
+            pool.send_messages([message])
+
+    def test_pool_reuses_connection(self):
+        pool = SMTPConnectionPool(size=2, connection_factory=self._open_connection)
+        results = pool.send_messages(self.messages)
+        pool.close()
+        self.assertEqual(results, [None] * self.number_messages)
+        self.assertEqual(self.server.messages, self.number_messages)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_pool_reconnects_dropped_connection(self):
+        pool = SMTPConnectionPool(size=1, connection_factory=self._open_connection)
+        pool.send_messages(self.messages[:1])
+        serwer = pool._idle.get_nowait()
+        serwer.close()
+        pool._idle.put(serwer)
+        self.assertEqual(pool.send_messages(self.messages[1:2]), [None])
+        pool.close()
+        self.assertEqual(self.server.messages, 2)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_connections_with_and_without_pool(self):
+        """
+        Throughput is only reported in the message, the time depends on the machine.
+        """
+        start = perf_counter()
+        self._send_without_pool()
+        without_pool = perf_counter() - start
+        pool = SMTPConnectionPool(size=1, connection_factory=self._open_connection)
+        start = perf_counter()
+        self._send_with_pool(pool)
+        with_pool = perf_counter() - start
+        pool.close()
+        report = 'Messages per second without pool: %.0f, with pool: %.0f' % (
+            self.number_messages / without_pool, self.number_messages / with_pool
+        )
+        self.assertEqual(self.server.messages, 2 * self.number_messages, report)
+        self.assertEqual(self.server.connections, self.number_messages + 1, report)
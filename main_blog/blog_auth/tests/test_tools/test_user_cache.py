@@ -0,0 +1,148 @@
+from datetime import date
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils.timezone import now, timedelta
+
+from blog_auth.cache import get_cached_user, user_cache_key
+from blog_auth.models import BlogProfile, User
+from blog_entries.models import Article
+
+class TestCachedUser(TransactionTestCase):
+    """
+    Snapshots are invalidated on commit, so the tests run outside of
+    a transaction.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = self._create_user()
+        self.client.force_login(self.user)
+
+    def _create_user(self):
+        user = User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+            is_active=True
+        )
+        user.user_profile = BlogProfile.objects.create_profile(
+            first_name='Test',
+            last_name='Tester',
+            sex='M',
+            country='PL',
+            date_birth=date(year=1996, month=3, day=12)
+        )
+        user.save()
+        return user
+
+    def _request(self):
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        # Load the session, only the user is measured.
+        request.session.keys()
+        return request
+
+    def test_hit_makes_no_queries(self):
+        self.assertEqual(get_cached_user(self._request()), self.user)
+        request = self._request()
+        with self.assertNumQueries(0):
+            user = get_cached_user(request)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertTrue(user.check_is_adult())
+            self.assertEqual(user.get_short_name(), 'Test')
+            self.assertEqual(user.get_full_name(), 'Test Tester')
+            self.assertFalse(user._state.adding)
+
+    def test_profile_save_invalidates(self):
+        get_cached_user(self._request())
+        profile = BlogProfile.objects.get()
+        profile.first_name = 'Changed'
+        profile.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertEqual(get_cached_user(self._request()).get_short_name(), 'Changed')
+
+    def test_invalidated_on_commit(self):
+        key = user_cache_key(self.user.pk)
+        get_cached_user(self._request())
+        with transaction.atomic():
+            BlogProfile.objects.filter(pk=self.user.user_profile_id).update(first_name='Changed')
+            self.user.user_profile.save()
+            self.assertIsNotNone(cache.get(key))
+        self.assertIsNone(cache.get(key))
+        get_cached_user(self._request())
+        try:
+            with transaction.atomic():
+                self.user.save()
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertIsNotNone(cache.get(key))
+
+    @override_settings(USER_CACHE_TIMEOUT=0)
+    def test_timeout_is_read_on_call(self):
+        get_cached_user(self._request())
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_changed_password_logs_out(self):
+        get_cached_user(self._request())
+        self.user.set_password('changed123')
+        self.user.save()
+        self.assertFalse(get_cached_user(self._request()).is_authenticated)
+
+    def test_stale_hash_is_not_used(self):
+        get_cached_user(self._request())
+        # The snapshot of an old password must not accept the session.
+        User.objects.filter(pk=self.user.pk).update(password='changed')
+        cache.set(user_cache_key(self.user.pk), ('other hash',) + cache.get(user_cache_key(self.user.pk))[1:])
+        self.assertFalse(get_cached_user(self._request()).is_authenticated)
+
+    def test_bulk_updates_invalidate(self):
+        get_cached_user(self._request())
+        Article.objects.create_article(author=self.user, title='Test is very good.', entry=50 * 'Test.')
+        self.assertEqual(get_cached_user(self._request()).user_profile.number_article, 1)
+        User.objects.filter(pk=self.user.pk).update(is_ban=True, end_ban=now() - timedelta(minutes=1))
+        cache.clear()
+        get_cached_user(self._request())
+        User.objects.unban_expired()
+        self.assertFalse(get_cached_user(self._request()).is_ban)
+
+    def test_saving_cached_user(self):
+        get_cached_user(self._request())
+        self.assertNotIn(self.user.password, cache.get(user_cache_key(self.user.pk))[2])
+        user = get_cached_user(self._request())
+        self.assertIn('password', user.get_deferred_fields())
+        user.nick = 'changed'
+        user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.nick, 'changed')
+        self.assertEqual(self.user.user_profile.first_name, 'Test')
+        self.assertTrue(self.user.check_password('tester123'))
+
+    def test_recount_articles_invalidates(self):
+        get_cached_user(self._request())
+        BlogProfile.objects.update(number_article=10)
+        call_command('recount_articles', stdout=StringIO())
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertEqual(get_cached_user(self._request()).user_profile.number_article, 0)
+
+    def test_middleware(self):
+        url = reverse('blog_entries:all_entries')
+        with self.modify_settings(MIDDLEWARE={
+            'remove': 'django.contrib.auth.middleware.AuthenticationMiddleware',
+            'append': 'blog_auth.middleware.CachedAuthenticationMiddleware'
+        }):
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user.pk, self.user.pk)
+        tables = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('"blog_auth_user"', tables)
+        self.assertNotIn('"blog_auth_blogprofile"', tables)
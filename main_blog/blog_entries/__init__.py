@@ -0,0 +1 @@
+default_app_config = 'blog_entries.apps.BlogEntriesConfig'
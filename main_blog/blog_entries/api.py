@@ -0,0 +1,303 @@
+import json
+from hashlib import md5
+
+from django.conf import settings
+from django.forms.models import model_to_dict
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.decorators import method_decorator
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.http import condition
+from django.views.generic import View
+
+from .forms import ChangeArtilceEntryForm, ChangeCommentForm, CreateArticleForm, CreateCommentForm
+from .models import Article, Comment
+from .pagination import InvalidCursor, KeysetPaginator
+
+
+def article_to_dict(article, with_entry=True):
+    data = {
+        'id': article.pk,
+        'url': reverse('blog_entries:api_article', args=[article.pk]),
+        'author': article.author_id,
+        'title': article.title,
+        'excerpt': article.excerpt,
+        'pub_date': article.pub_date,
+        'for_adult': article.for_adult,
+        'comment_count': article.comment_count,
+        'last_comment_at': article.last_comment_at,
+        'version': article.version
+    }
+    if with_entry:
+        data.update({
+            'entry': article.entry,
+            'like': article.like,
+            'dislike': article.dislike
+        })
+    return data
+
+
+def comment_to_dict(comment):
+    return {
+        'id': comment.pk,
+        'url': reverse('blog_entries:api_comment', args=[comment.pk]),
+        'article': comment.article_id,
+        'owner': comment.owner_id,
+        'content_comment': comment.content_comment,
+        'pub_date': comment.pub_date,
+        'version': comment.version
+    }
+
+
+def row_etag(obj):
+    return f'{obj._meta.model_name}-{obj.pk}-{obj.version}'
+
+
+def _version_etag(queryset, pk):
+    """
+    ETag of one row read by a single-column query, so 304 costs no row load.
+    """
+    version = queryset.filter(pk=pk).values_list('version', flat=True).first()
+    if version is None:
+        return None
+    return f'{queryset.model._meta.model_name}-{pk}-{version}'
+
+
+def article_etag(request, pk):
+    return _version_etag(Article.objects.visible_to(request.user), pk)
+
+
+def comment_etag(request, pk):
+    return _version_etag(Comment.objects.visible_to(request.user), pk)
+
+
+class JSONView(View):
+    """
+    Base of the JSON API. Errors are {"detail": message} or {"errors": form errors}.
+    Changes need a logged in user; the session cookie and CSRF token are used
+    like in the HTML views.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and not request.user.is_authenticated:
+            return self.error(_('Authentication credentials were not provided.'), status=401)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return self.error(_('Not found.'), status=404)
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        response = super().http_method_not_allowed(request, *args, **kwargs)
+        return self.error(_('Method not allowed.'), status=405, Allow=response['Allow'])
+
+    def error(self, detail, status, **headers):
+        response = JsonResponse({'detail': str(detail)}, status=status)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def form_error(self, form):
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    def get_data(self, instance=None, fields=()):
+        """
+        Return JSON object of the request body. PATCH is applied over
+        fields of instance, PUT and POST must send all of them.
+        """
+        try:
+            data = json.loads(self.request.body.decode() or '{}')
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            raise ValueError(_('Request body must be a JSON object.'))
+        if self.request.method == 'PATCH' and instance is not None:
+            data = {**model_to_dict(instance, fields=fields), **data}
+        return data
+
+    def render_object(self, data, obj, status=200, **headers):
+        response = JsonResponse(data, status=status)
+        response['ETag'] = quote_etag(row_etag(obj))
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def render_page(self, queryset, per_page, serializer, key_fields=('pub_date', 'id')):
+        """
+        Page of queryset by the cursor GET parameter. The ETag is hashed
+        from the row versions, so an unchanged page is answered with 304.
+        """
+        try:
+            page = KeysetPaginator(queryset, per_page, key_fields).page(self.request.GET.get('cursor'))
+        except InvalidCursor as e:
+            return self.error(e, status=400)
+        signature = '|'.join([row_etag(obj) for obj in page] + [
+            str(page.next_cursor), str(page.previous_cursor)
+        ])
+        etag = quote_etag(md5(signature.encode()).hexdigest())
+        response = get_conditional_response(self.request, etag=etag)
+        if response is None:
+            response = JsonResponse({
+                'results': [serializer(obj) for obj in page],
+                'next': self._page_url(page.next_cursor),
+                'previous': self._page_url(page.previous_cursor)
+            })
+        response['ETag'] = etag
+        return response
+
+    def _page_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return f'{self.request.path}?{query.urlencode()}'
+
+
+class ArticleListAPIView(JSONView):
+    http_method_names = ['get', 'post', 'options']
+    per_page = getattr(settings, 'ARTICLES_PER_PAGE', 20)
+
+    def get(self, request, *args, **kwargs):
+        sort = request.GET.get('sort') or 'date'
+        if sort not in Article.SORT_KEYS:
+            return self.error(_('Unknown sort.'), status=400)
+        queryset = Article.objects.visible_to(request.user).only(*Article.SUMMARY_FIELDS, 'author')
+        return self.render_page(
+            queryset,
+            self.per_page,
+            lambda article: article_to_dict(article, with_entry=False),
+            key_fields=Article.SORT_KEYS[sort]
+        )
+
+    def post(self, request, *args, **kwargs):
+        try:
+            form = CreateArticleForm(user=request.user, data=self.get_data())
+        except ValueError as e:
+            return self.error(e, status=400)
+        if not form.is_valid():
+            return self.form_error(form)
+        form.save()
+        article = form.instance
+        return self.render_object(
+            article_to_dict(article),
+            article,
+            status=201,
+            Location=reverse('blog_entries:api_article', args=[article.pk])
+        )
+
+
+@method_decorator(
+    decorator=condition(etag_func=article_etag),
+    name='dispatch'
+    )
+class ArticleAPIView(JSONView):
+    """
+    GET/HEAD answer If-None-Match with 304, changes with a stale If-Match get 412.
+    """
+    http_method_names = ['get', 'head', 'put', 'patch', 'delete', 'options']
+
+    def get_object(self):
+        return get_object_or_404(Article.objects.visible_to(self.request.user), pk=self.kwargs['pk'])
+
+    def get(self, request, *args, **kwargs):
+        article = self.get_object()
+        return self.render_object(article_to_dict(article), article)
+
+    def put(self, request, *args, **kwargs):
+        article = self.get_object()
+        if not article.check_the_owner(author=request.user):
+            return self.error(_('You are not the author of this article.'), status=403)
+        try:
+            data = self.get_data(instance=article, fields=ChangeArtilceEntryForm._meta.fields)
+        except ValueError as e:
+            return self.error(e, status=400)
+        form = ChangeArtilceEntryForm(article=article, instance=article, data=data)
+        if not form.is_valid():
+            return self.form_error(form)
+        form.save()
+        return self.render_object(article_to_dict(article), article)
+
+    patch = put
+
+    def delete(self, request, *args, **kwargs):
+        article = self.get_object()
+        if not article.check_the_owner(author=request.user):
+            return self.error(_('You are not the author of this article.'), status=403)
+        article.delete()
+        return HttpResponse(status=204)
+
+
+class ArticleCommentListAPIView(JSONView):
+    http_method_names = ['get', 'post', 'options']
+    per_page = getattr(settings, 'COMMENTS_PER_PAGE', 20)
+
+    def get_article(self):
+        return get_object_or_404(Article.objects.visible_to(self.request.user), pk=self.kwargs['pk'])
+
+    def get(self, request, *args, **kwargs):
+        article = self.get_article()
+        return self.render_page(Comment.objects.filter(article=article), self.per_page, comment_to_dict)
+
+    def post(self, request, *args, **kwargs):
+        article = self.get_article()
+        try:
+            form = CreateCommentForm(user=request.user, article=article, data=self.get_data())
+        except ValueError as e:
+            return self.error(e, status=400)
+        if not form.is_valid():
+            return self.form_error(form)
+        form.save()
+        comment = form.instance
+        return self.render_object(
+            comment_to_dict(comment),
+            comment,
+            status=201,
+            Location=reverse('blog_entries:api_comment', args=[comment.pk])
+        )
+
+
+@method_decorator(
+    decorator=condition(etag_func=comment_etag),
+    name='dispatch'
+    )
+class CommentAPIView(JSONView):
+    """
+    Only the owner edits a comment; the owner or the author of the article deletes it.
+    """
+    http_method_names = ['get', 'head', 'put', 'patch', 'delete', 'options']
+
+    def get_object(self):
+        return get_object_or_404(
+            Comment.objects.visible_to(self.request.user).select_related('article'),
+            pk=self.kwargs['pk']
+        )
+
+    def get(self, request, *args, **kwargs):
+        comment = self.get_object()
+        return self.render_object(comment_to_dict(comment), comment)
+
+    def put(self, request, *args, **kwargs):
+        comment = self.get_object()
+        if not comment.check_the_owner(author=request.user):
+            return self.error(_('You are not the owner of this comment.'), status=403)
+        try:
+            data = self.get_data(instance=comment, fields=ChangeCommentForm._meta.fields)
+        except ValueError as e:
+            return self.error(e, status=400)
+        data['change_comment_pk'] = comment.pk
+        form = ChangeCommentForm(instance=comment, data=data)
+        if not form.is_valid():
+            return self.form_error(form)
+        form.save()
+        return self.render_object(comment_to_dict(comment), comment)
+
+    patch = put
+
+    def delete(self, request, *args, **kwargs):
+        comment = self.get_object()
+        owner_article = comment.article is not None and comment.article.check_the_owner(author=request.user)
+        if not (comment.check_the_owner(author=request.user) or owner_article):
+            return self.error(_('You are not the owner of this comment.'), status=403)
+        comment.delete()
+        return HttpResponse(status=204)
@@ -1,5 +1,12 @@
+import atexit
+
 from django.apps import AppConfig
 
 
 class BlogEntriesConfig(AppConfig):
     name = 'blog_entries'
+
+    def ready(self):
+        from . import signals
+        # Votes buffered in this process must not be lost on shutdown.
+        atexit.register(self.get_model('Article').objects.flush_votes)
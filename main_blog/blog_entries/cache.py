@@ -0,0 +1,97 @@
+from functools import wraps
+from hashlib import md5
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from main_blog.db_routers import read_primary
+
+PAGE_CACHE_TIMEOUT = getattr(settings, 'ANONYMOUS_PAGE_CACHE_TIMEOUT', 60 * 15)
+ARTICLE_VERSION_KEY = 'blog_entries:article_version:%s'
+LIST_VERSION_KEY = 'blog_entries:list_version'
+
+
+def _initial_version():
+    """
+    Versions start from the current time, so a version lost from
+    the cache never comes back with a number used before.
+    """
+    return int(time() * 1000)
+
+
+def _get_version(key):
+    cache.add(key, _initial_version(), timeout=None)
+    return cache.get(key)
+
+
+def _bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+        return cache.get(key)
+
+
+def get_article_version(article_pk):
+    return _get_version(ARTICLE_VERSION_KEY % article_pk)
+
+
+def get_list_version():
+    return _get_version(LIST_VERSION_KEY)
+
+
+def bump_article_version(article_pk):
+    """Invalidate cached pages of one article."""
+    return _bump_version(ARTICLE_VERSION_KEY % article_pk)
+
+
+def bump_list_version():
+    """Invalidate cached pages of the article list."""
+    return _bump_version(LIST_VERSION_KEY)
+
+
+def _path_hash(request):
+    return md5(request.get_full_path().encode()).hexdigest()
+
+
+def article_page_key(request, pk, **kwargs):
+    return 'blog_entries:article_response:%s:%s:%s' % (pk, get_article_version(pk), _path_hash(request))
+
+
+def list_page_key(request, **kwargs):
+    return 'blog_entries:list_response:%s:%s' % (get_list_version(), _path_hash(request))
+
+
+def cache_anonymous_page(key_func, timeout=PAGE_CACHE_TIMEOUT):
+    """
+    View decorator. Content and headers of anonymous GET responses are stored under
+    key_func(request, **kwargs); a cache hit is returned before the view runs, so it
+    costs no database queries.
+    Keys contain a version which signals bump on every change of the data. On a miss
+    the view reads the primary database and template responses are rendered here.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+            key = key_func(request, **kwargs)
+            cached = cache.get(key)
+            if cached is not None:
+                content, headers = cached
+                response = HttpResponse(content)
+                for name, value in headers:
+                    response[name] = value
+                return response
+            # The key has the current version, a lagging replica could fill it with older data.
+            with read_primary():
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+            if response.status_code == 200:
+                cache.set(key, (response.content, list(response.items())), timeout)
+            return response
+        return _wrapped_view
+    return decorator
@@ -0,0 +1,84 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Article, Comment
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+FORMATS = [NDJSON, CSV]
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv'
+}
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORTED_MODELS = {
+    'article': (Article, [
+        'id', 'author_id', 'pub_date', 'title', 'entry', 'for_adult',
+        'like', 'dislike', 'comment_count', 'last_comment_at', 'version'
+    ]),
+    'comment': (Comment, [
+        'id', 'article_id', 'owner_id', 'pub_date', 'content_comment', 'version'
+    ])
+}
+
+
+def export_rows(model_name, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield tuples of EXPORTED_MODELS fields ordered by pk. Rows are read by
+    iterator(), in chunks (server-side cursor on PostgreSQL), and no model
+    instances are built, so memory doesn't grow with the table.
+    """
+    model, fields = EXPORTED_MODELS[model_name]
+    return model.objects.order_by('pk').values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def ndjson_lines(model_names, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    One JSON object per line, with "model" key, for every row of model_names.
+    """
+    encoder = DjangoJSONEncoder()
+    for model_name in model_names:
+        fields = EXPORTED_MODELS[model_name][1]
+        for row in export_rows(model_name, chunk_size):
+            data = {'model': model_name}
+            data.update(zip(fields, row))
+            yield encoder.encode(data) + '\n'
+
+
+class _Echo:
+    """File-like object which returns written value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(model_name, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    CSV of one model, header line first.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORTED_MODELS[model_name][1])
+    for row in export_rows(model_name, chunk_size):
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def export_lines(export_format, model_names, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Lines of the export. CSV has one header, so it takes one model only.
+    """
+    if export_format == CSV:
+        if len(model_names) != 1:
+            raise ValueError('CSV export takes one model.')
+        return csv_lines(model_names[0], chunk_size)
+    return ndjson_lines(model_names, chunk_size)
@@ -1,6 +1,7 @@
 from django import forms
+from django.db import transaction
 
-from .models import Article, Comment
+from .models import Article, Comment, Vote
 
 class CreateArticleForm(forms.ModelForm):
     class Meta:
@@ -17,7 +18,9 @@ class CreateArticleForm(forms.ModelForm):
         article = super().save(commit=False)
         article.author = self.user
         if commit:
-            article.save()
+            with transaction.atomic():
+                article.save()
+                Article.objects.count_articles(author_pk=article.author_id, number=1)
             return
         return article
 
@@ -36,7 +39,9 @@ class CreateCommentForm(forms.ModelForm):
         comment.article = self.article
         comment.owner = self.user
         if commit:
-            comment.save()
+            with transaction.atomic():
+                comment.save()
+                Article.objects.count_comments(article_pk=comment.article_id, number=1)
             return
         return comment
 
@@ -50,6 +55,16 @@ class ChangeArtilceEntryForm(forms.ModelForm):
         self.fields['title'].initial = article.title
         self.fields['entry'].initial = article.entry
 
+    def save(self, commit=True):
+        """
+        Save only the edited columns, counters of the article are changed
+        by UPDATEs of other requests meanwhile.
+        """
+        article = super().save(commit=False)
+        if commit:
+            article.save(update_fields=self._meta.fields)
+        return article
+
 class DeleteArticleForm(forms.Form):
     delete_article_pk = forms.IntegerField(
         widget=forms.HiddenInput
@@ -79,6 +94,15 @@ class ChangeCommentForm(forms.ModelForm):
             self.fields['content_comment'].initial = comment.content_comment
             self.fields['change_comment_pk'].initial = comment.pk
 
+    def save(self, commit=True):
+        """
+        Save only the edited column.
+        """
+        comment = super().save(commit=False)
+        if commit:
+            comment.save(update_fields=self._meta.fields)
+        return comment
+
 class DeleteCommentForm(forms.Form):
     delete_comment_pk = forms.IntegerField(
         widget=forms.HiddenInput
@@ -93,6 +117,24 @@ class DeleteCommentForm(forms.Form):
     def save(self):
         comment = Comment.objects.get(pk=self.cleaned_data['delete_comment_pk'])
         comment.delete()
-        return 
+        return
 
-    
+
+class VoteForm(forms.Form):
+    vote = forms.TypedChoiceField(
+        choices=Vote.VALUE_CHOICES,
+        coerce=int,
+        widget=forms.HiddenInput
+    )
+
+    def __init__(self, user, article, *args, **kwargs):
+        self.user = user
+        self.article = article
+        super().__init__(*args, **kwargs)
+
+    def save(self):
+        return Vote.objects.vote(
+            user=self.user,
+            article=self.article,
+            value=self.cleaned_data['vote']
+        )
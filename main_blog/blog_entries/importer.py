@@ -0,0 +1,210 @@
+from collections import Counter, defaultdict
+from datetime import datetime, time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils.timezone import localdate, make_aware
+
+from blog_auth.models import User
+from .cache import bump_article_version, bump_list_version
+from .models import Article, Comment
+from .search import get_search_backend
+
+IMPORT_BATCH_SIZE = 1000
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class BulkImporter:
+    """
+    Insert rows of the export format (blog_entries.export) with bulk_create,
+    one transaction per batch. Rows are validated by the validators of the
+    model fields; foreign keys are checked with one query per batch.
+    bulk_create skips Article.save and the signals, so excerpt, version,
+    BlogProfile.number_article, comment counters, cached pages and the
+    search index are updated here.
+    """
+    article_fields = ['id', 'title', 'entry', 'for_adult', 'pub_date', 'like', 'dislike']
+    comment_fields = ['id', 'content_comment', 'pub_date']
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, on_error=None):
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self.created = Counter()
+        self.rejected = 0
+        self.index_rebuild_needed = False
+
+    def run(self, rows):
+        """
+        rows: iterable of (line number, dict with "model" key).
+        """
+        for batch in batches(rows, self.batch_size):
+            with transaction.atomic():
+                self.import_batch(batch)
+        self.finish()
+
+    def reject(self, line, error):
+        self.rejected += 1
+        if self.on_error is not None:
+            self.on_error(line, error)
+
+    def _clean(self, model, row, fields):
+        """
+        Return {field: python value} of row, running the field validators.
+        Missing values of the id and of fields with a default are left to
+        the model, other fields must pass blank and null checks too.
+        """
+        values = {}
+        errors = {}
+        for name in fields:
+            value = row.get(name)
+            field = model._meta.get_field(name)
+            if (value is None or value == '') and (field.primary_key or field.has_default()):
+                continue
+            try:
+                values[name] = field.clean(value, None)
+            except ValidationError as e:
+                errors[name] = e.messages
+        if errors:
+            raise ValidationError(errors)
+        return values
+
+    def _foreign_key(self, row, name, existing, required=False):
+        value = row.get(name)
+        if value is None or value == '':
+            if required:
+                raise ValidationError({name: ['This field is required.']})
+            return None
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({name: ['Enter a whole number.']})
+        if value not in existing:
+            raise ValidationError({name: [f'Object {value} does not exist.']})
+        return value
+
+    def _new_pk(self, values, taken):
+        """
+        Reject explicit ids of existing rows (or repeated in the batch),
+        bulk_create would fail the whole batch on them.
+        """
+        pk = values.get('id')
+        if pk is None:
+            return
+        if pk in taken:
+            raise ValidationError({'id': [f'Object {pk} already exists.']})
+        taken.add(pk)
+
+    def _existing(self, model, rows, name):
+        pks = set()
+        for _, row in rows:
+            try:
+                pks.add(int(row[name]))
+            except (KeyError, TypeError, ValueError):
+                pass
+        return set(model.objects.filter(pk__in=pks).values_list('pk', flat=True))
+
+    def build_articles(self, rows):
+        authors = self._existing(User, rows, 'author_id')
+        taken = self._existing(Article, rows, 'id')
+        articles = []
+        for line, row in rows:
+            try:
+                values = self._clean(Article, row, self.article_fields)
+                self._new_pk(values, taken)
+                values['author_id'] = self._foreign_key(row, 'author_id', authors)
+                values.setdefault('pub_date', localdate())
+            except ValidationError as e:
+                self.reject(line, e)
+                continue
+            article = Article(**values)
+            article.excerpt = Article.make_excerpt(article.entry)
+            article.version = 1
+            articles.append(article)
+        return articles
+
+    def build_comments(self, rows):
+        articles = self._existing(Article, rows, 'article_id')
+        owners = self._existing(User, rows, 'owner_id')
+        taken = self._existing(Comment, rows, 'id')
+        comments = []
+        for line, row in rows:
+            try:
+                values = self._clean(Comment, row, self.comment_fields)
+                self._new_pk(values, taken)
+                values['article_id'] = self._foreign_key(row, 'article_id', articles, required=True)
+                values['owner_id'] = self._foreign_key(row, 'owner_id', owners)
+                values.setdefault('pub_date', localdate())
+            except ValidationError as e:
+                self.reject(line, e)
+                continue
+            comment = Comment(**values)
+            comment.version = 1
+            comments.append(comment)
+        return comments
+
+    def import_batch(self, batch):
+        rows = defaultdict(list)
+        for line, row in batch:
+            if row.get('model') not in ('article', 'comment'):
+                self.reject(line, ValidationError('Unknown model %r.' % row.get('model')))
+                continue
+            rows[row['model']].append((line, row))
+        # Articles first, comments of the same batch may refer to them.
+        articles = Article.objects.bulk_create(self.build_articles(rows['article']))
+        comments = Comment.objects.bulk_create(self.build_comments(rows['comment']))
+        self.after_articles(articles)
+        self.after_comments(comments)
+
+    def after_articles(self, articles):
+        if not articles:
+            return
+        self.created['article'] += len(articles)
+        for author_pk, number in Counter(article.author_id for article in articles).items():
+            Article.objects.count_articles(author_pk=author_pk, number=number)
+        self._index(articles, 'index_article')
+        bump_list_version()
+
+    def after_comments(self, comments):
+        if not comments:
+            return
+        self.created['comment'] += len(comments)
+        for article_pk, number in Counter(comment.article_id for comment in comments).items():
+            last = max(comment.pub_date for comment in comments if comment.article_id == article_pk)
+            # Comments keep only the date, like in the 0016 migration.
+            Article.objects.count_comments(
+                article_pk=article_pk,
+                number=number,
+                commented_at=make_aware(datetime.combine(last, time.min))
+            )
+            bump_article_version(article_pk)
+        self._index(comments, 'index_comment')
+
+    def _index(self, objects, method):
+        if any(obj.pk is None for obj in objects):
+            # The database doesn't return ids of bulk inserted rows.
+            self.index_rebuild_needed = True
+            return
+        index = getattr(get_search_backend(), method)
+        for obj in objects:
+            index(obj)
+
+    def finish(self):
+        """
+        Reset sequences after rows with explicit ids, rebuild the search
+        index if rows could not be indexed one by one.
+        """
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Article, Comment]):
+                cursor.execute(sql)
+        if self.index_rebuild_needed:
+            get_search_backend().rebuild()
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_entries.export import EXPORT_CHUNK_SIZE, EXPORTED_MODELS, FORMATS, NDJSON, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Stream all articles and comments as NDJSON or CSV, in constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=FORMATS, default=NDJSON,
+            help='Output format. CSV needs a single --model.'
+        )
+        parser.add_argument(
+            '--model', choices=list(EXPORTED_MODELS), action='append', dest='models',
+            help='Exported model, can be repeated (default all).'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Number of rows fetched from the database at once.'
+        )
+        parser.add_argument(
+            '--output', default='-',
+            help='File to write, "-" is the standard output.'
+        )
+
+    def handle(self, *args, **options):
+        models = options['models'] or list(EXPORTED_MODELS)
+        try:
+            lines = export_lines(options['format'], models, options['chunk_size'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', newline='') as output:
+            for line in lines:
+                output.write(line)
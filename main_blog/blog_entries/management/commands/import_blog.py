@@ -0,0 +1,72 @@
+import csv
+import json
+import sys
+from time import monotonic
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_entries.export import EXPORTED_MODELS, FORMATS, CSV, NDJSON
+from blog_entries.importer import IMPORT_BATCH_SIZE, BulkImporter
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk import articles and comments from a file in the export_blog format. '
+        'Rows are validated and inserted in batches, invalid rows are reported and skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON or CSV file, "-" is the standard input.')
+        parser.add_argument(
+            '--format', choices=FORMATS, default=NDJSON,
+            help='Input format. CSV needs --model.'
+        )
+        parser.add_argument(
+            '--model', choices=list(EXPORTED_MODELS),
+            help='Model of all rows of a CSV file.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help='Number of rows validated and inserted in one transaction.'
+        )
+
+    def handle(self, *args, **options):
+        if options['format'] == CSV and not options['model']:
+            raise CommandError('CSV import needs --model.')
+        importer = BulkImporter(batch_size=options['batch_size'], on_error=self.report_error)
+        start = monotonic()
+        if options['path'] == '-':
+            importer.run(self.read_rows(sys.stdin, options))
+        else:
+            with open(options['path'], newline='') as input_file:
+                importer.run(self.read_rows(input_file, options))
+        seconds = monotonic() - start
+        total = sum(importer.created.values())
+        self.stdout.write(
+            f"Imported {importer.created['article']} articles and {importer.created['comment']} comments, "
+            f'rejected {importer.rejected} rows in {seconds:.2f}s '
+            f'({total / seconds if seconds else 0:.0f} rows/s).'
+        )
+
+    def read_rows(self, input_file, options):
+        """
+        Yield (line number, row) without reading the whole file.
+        """
+        if options['format'] == CSV:
+            reader = csv.DictReader(input_file)
+            for row in reader:
+                row['model'] = options['model']
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(input_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                self.report_error(line_number, e)
+                continue
+            yield line_number, row
+
+    def report_error(self, line, error):
+        self.stderr.write(f'Line {line}: {error}')
@@ -0,0 +1,65 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_entries.profiling.data import benchmark_database, seed
+from blog_entries.profiling.load import default_load_paths, load_test
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a temporary test database and compare throughput of the WSGI and the '
+        'ASGI entry points under concurrent anonymous readers. Results are printed as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Number of seeded users.')
+        parser.add_argument('--articles', type=int, default=200, help='Number of seeded articles.')
+        parser.add_argument('--comments', type=int, default=10, help='Number of comments per article.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the random data.')
+        parser.add_argument('--requests', type=int, default=500, help='Number of requests per interface.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Number of concurrent clients.')
+        parser.add_argument('--threads', type=int, default=8, help='Number of worker threads.')
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Requested path, can be repeated (default: the read pages and APIs).'
+        )
+        parser.add_argument(
+            '--interface', choices=['wsgi', 'asgi', 'both'], default='both',
+            help='Entry point to load.'
+        )
+        parser.add_argument('--output', help='Write the JSON results to this file.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 or options['articles'] < 1:
+            raise CommandError('At least 2 users and 1 article are needed by the default paths.')
+        interfaces = ['wsgi', 'asgi'] if options['interface'] == 'both' else [options['interface']]
+        with benchmark_database():
+            seed(
+                users=options['users'],
+                articles=options['articles'],
+                comments_per_article=options['comments'],
+                random_seed=options['seed']
+            )
+            paths = options['paths'] or default_load_paths()
+            results = {
+                interface: load_test(
+                    interface,
+                    paths=paths,
+                    requests=options['requests'],
+                    concurrency=options['concurrency'],
+                    threads=options['threads']
+                ) for interface in interfaces
+            }
+        output = json.dumps({'paths': paths, 'results': results}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output)
+        else:
+            self.stdout.write(output)
+        for interface, result in results.items():
+            self.stderr.write(
+                f"{interface}: {result['requests_per_second']} requests/s, "
+                f"median {result['latency_ms_median']} ms, p95 {result['latency_ms_p95']} ms, "
+                f"{result['errors']} errors"
+            )
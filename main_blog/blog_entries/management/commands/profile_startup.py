@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_entries.profiling.startup import profile_cold_start
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the cold start of a worker: import time of main_blog.wsgi, of every '
+        'module it loads and the time to the first response, in fresh interpreters.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/', help='Path of the first request.')
+        parser.add_argument('--host', default='localhost', help='Host header of the first request.')
+        parser.add_argument('--repeat', type=int, default=3, help='Number of started interpreters.')
+        parser.add_argument(
+            '--sort', choices=['self', 'cumulative'], default='self',
+            help='Order modules by their own import time or including their imports.'
+        )
+        parser.add_argument('--limit', type=int, default=25, help='Number of listed modules and packages.')
+        parser.add_argument('--output', help='Write the JSON results to this file.')
+        parser.add_argument('--compare', help='JSON results of an earlier run to compare with.')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+        try:
+            results = profile_cold_start(path=options['path'], host=options['host'], repeat=options['repeat'])
+        except RuntimeError as e:
+            raise CommandError(e)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(results, output_file, indent=2)
+        old = None
+        if options['compare']:
+            with open(options['compare']) as old_file:
+                old = json.load(old_file)
+        self.write_report(results, old, options['sort'], options['limit'])
+
+    def write_report(self, results, old, sort, limit):
+        meta = results['meta']
+        self.stdout.write(
+            f"Cold start of main_blog.wsgi (median of {meta['repeat']}, GET {meta['path']} -> {meta['status']}):"
+        )
+        for key, label in (
+            ('import_ms', 'import'),
+            ('first_response_ms', 'first response'),
+            ('total_ms', 'total')
+        ):
+            line = f'  {label:<16} {results[key]:>10.1f} ms'
+            if old is not None:
+                line += self.change(old[key], results[key])
+            self.stdout.write(line)
+        total = results['import_ms'] or 1
+        packages = sorted(results['packages'].items(), key=lambda item: item[1], reverse=True)
+        self.stdout.write('\nPackages by own import time:')
+        for package, self_ms in packages[:limit]:
+            line = f'  {package:<40} {self_ms:>10.1f} ms {self_ms / total:>6.1%}'
+            if old is not None and package in old['packages']:
+                line += self.change(old['packages'][package], self_ms)
+            self.stdout.write(line)
+        column = 0 if sort == 'self' else 1
+        modules = sorted(results['modules'].items(), key=lambda item: item[1][column], reverse=True)
+        self.stdout.write(f'\nModules by {sort} import time (ms):')
+        self.stdout.write(f"  {'module':<56} {'self':>10} {'cumulative':>11}")
+        for module, (self_ms, cumulative_ms) in modules[:limit]:
+            self.stdout.write(f'  {module:<56} {self_ms:>10.1f} {cumulative_ms:>11.1f}')
+        if old is not None:
+            new_modules = sorted(set(results['modules']) - set(old['modules']))
+            if new_modules:
+                self.stdout.write(f"\nModules not imported before: {', '.join(new_modules)}")
+
+    @staticmethod
+    def change(before, after):
+        if not before:
+            return ''
+        return f'  ({before:.1f} -> {after:.1f}, {(after - before) / before:+.1%})'
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog_entries.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Index all articles and comments again in the search index.'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.rebuild()
+        self.stdout.write(f'Search index rebuilt ({type(backend).__name__}).')
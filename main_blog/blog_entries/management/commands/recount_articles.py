@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog_auth.cache import invalidate_users
+from blog_auth.models import BlogProfile, User
+from blog_entries.models import Article
+
+
+class Command(BaseCommand):
+    help = 'Recompute BlogProfile.number_article of all profiles in one UPDATE.'
+
+    def handle(self, *args, **options):
+        articles_of_profile = Article.objects.filter(
+            author__user_profile=OuterRef('pk')
+        ).order_by().values('author__user_profile').annotate(
+            number=Count('id')
+        ).values('number')
+        profiles = BlogProfile.objects.all()
+        with transaction.atomic(using=profiles.db):
+            updated = profiles.update(
+                number_article=Coalesce(
+                    Subquery(articles_of_profile, output_field=IntegerField()), 0
+                )
+            )
+            # Cached users carry their profile.
+            invalidate_users(
+                User.objects.using(profiles.db).filter(user_profile__isnull=False).values_list('pk', flat=True).iterator(),
+                using=profiles.db
+            )
+        self.stdout.write(f'Recounted articles of {updated} profiles.')
@@ -0,0 +1,77 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_entries.profiling.benchmarks import compare, default_scenarios, run_benchmarks
+from blog_entries.profiling.data import benchmark_database, seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a temporary test database with synthetic data and measure latency, '
+        'query count and allocations of the main views. Results are printed as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Number of seeded users.')
+        parser.add_argument('--articles', type=int, default=200, help='Number of seeded articles.')
+        parser.add_argument('--comments', type=int, default=10, help='Number of comments per article.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the random data.')
+        parser.add_argument('--repeat', type=int, default=20, help='Measured requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests per scenario.')
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            help='Run only this scenario, can be repeated.'
+        )
+        parser.add_argument(
+            '--use-cache', action='store_true',
+            help='Keep the page cache between requests (measures cache hits).'
+        )
+        parser.add_argument(
+            '--startup', action='store_true',
+            help='Also measure import times in fresh interpreters (django.setup, country choices).'
+        )
+        parser.add_argument('--output', help='Write the JSON results to this file.')
+        parser.add_argument('--compare', help='JSON results of an earlier run to compare with.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 3:
+            raise CommandError('At least 3 users are needed by the scenarios.')
+        scenarios = default_scenarios()
+        if options['scenarios']:
+            known = {scenario.name for scenario in scenarios}
+            unknown = set(options['scenarios']) - known
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}.")
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['scenarios']]
+        scale = {
+            'users': options['users'],
+            'articles': options['articles'],
+            'comments_per_article': options['comments']
+        }
+        with benchmark_database():
+            seed(
+                users=options['users'],
+                articles=options['articles'],
+                comments_per_article=options['comments'],
+                random_seed=options['seed']
+            )
+            results = run_benchmarks(
+                scenarios,
+                repeat=options['repeat'],
+                warmup=options['warmup'],
+                use_cache=options['use_cache'],
+                scale=scale,
+                startup=options['startup']
+            )
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output)
+        else:
+            self.stdout.write(output)
+        if options['compare']:
+            with open(options['compare']) as old_file:
+                old = json.load(old_file)
+            for name, key, before, after, change in compare(old, results):
+                self.stderr.write(f'{name:<28} {key:<18} {before:>10} -> {after:>10} ({change:+.1%})')
@@ -1,6 +1,16 @@
-from django.db import models
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models import Case, DateTimeField, F, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import Cast
+from django.utils.timezone import now
+
+from blog_auth.cache import invalidate_users
+from blog_auth.models import BlogProfile
+from .cache import bump_article_version, bump_list_version
+from .votes import VoteBuffer
 
 class ArticleManager(models.Manager):
+    vote_buffer = VoteBuffer(interval=getattr(settings, 'VOTE_FLUSH_INTERVAL', 0))
 
     def create_article(self, author, title, entry, **extra_fields):
         article = self.model(
@@ -9,11 +19,123 @@ class ArticleManager(models.Manager):
             entry=entry, 
             **extra_fields
         )
-        article.save()
+        with transaction.atomic():
+            article.save()
+            self.count_articles(author_pk=article.author_id, number=1)
         return article
 
+    def count_articles(self, author_pk, number):
+        """
+        Add number to BlogProfile.number_article of the author, in one UPDATE.
+        """
+        if author_pk is None:
+            return
+        profiles = BlogProfile.objects.filter(user=author_pk)
+        profiles.update(number_article=F('number_article') + number)
+        invalidate_users([author_pk], using=profiles.db)
+
+    def count_comments(self, article_pk, number, commented_at=None):
+        """
+        Add number to Article.comment_count in one UPDATE, an added comment
+        also moves last_comment_at forward to commented_at (or now), never
+        back. Removed comments recompute it from the remaining ones: it is
+        kept if one of them is from its day or later, else it becomes the
+        start of the day of the newest one (comments keep only the date),
+        NULL without comments. Article list shows the count, so it is
+        invalidated.
+        """
+        if article_pk is None:
+            return
+        fields = {'comment_count': F('comment_count') + number, 'version': F('version') + 1}
+        if number > 0:
+            commented_at = commented_at or now()
+            # NULL > commented_at is not true, so an article without comments gets it.
+            fields['last_comment_at'] = Case(
+                When(last_comment_at__gt=commented_at, then=F('last_comment_at')),
+                default=Value(commented_at, output_field=DateTimeField())
+            )
+        elif number < 0:
+            from .models import Comment
+            last_date = Subquery(
+                Comment.objects.filter(article=OuterRef('pk')).order_by().values('article').annotate(
+                    last=Max('pub_date')
+                ).values('last')
+            )
+            fields['last_comment_at'] = Case(
+                When(last_comment_at__date__lte=last_date, then=F('last_comment_at')),
+                default=Cast(last_date, DateTimeField())
+            )
+        self.get_queryset().filter(pk=article_pk).update(**fields)
+        bump_list_version()
+
+    def visible_to(self, user):
+        """
+        Return articles user may read, adult content only for adult users.
+        """
+        if user.is_authenticated and user.check_is_adult():
+            return self.get_queryset()
+        return self.get_queryset().filter(for_adult=False)
+
+    def summary(self):
+        """
+        Return articles with only the columns the article list needs.
+        The entry body is left out, excerpt is shown instead.
+        """
+        return self.get_queryset().only(*self.model.SUMMARY_FIELDS)
+
+    def update_votes(self, article_pk, like=0, dislike=0):
+        """
+        Add to like/dislike counters in the database (UPDATE ... SET like = like + n),
+        so concurrent votes are never lost.
+        """
+        self.get_queryset().filter(pk=article_pk).update(
+            like=F('like') + like,
+            dislike=F('dislike') + dislike,
+            version=F('version') + 1
+        )
+        bump_article_version(article_pk)
+
+    def record_votes(self, article_pk, like=0, dislike=0):
+        """
+        Update counters at once, or through the vote buffer if VOTE_FLUSH_INTERVAL is set.
+        """
+        if not self.vote_buffer.enabled:
+            return self.update_votes(article_pk, like=like, dislike=dislike)
+        # A vote rolled back with its transaction must not stay in the buffer.
+        transaction.on_commit(lambda: self._buffer_votes(article_pk, like=like, dislike=dislike))
+
+    def _buffer_votes(self, article_pk, like, dislike):
+        if self.vote_buffer.add(article_pk, like=like, dislike=dislike):
+            self.flush_votes()
+        else:
+            # Written by the timer when no later vote flushes them.
+            self.vote_buffer.schedule(self._flush_votes_in_thread)
+
+    def flush_votes(self):
+        """
+        Write buffered votes, one UPDATE per article. Called also at exit.
+        """
+        for article_pk, (like, dislike) in self.vote_buffer.drain().items():
+            if like or dislike:
+                self.update_votes(article_pk, like=like, dislike=dislike)
+
+    def _flush_votes_in_thread(self):
+        try:
+            self.flush_votes()
+        finally:
+            # Connections of the timer thread are not closed by request_finished.
+            connections.close_all()
+
 class CommentManager(models.Manager):
 
+    def visible_to(self, user):
+        """
+        Return comments of articles user may read.
+        """
+        if user.is_authenticated and user.check_is_adult():
+            return self.get_queryset()
+        return self.get_queryset().filter(article__for_adult=False)
+
     def create_comment(self, owner, article, content_comment, **extra_fields):
         comment = self.model(
             owner=owner,
@@ -21,5 +143,34 @@ class CommentManager(models.Manager):
             content_comment=content_comment,
             **extra_fields
         )
-        comment.save()
-        return comment
\ No newline at end of file
+        with transaction.atomic():
+            comment.save()
+            if article is not None:
+                type(article).objects.count_comments(article_pk=article.pk, number=1)
+        return comment
+
+
+class VoteManager(models.Manager):
+
+    def vote(self, user, article, value):
+        """
+        Record vote of user. Voting again changes the vote,
+        counters of the article are moved accordingly.
+        """
+        like_value = self.model.LIKE
+        with transaction.atomic():
+            vote, created = self.get_queryset().select_for_update().get_or_create(
+                article=article,
+                user=user,
+                defaults={'value': value}
+            )
+            if created:
+                like, dislike = (1, 0) if value == like_value else (0, 1)
+            elif vote.value == value:
+                return vote
+            else:
+                vote.value = value
+                vote.save(update_fields=['value'])
+                like, dislike = (1, -1) if value == like_value else (-1, 1)
+            type(article).objects.record_votes(article.pk, like=like, dislike=dislike)
+        return vote
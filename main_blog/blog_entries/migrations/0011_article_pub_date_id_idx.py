@@ -0,0 +1,17 @@
+# Generated by Django 2.2.5 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_entries', '0010_auto_20190919_1608'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-pub_date', '-id'], name='article_pub_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.5 on 2026-10-18 16:38
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def fill_excerpt(apps, schema_editor):
+    Article = apps.get_model('blog_entries', 'Article')
+    for article in Article.objects.only('id', 'entry').iterator():
+        article.excerpt = Truncator(article.entry).chars(150)
+        article.save(update_fields=['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_entries', '0011_article_pub_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, help_text='Beginning of the blog entry, shown on the article list.', max_length=150, verbose_name='excerpt'),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.5 on 2026-10-18 16:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog_entries', '0012_article_excerpt'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='dislike',
+            field=models.PositiveIntegerField(default=0, verbose_name='you dislike it'),
+        ),
+        migrations.AlterField(
+            model_name='article',
+            name='like',
+            field=models.PositiveIntegerField(default=0, verbose_name='you like it'),
+        ),
+        migrations.CreateModel(
+            name='Vote',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.SmallIntegerField(choices=[(1, 'Like'), (-1, 'Dislike')], verbose_name='vote')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='blog_entries.Article')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'vote',
+                'verbose_name_plural': 'votes',
+                'unique_together': {('article', 'user')},
+            },
+        ),
+    ]
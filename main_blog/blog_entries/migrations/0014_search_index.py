@@ -0,0 +1,70 @@
+# Generated by Django 2.2.5 on 2026-10-18 16:50
+
+from django.db import migrations, OperationalError
+
+SEARCH_TABLE = 'blog_entries_search'
+
+
+def create_search_table(apps, schema_editor):
+    """
+    Full-text index table of the database. Without FTS5 (SQLite)
+    or on other databases the table is not created and search
+    falls back to the in-process index.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5('
+                'article_id UNINDEXED, title, body, '
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            return
+        # Columns: article_id, title, body.
+        schema_editor.execute(
+            f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rank) VALUES ('rank', 'bm25(0.0, 10.0, 1.0)')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, article_id, title, body) '
+            'SELECT -id, id, title, entry FROM blog_entries_article'
+        )
+        schema_editor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, article_id, title, body) "
+            "SELECT id, article_id, '', content_comment FROM blog_entries_comment "
+            'WHERE article_id IS NOT NULL'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE {SEARCH_TABLE} ('
+            'doc_id bigint PRIMARY KEY, article_id integer NOT NULL, document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING GIN (document)'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (doc_id, article_id, document) '
+            "SELECT -id, id, setweight(to_tsvector('simple', title), 'A') || "
+            "setweight(to_tsvector('simple', entry), 'B') FROM blog_entries_article"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (doc_id, article_id, document) '
+            "SELECT id, article_id, setweight(to_tsvector('simple', content_comment), 'B') "
+            'FROM blog_entries_comment WHERE article_id IS NOT NULL'
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_entries', '0013_vote'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.5 on 2026-10-18 16:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_entries', '0014_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(for_adult=False), fields=['-pub_date', '-id'], name='article_public_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['article', '-pub_date', '-id'], name='comment_article_pub_date_idx'),
+        ),
+        # comment_article_pub_date_idx starts with article_id, the single column index is redundant.
+        migrations.AlterField(
+            model_name='comment',
+            name='article',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='blog_entries.Article'),
+        ),
+    ]
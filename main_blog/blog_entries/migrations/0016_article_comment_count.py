@@ -0,0 +1,45 @@
+# Generated by Django 2.2.5 on 2026-10-18 16:52
+
+from datetime import datetime, time
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+from django.utils.timezone import make_aware
+
+
+def fill_comment_count(apps, schema_editor):
+    """
+    Comments keep only the date, last_comment_at gets the start of that day.
+    """
+    Article = apps.get_model('blog_entries', 'Article')
+    Comment = apps.get_model('blog_entries', 'Comment')
+    stats = Comment.objects.filter(article__isnull=False).values('article').annotate(
+        number=Count('id'),
+        last=Max('pub_date')
+    ).order_by()
+    for row in stats.iterator():
+        Article.objects.filter(pk=row['article']).update(
+            comment_count=row['number'],
+            last_comment_at=make_aware(datetime.combine(row['last'], time.min))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_entries', '0015_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='number of comments'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the last comment was added.', null=True, verbose_name='last comment'),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
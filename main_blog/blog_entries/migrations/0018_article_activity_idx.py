@@ -0,0 +1,17 @@
+# Generated by Django 2.2.5 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_entries', '0017_row_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-last_comment_at', '-id'], name='article_activity_idx'),
+        ),
+    ]
@@ -1,14 +1,59 @@
 from django.db import models
+from django.db.models import F
+from django.utils.text import Truncator
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinLengthValidator
 
 from blog_auth.models import User
-from .managers import ArticleManager, CommentManager
+from .managers import ArticleManager, CommentManager, VoteManager
 from .validators import check_is_digit_validator
 
 
+def save_versioned(instance, save, *args, **kwargs):
+    """
+    Save with version incremented by the database (version = version + 1),
+    like the counter UPDATEs do, so a stale instance never moves it back.
+    The new value is read back afterwards and returned; callbacks added by
+    after_version_saved in post_save receivers run then.
+    """
+    if instance._state.adding:
+        instance.version += 1
+        save(*args, **kwargs)
+        return instance.version
+    instance.version = F('version') + 1
+    instance._after_version_saved = []
+    try:
+        save(*args, **kwargs)
+    finally:
+        callbacks = instance.__dict__.pop('_after_version_saved')
+        if hasattr(instance.version, 'resolve_expression'):
+            instance.refresh_from_db(fields=['version'])
+    for callback in callbacks:
+        callback()
+    return instance.version
+
+
+def after_version_saved(instance, callback):
+    """
+    Call callback when instance.version holds the saved value: at once, or
+    in post_save of save_versioned after the value is read back.
+    """
+    callbacks = getattr(instance, '_after_version_saved', None)
+    if callbacks is None:
+        callback()
+    else:
+        callbacks.append(callback)
+
+
 class Article(models.Model):
+    EXCERPT_LENGTH = 150
+    SUMMARY_FIELDS = ['id', 'title', 'excerpt', 'pub_date', 'for_adult', 'comment_count', 'last_comment_at', 'version']
+    # Keys of KeysetPaginator for the ?sort= of the article lists.
+    SORT_KEYS = {
+        'date': ('pub_date', 'id'),
+        'activity': ('last_comment_at', 'id'),
+    }
     author = models.ForeignKey(
         to=User,
         on_delete=models.CASCADE,
@@ -20,11 +65,11 @@ class Article(models.Model):
         help_text=_('Enter the publication date of the article.'),
         default=now
     )
-    like = models.SmallIntegerField(
+    like = models.PositiveIntegerField(
         verbose_name=_('you like it'),
         default=0
     )
-    dislike = models.SmallIntegerField(
+    dislike = models.PositiveIntegerField(
         verbose_name=_('you dislike it'),
         default=0
     )
@@ -43,25 +88,84 @@ class Article(models.Model):
         verbose_name=_('adult content'),
         default=False
     )
+    excerpt = models.CharField(
+        verbose_name=_('excerpt'),
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+        help_text=_('Beginning of the blog entry, shown on the article list.')
+    )
+    comment_count = models.PositiveIntegerField(
+        verbose_name=_('number of comments'),
+        default=0,
+        editable=False
+    )
+    last_comment_at = models.DateTimeField(
+        verbose_name=_('last comment'),
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_('When the last comment was added.')
+    )
+    version = models.PositiveIntegerField(
+        verbose_name=_('version'),
+        default=0,
+        editable=False,
+        help_text=_('Incremented on every change, used for ETags.')
+    )
     objects = ArticleManager()
 
     class Meta:
         verbose_name = _('article')
         verbose_name_plural = _('articles')
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'], name='article_pub_date_id_idx'),
+            # The article list of anonymous and underage users.
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='article_public_pub_date_idx',
+                condition=models.Q(for_adult=False)
+            ),
+            # ?sort=activity, articles without comments (NULL) are read last by -id.
+            models.Index(fields=['-last_comment_at', '-id'], name='article_activity_idx'),
+        ]
     
+    @classmethod
+    def make_excerpt(cls, entry):
+        return Truncator(entry).chars(cls.EXCERPT_LENGTH)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'entry' in update_fields:
+            # Saves of other fields don't load the (maybe deferred) entry.
+            self.excerpt = self.make_excerpt(self.entry)
+        if update_fields is not None:
+            update_fields = set(update_fields) | {'version'}
+            if 'entry' in update_fields:
+                update_fields.add('excerpt')
+            kwargs['update_fields'] = update_fields
+        save_versioned(self, super().save, *args, **kwargs)
+
     def check_the_owner(self, author):
-        return self.author.username == author.username or author.is_superuser
+        """
+        Compare primary keys, so the author row doesn't have to be loaded.
+        """
+        if author.is_superuser:
+            return True
+        return author.pk is not None and self.author_id == author.pk
 
     def __str__(self):
         return self.title
 
 class Comment(models.Model):
+    # Indexed by comment_article_pub_date_idx.
     article = models.ForeignKey(
         to=Article,
         on_delete=models.CASCADE,
         blank=True,
-        null=True
+        null=True,
+        db_index=False
     )
     owner = models.ForeignKey(
         to=User,
@@ -80,10 +184,27 @@ class Comment(models.Model):
         validators=[MinLengthValidator(limit_value=10), check_is_digit_validator],
         help_text=_('Comment for entry blog.')
     )
+    version = models.PositiveIntegerField(
+        verbose_name=_('version'),
+        default=0,
+        editable=False,
+        help_text=_('Incremented on every change, used for ETags.')
+    )
     objects = CommentManager()
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'version'}
+        save_versioned(self, super().save, *args, **kwargs)
+
     def check_the_owner(self, author):
-        return self.owner.username == author.username or author.is_superuser
+        """
+        Compare primary keys, so the owner row doesn't have to be loaded.
+        """
+        if author.is_superuser:
+            return True
+        return author.pk is not None and self.owner_id == author.pk
 
     def __str__(self):
         return self.content_comment
@@ -99,9 +220,33 @@ class Comment(models.Model):
         verbose_name = _('comment')
         verbose_name_plural = _('comments')
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['article', '-pub_date', '-id'], name='comment_article_pub_date_idx'),
+        ]
+
+
+class Vote(models.Model):
+    LIKE = 1
+    DISLIKE = -1
+    VALUE_CHOICES = [
+        (LIKE, 'Like'),
+        (DISLIKE, 'Dislike')
+    ]
+    article = models.ForeignKey(
+        to=Article,
+        on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(
+        to=User,
+        on_delete=models.CASCADE
+    )
+    value = models.SmallIntegerField(
+        verbose_name=_('vote'),
+        choices=VALUE_CHOICES
+    )
+    objects = VoteManager()
 
-
-
-
-
-
+    class Meta:
+        verbose_name = _('vote')
+        verbose_name_plural = _('votes')
+        unique_together = [['article', 'user']]
@@ -0,0 +1,167 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+NEXT_PAGE = 'n'
+PREVIOUS_PAGE = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage:
+    """
+    One page of a keyset pagination. Exposes the same helpers as
+    django.core.paginator.Page that templates use.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginator which seeks by the last seen key instead of using OFFSET.
+    Rows are ordered descending by key_fields, so the key must be unique
+    (last field should be the primary key). Every page costs the same
+    index range scan, no matter how deep the client is. The first key
+    field may be NULL: those rows come last, ordered by the other fields,
+    and are read by a query of their own, so no query has to sort NULLs.
+    """
+    error_messages = {
+        'invalid_cursor': _('Invalid cursor.'),
+    }
+
+    def __init__(self, queryset, per_page, key_fields=('pub_date', 'id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.key_fields = tuple(key_fields)
+        self.nullable = queryset.model._meta.get_field(self.key_fields[0]).null
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, field) for field in self.key_fields]
+        raw = json.dumps([direction, values], cls=DjangoJSONEncoder)
+        return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            direction, values = json.loads(urlsafe_b64decode(cursor + padding).decode())
+        except (BinasciiError, UnicodeDecodeError, TypeError, ValueError):
+            raise InvalidCursor(self.error_messages['invalid_cursor'])
+        if (direction not in (NEXT_PAGE, PREVIOUS_PAGE) or not isinstance(values, list)
+                or len(values) != len(self.key_fields)):
+            raise InvalidCursor(self.error_messages['invalid_cursor'])
+        return direction, values
+
+    def _seek_filter(self, key_fields, values, lookup):
+        """
+        Build "row(key_fields) <lookup> row(values)" as OR of prefixes:
+        (a < x) OR (a = x AND b < y) OR ...
+        """
+        condition = Q()
+        for position, field in enumerate(key_fields):
+            prefix = {
+                key_fields[index]: values[index] for index in range(position)
+            }
+            prefix[f'{field}__{lookup}'] = values[position]
+            condition |= Q(**prefix)
+        return condition
+
+    def _parts(self):
+        """
+        Return [(queryset, key fields)] in descending order: rows with
+        a value of a nullable first key field, then the rows with NULL.
+        """
+        if not self.nullable:
+            return [(self.queryset, self.key_fields)]
+        first = self.key_fields[0]
+        return [
+            (self.queryset.filter(**{f'{first}__isnull': False}), self.key_fields),
+            (self.queryset.filter(**{f'{first}__isnull': True}), self.key_fields[1:])
+        ]
+
+    def _rows(self, direction, values, number):
+        """
+        Return number rows after values (in the order of direction), all
+        parts are read in turn until there are enough of them.
+        """
+        parts = self._parts()
+        start = 0
+        if values is not None and self.nullable and values[0] is None:
+            start, values = 1, values[1:]
+        if direction == NEXT_PAGE:
+            order, lookup = range(start, len(parts)), 'lt'
+        else:
+            order, lookup = range(start, -1, -1), 'gt'
+        rows = []
+        for index in order:
+            queryset, key_fields = parts[index]
+            if index == start and values is not None:
+                queryset = queryset.filter(self._seek_filter(key_fields, values, lookup))
+            if direction == NEXT_PAGE:
+                queryset = queryset.order_by(*[f'-{field}' for field in key_fields])
+            else:
+                queryset = queryset.order_by(*key_fields)
+            rows.extend(queryset[:number - len(rows)])
+            if len(rows) >= number:
+                break
+        return rows
+
+    def page(self, cursor=None):
+        """
+        Return the page which starts after (or, for previous cursors, ends
+        before) the row encoded in cursor. The first page when cursor is None.
+        """
+        if not cursor:
+            rows = self._rows(NEXT_PAGE, None, self.per_page + 1)
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            return KeysetPage(
+                object_list=rows,
+                paginator=self,
+                next_cursor=self.encode_cursor(rows[-1], NEXT_PAGE) if has_more else None
+            )
+        direction, values = self.decode_cursor(cursor)
+        try:
+            rows = self._rows(direction, values, self.per_page + 1)
+        except (ValidationError, ValueError, TypeError):
+            raise InvalidCursor(self.error_messages['invalid_cursor'])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS_PAGE:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(object_list=rows, paginator=self)
+        has_next = has_more if direction == NEXT_PAGE else True
+        has_previous = has_more if direction == PREVIOUS_PAGE else True
+        return KeysetPage(
+            object_list=rows,
+            paginator=self,
+            next_cursor=self.encode_cursor(rows[-1], NEXT_PAGE) if has_next else None,
+            previous_cursor=self.encode_cursor(rows[0], PREVIOUS_PAGE) if has_previous else None
+        )
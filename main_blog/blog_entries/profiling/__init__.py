@@ -0,0 +1,5 @@
+"""
+Tools of the performance commands: data seeds the temporary database,
+benchmarks measures the views, load the WSGI and ASGI entry points,
+startup the import and cold start times.
+"""
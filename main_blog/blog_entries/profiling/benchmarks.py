@@ -0,0 +1,163 @@
+import platform
+import statistics
+import tracemalloc
+from collections import OrderedDict
+from time import perf_counter
+
+import django
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+
+from blog_auth.models import User
+from .common import git_commit, percentile
+from .data import BENCHMARK_PASSWORD
+from .startup import measure_startup
+
+
+class Scenario:
+    """
+    One request of the benchmark. user is a username to log in (None for
+    anonymous), data are POST data or a callable returning them.
+    """
+
+    def __init__(self, name, url, method='get', user=None, data=None):
+        self.name = name
+        self.url = url
+        self.method = method
+        self.user = user
+        self.data = data
+
+    def client(self):
+        client = Client()
+        if self.user is not None:
+            client.force_login(User.objects.get(username=self.user))
+        return client
+
+    def request(self, client, number):
+        data = self.data(number) if callable(self.data) else self.data
+        response = getattr(client, self.method)(self.url, data=data or {})
+        if response.status_code >= 400:
+            raise RuntimeError(f'{self.name}: {self.url} returned {response.status_code}.')
+        return response
+
+
+def default_scenarios():
+    article_url = reverse('blog_entries:article_details', args=[1])
+    return [
+        Scenario('all_articles_anonymous', reverse('blog_entries:all_entries')),
+        Scenario('all_articles_adult', reverse('blog_entries:all_entries'), user='bench2'),
+        Scenario('main_blog_anonymous', article_url),
+        Scenario('main_blog_commenter', article_url, user='bench2'),
+        Scenario('main_blog_owner', article_url, user='bench1'),
+        Scenario('create_article_get', reverse('blog_entries:creata_article'), user='bench1'),
+        Scenario(
+            'create_article_post',
+            reverse('blog_entries:creata_article'),
+            method='post',
+            user='bench1',
+            data=lambda number: {
+                'title': f'Benchmark article number {number}',
+                'entry': 40 * 'Benchmark. '
+            }
+        ),
+        Scenario('sign_in_get', reverse('blog_auth:login')),
+        Scenario(
+            'sign_in_post',
+            reverse('blog_auth:login'),
+            method='post',
+            data={'username': 'bench3', 'password': BENCHMARK_PASSWORD}
+        ),
+    ]
+
+
+def measure(scenario, repeat=20, warmup=2, use_cache=False):
+    """
+    Return latency statistics (ms) of repeat requests, then query count and
+    memory allocated by one more request, traced separately so tracemalloc
+    doesn't distort the timings. The cache is cleared before every request
+    unless use_cache, so the view itself is measured, not the page cache.
+    """
+    client = scenario.client()
+    number = 0
+    for _ in range(warmup):
+        number += 1
+        scenario.request(client, number)
+    timings = []
+    for _ in range(repeat):
+        number += 1
+        if not use_cache:
+            cache.clear()
+        start = perf_counter()
+        scenario.request(client, number)
+        timings.append((perf_counter() - start) * 1000)
+    number += 1
+    if not use_cache:
+        cache.clear()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            scenario.request(client, number)
+        allocated, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return OrderedDict([
+        ('repeat', repeat),
+        ('latency_ms_min', round(min(timings), 3)),
+        ('latency_ms_median', round(statistics.median(timings), 3)),
+        ('latency_ms_mean', round(statistics.mean(timings), 3)),
+        ('latency_ms_p95', round(percentile(timings, 0.95), 3)),
+        ('latency_ms_max', round(max(timings), 3)),
+        ('queries', len(queries)),
+        ('allocated_bytes', allocated),
+        ('peak_allocated_bytes', peak),
+    ])
+
+
+def run_benchmarks(scenarios=None, repeat=20, warmup=2, use_cache=False, scale=None, startup=False):
+    """
+    Measure scenarios, return JSON serializable results with metadata.
+    With startup, import times of STARTUP_STATEMENTS are added.
+    """
+    results = OrderedDict()
+    for scenario in scenarios or default_scenarios():
+        results[scenario.name] = measure(scenario, repeat=repeat, warmup=warmup, use_cache=use_cache)
+    benchmarks = OrderedDict([
+        ('meta', OrderedDict([
+            ('commit', git_commit()),
+            ('created', now().isoformat()),
+            ('python', platform.python_version()),
+            ('django', django.get_version()),
+            ('database', connection.vendor),
+            ('scale', scale or {}),
+            ('use_cache', use_cache),
+        ])),
+        ('results', results),
+    ])
+    if startup:
+        benchmarks['startup_ms'] = measure_startup()
+    return benchmarks
+
+
+def compare(old, new, field='latency_ms_median'):
+    """
+    Yield (scenario, key, old value, new value, relative change) of field
+    and of the query count, for scenarios present in both results, then
+    of the startup times measured in both.
+    """
+    for name, result in new['results'].items():
+        previous = old['results'].get(name)
+        if previous is None:
+            continue
+        for key in (field, 'queries'):
+            before, after = previous[key], result[key]
+            change = (after - before) / before if before else 0.0
+            yield name, key, before, after, change
+    for name, after in new.get('startup_ms', {}).items():
+        before = old.get('startup_ms', {}).get(name)
+        if before is None or after is None:
+            continue
+        yield 'startup', name, before, after, (after - before) / before if before else 0.0
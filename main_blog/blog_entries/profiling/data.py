@@ -0,0 +1,127 @@
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils.timezone import now
+
+from blog_auth.models import BlogProfile, User
+from ..importer import BulkImporter
+
+BENCHMARK_PASSWORD = 'benchmark123'
+WORDS = (
+    'python django blog article comment garden travel music code cache query '
+    'index page view model form user profile country review story'
+).split()
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def seed(users=20, articles=200, comments_per_article=10, adult_share=0.1, random_seed=0):
+    """
+    Fill an empty database with synthetic data. User 1 is the author of
+    article 1 and user 2 wrote some of its comments; every user has the
+    password BENCHMARK_PASSWORD. Articles and comments go through
+    BulkImporter, so counters and the search index are kept right.
+    """
+    rng = random.Random(random_seed)
+    password = make_password(BENCHMARK_PASSWORD)
+    date_birth = date(year=1990, month=1, day=1)
+    BlogProfile.objects.bulk_create([
+        BlogProfile(
+            id=number,
+            first_name='Bench',
+            last_name='Tester',
+            country='PL',
+            date_birth=date_birth,
+            adult_since=BlogProfile.get_adult_since(date_birth)
+        ) for number in range(1, users + 1)
+    ])
+    User.objects.bulk_create([
+        User(
+            id=number,
+            username=f'bench{number}',
+            email=f'bench{number}@example.com',
+            nick=f'bench{number}',
+            password=password,
+            is_active=True,
+            user_profile_id=number
+        ) for number in range(1, users + 1)
+    ])
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [BlogProfile, User]):
+            cursor.execute(sql)
+
+    def rows():
+        today = now().date()
+        for number in range(1, articles + 1):
+            yield number, {
+                'model': 'article',
+                'id': number,
+                'author_id': 1 if number == 1 else rng.randint(1, users),
+                'title': _text(rng, 4),
+                'entry': _text(rng, 60),
+                'for_adult': number != 1 and rng.random() < adult_share,
+                'pub_date': (today - timedelta(days=articles - number)).isoformat()
+            }
+        comment_pk = 0
+        for number in range(1, articles + 1):
+            for position in range(comments_per_article):
+                comment_pk += 1
+                yield comment_pk, {
+                    'model': 'comment',
+                    'id': comment_pk,
+                    'article_id': number,
+                    'owner_id': 2 if number == 1 and position % 2 else rng.randint(1, users),
+                    'content_comment': _text(rng, 8)
+                }
+
+    importer = BulkImporter()
+    importer.run(rows())
+    return importer.created
+
+
+@contextmanager
+def mirror_replicas(primary):
+    """
+    Point the aliases of DATABASE_REPLICAS at the database of primary, like
+    TEST['MIRROR'] does, so reads routed to a replica see the seeded rows
+    and not the real replica. The settings are restored on exit.
+    """
+    aliases = getattr(settings, 'DATABASE_REPLICAS', [])
+    old_settings = [connections.databases[alias] for alias in aliases]
+    for alias in aliases:
+        # Connections of other threads are built from connections.databases.
+        connections.databases[alias] = primary.settings_dict
+        connections[alias].close()
+        connections[alias].creation.set_as_test_mirror(primary.settings_dict)
+    try:
+        yield
+    finally:
+        for alias, settings_dict in zip(aliases, old_settings):
+            connections[alias].close()
+            connections.databases[alias] = settings_dict
+            connections[alias].settings_dict = settings_dict
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Temporary test database of the primary (DATABASE_PRIMARY) with the
+    replicas mirroring it, destroyed on exit.
+    """
+    primary = connections[getattr(settings, 'DATABASE_PRIMARY', DEFAULT_DB_ALIAS)]
+    setup_test_environment()
+    old_name = primary.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with mirror_replicas(primary):
+            yield
+    finally:
+        primary.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
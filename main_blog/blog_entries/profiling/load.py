@@ -0,0 +1,135 @@
+import asyncio
+import statistics
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from threading import BoundedSemaphore
+from time import perf_counter
+
+from django.core.wsgi import get_wsgi_application
+from django.urls import reverse
+
+from main_blog.asgi_adapter import WSGIToASGI
+from .common import percentile
+
+
+def default_load_paths():
+    """
+    Read paths of the load test, anonymous GET requests.
+    """
+    return [
+        reverse('blog_entries:all_entries'),
+        reverse('blog_entries:article_details', args=[1]),
+        reverse('blog_entries:article_comments', args=[1]),
+        reverse('blog_entries:search') + '?q=python',
+        reverse('blog_entries:api_articles'),
+        reverse('blog_entries:api_article_comments', args=[1]),
+    ]
+
+
+def _http_scope(path, host):
+    path, _, query_string = path.partition('?')
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': query_string.encode(),
+        'headers': [(b'host', host.encode())],
+        'server': (host, 80),
+        'client': ('127.0.0.1', 0),
+    }
+
+
+def _wsgi_request(application, path, host):
+    status = []
+    result = application(
+        WSGIToASGI.build_environ(_http_scope(path, host), b''),
+        lambda code, headers, exc_info=None: status.append(code)
+    )
+    try:
+        for _ in result:
+            pass
+    finally:
+        result.close()
+    return int(status[0].split(' ', 1)[0])
+
+
+async def _asgi_request(application, path, host):
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    status = []
+
+    async def receive():
+        return messages.pop() if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(_http_scope(path, host), receive, send)
+    return status[0]
+
+
+def load_test(interface, paths=None, requests=500, concurrency=50, threads=8, host='localhost'):
+    """
+    Send requests GET requests of paths (round robin) to the WSGI or the
+    ASGI application in this process, concurrency at a time, handled by
+    threads worker threads. Return throughput and latency (ms, including
+    the wait for a worker) like a server with that many threads would see.
+    """
+    paths = list(islice(cycle(paths or default_load_paths()), requests))
+    wsgi_application = get_wsgi_application()
+    timings = []
+    statuses = []
+    start = perf_counter()
+    if interface == 'wsgi':
+        # Requests beyond threads wait in the queue of the pool, like in the
+        # listen backlog of a threaded WSGI server.
+        slots = BoundedSemaphore(concurrency)
+
+        def client(path, request_start):
+            try:
+                statuses.append(_wsgi_request(wsgi_application, path, host))
+                timings.append((perf_counter() - request_start) * 1000)
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = []
+            for path in paths:
+                slots.acquire()
+                futures.append(executor.submit(client, path, perf_counter()))
+        for future in futures:
+            future.result()
+    elif interface == 'asgi':
+        application = WSGIToASGI(wsgi_application, max_workers=threads)
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def client(path):
+                async with semaphore:
+                    request_start = perf_counter()
+                    statuses.append(await _asgi_request(application, path, host))
+                    timings.append((perf_counter() - request_start) * 1000)
+
+            await asyncio.gather(*(client(path) for path in paths))
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(run())
+        finally:
+            loop.close()
+            application.executor.shutdown(wait=True)
+    else:
+        raise ValueError(f'Unknown interface {interface!r}.')
+    seconds = perf_counter() - start
+    return OrderedDict([
+        ('requests', requests),
+        ('concurrency', concurrency),
+        ('threads', threads),
+        ('errors', sum(1 for status in statuses if status >= 400)),
+        ('seconds', round(seconds, 3)),
+        ('requests_per_second', round(requests / seconds, 1)),
+        ('latency_ms_median', round(statistics.median(timings), 3)),
+        ('latency_ms_p95', round(percentile(timings, 0.95), 3)),
+    ])
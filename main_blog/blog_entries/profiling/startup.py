@@ -0,0 +1,153 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from collections import OrderedDict
+
+import django
+from django.conf import settings
+from django.utils.timezone import now
+
+from .common import git_commit
+
+STARTUP_STATEMENTS = OrderedDict([
+    ('django_setup', 'import django; django.setup()'),
+    ('country_choices_pycountry', 'import pycountry; [(c.alpha_2, c.name) for c in pycountry.countries]'),
+    ('country_choices_static', 'from blog_auth.countries import COUNTRIES'),
+])
+_STARTUP_SCRIPT = (
+    'import sys, time\n'
+    'start = time.perf_counter()\n'
+    'exec(sys.argv[1])\n'
+    'print((time.perf_counter() - start) * 1000)\n'
+)
+
+
+def measure_startup(statements=None, repeat=5):
+    """
+    Return the median time (ms) of every statement run in a fresh
+    interpreter, so nothing is imported yet. None if it failed (e.g.
+    pycountry isn't installed).
+    """
+    environment = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+        'DJANGO_SETTINGS_MODULE', 'main_blog.settings'
+    ))
+    results = OrderedDict()
+    for name, statement in (statements or STARTUP_STATEMENTS).items():
+        timings = []
+        for _ in range(repeat):
+            process = subprocess.run(
+                [sys.executable, '-c', _STARTUP_SCRIPT, statement],
+                cwd=settings.BASE_DIR,
+                env=environment,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            if process.returncode:
+                break
+            timings.append(float(process.stdout))
+        results[name] = round(statistics.median(timings), 3) if len(timings) == repeat else None
+    return results
+
+
+_COLD_START_SCRIPT = (
+    'import json, sys, time\n'
+    'start = time.perf_counter()\n'
+    'from main_blog.wsgi import application\n'
+    'loaded = time.perf_counter()\n'
+    'path, host = sys.argv[1:3]\n'
+    'environ = {\n'
+    '    "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": "", "SCRIPT_NAME": "",\n'
+    '    "SERVER_NAME": host, "SERVER_PORT": "80", "HTTP_HOST": host, "SERVER_PROTOCOL": "HTTP/1.1",\n'
+    '    "wsgi.version": (1, 0), "wsgi.url_scheme": "http", "wsgi.input": sys.stdin.buffer,\n'
+    '    "wsgi.errors": sys.stderr, "wsgi.multithread": False, "wsgi.multiprocess": True,\n'
+    '    "wsgi.run_once": False,\n'
+    '}\n'
+    'status = []\n'
+    'body = application(environ, lambda code, headers, exc_info=None: status.append(code))\n'
+    'b"".join(body)\n'
+    'answered = time.perf_counter()\n'
+    'print(json.dumps({\n'
+    '    "import_ms": (loaded - start) * 1000,\n'
+    '    "first_response_ms": (answered - loaded) * 1000,\n'
+    '    "status": status[0].split()[0],\n'
+    '}))\n'
+)
+
+
+def parse_importtime(output):
+    """
+    Return {module: (self ms, cumulative ms)} of python -X importtime output.
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        try:
+            modules[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+        except ValueError:
+            # The header line.
+            continue
+    return modules
+
+
+def profile_cold_start(path='/', host='localhost', repeat=3):
+    """
+    Start fresh interpreters which import main_blog.wsgi and answer one GET
+    request of path, like a newly booted worker. Return medians of the
+    import time, the time to the first response and the import time of
+    every module (self and cumulative, ms), with the self time summed by
+    top level package.
+    """
+    environment = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+        'DJANGO_SETTINGS_MODULE', 'main_blog.settings'
+    ))
+    runs = []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _COLD_START_SCRIPT, path, host],
+            cwd=settings.BASE_DIR,
+            env=environment,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+        if process.returncode:
+            errors = [line for line in process.stderr.splitlines() if not line.startswith('import time:')]
+            raise RuntimeError('Cold start failed:\n' + '\n'.join(errors[-20:]))
+        run = json.loads(process.stdout.strip().splitlines()[-1])
+        run['modules'] = parse_importtime(process.stderr)
+        runs.append(run)
+    modules = OrderedDict()
+    for name in sorted(set().union(*(run['modules'] for run in runs))):
+        timings = [run['modules'][name] for run in runs if name in run['modules']]
+        modules[name] = (
+            round(statistics.median(timing[0] for timing in timings), 3),
+            round(statistics.median(timing[1] for timing in timings), 3)
+        )
+    packages = OrderedDict()
+    for name, (self_ms, _) in modules.items():
+        package = name.split('.')[0]
+        packages[package] = round(packages.get(package, 0) + self_ms, 3)
+    import_ms = statistics.median(run['import_ms'] for run in runs)
+    first_response_ms = statistics.median(run['first_response_ms'] for run in runs)
+    return OrderedDict([
+        ('meta', OrderedDict([
+            ('commit', git_commit()),
+            ('created', now().isoformat()),
+            ('python', platform.python_version()),
+            ('django', django.get_version()),
+            ('path', path),
+            ('status', runs[-1]['status']),
+            ('repeat', repeat),
+        ])),
+        ('import_ms', round(import_ms, 3)),
+        ('first_response_ms', round(first_response_ms, 3)),
+        ('total_ms', round(import_ms + first_response_ms, 3)),
+        ('packages', packages),
+        ('modules', modules),
+    ])
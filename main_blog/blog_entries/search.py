@@ -0,0 +1,394 @@
+import atexit
+import logging
+import re
+from collections import defaultdict
+from threading import RLock, Thread
+from time import sleep
+from unicodedata import category, normalize
+
+from django.conf import settings
+from django.db import connection, connections
+from django.utils.module_loading import import_string
+
+from .search_engine import SearchEngine
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'blog_entries_search'
+TITLE_WEIGHT = 10.0
+ENTRY_WEIGHT = 1.0
+COMMENT_WEIGHT = 1.0
+RECONCILE_BATCH_SIZE = 500
+
+_word_re = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """
+    Split text to lower case words without diacritics.
+    """
+    text = normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if category(char) != 'Mn')
+    return _word_re.findall(text)
+
+
+def article_doc_id(article_pk):
+    """
+    Every article and every comment is one document of the index.
+    Articles get negative ids, comments their own positive pk.
+    """
+    return -article_pk
+
+
+class BaseSearchBackend:
+    """
+    Search index over Article.title, Article.entry and Comment.content_comment.
+    Results are articles, ranked by their best matching document.
+    """
+
+    def index_article(self, article):
+        raise NotImplementedError
+
+    def remove_article(self, article_pk):
+        raise NotImplementedError
+
+    def index_comment(self, comment):
+        raise NotImplementedError
+
+    def remove_comment(self, comment_pk):
+        raise NotImplementedError
+
+    def hits(self, terms, include_adult, limit, offset):
+        """Return list of (article_pk, score), best first."""
+        raise NotImplementedError
+
+    def count(self, terms, include_adult):
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Index all articles and comments again."""
+        from .models import Article, Comment
+        self.clear()
+        for article in Article.objects.only('id', 'title', 'entry', 'for_adult', 'version').iterator():
+            self.index_article(article)
+        for comment in Comment.objects.only('id', 'article', 'content_comment', 'version').iterator():
+            self.index_comment(comment)
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 virtual table, ranked by bm25 (the rank column is configured
+    with column weights in the migration).
+    """
+
+    def _execute(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def _match(self, terms):
+        return ' '.join('"%s"' % term for term in terms)
+
+    def _replace(self, doc_id, article_pk, title, body):
+        self._execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [doc_id])
+        self._execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, article_id, title, body) VALUES (%s, %s, %s, %s)',
+            [doc_id, article_pk, title, body]
+        )
+
+    def index_article(self, article):
+        self._replace(article_doc_id(article.pk), article.pk, article.title, article.entry)
+
+    def remove_article(self, article_pk):
+        self._execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [article_doc_id(article_pk)])
+
+    def index_comment(self, comment):
+        if comment.article_id is None:
+            return
+        self._replace(comment.pk, comment.article_id, '', comment.content_comment)
+
+    def remove_comment(self, comment_pk):
+        self._execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [comment_pk])
+
+    def _matching(self, include_adult):
+        adult_filter = '' if include_adult else 'WHERE NOT a.for_adult'
+        return (
+            f'FROM (SELECT article_id, rank AS score FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s) s '
+            f'JOIN blog_entries_article a ON a.id = s.article_id {adult_filter}'
+        )
+
+    def hits(self, terms, include_adult, limit, offset):
+        # bm25 is negative, lower is better.
+        rows = self._execute(
+            f'SELECT s.article_id, MIN(s.score) AS best {self._matching(include_adult)} '
+            'GROUP BY s.article_id ORDER BY best, s.article_id LIMIT %s OFFSET %s',
+            [self._match(terms), limit, offset]
+        )
+        return [(article_pk, -score) for article_pk, score in rows]
+
+    def count(self, terms, include_adult):
+        rows = self._execute(
+            f'SELECT COUNT(DISTINCT s.article_id) {self._matching(include_adult)}',
+            [self._match(terms)]
+        )
+        return rows[0][0]
+
+    def clear(self):
+        self._execute(f'DELETE FROM {SEARCH_TABLE}')
+
+
+class PostgreSQLSearchBackend(SQLiteSearchBackend):
+    """
+    Table with tsvector column and GIN index (created by the migration),
+    ranked by ts_rank. Title has weight A, entry and comments weight B.
+    """
+
+    def _match(self, terms):
+        return ' & '.join(terms)
+
+    def _replace(self, doc_id, article_pk, title, body):
+        self._execute(
+            f'INSERT INTO {SEARCH_TABLE} (doc_id, article_id, document) VALUES (%s, %s, '
+            "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+            'ON CONFLICT (doc_id) DO UPDATE SET article_id = EXCLUDED.article_id, document = EXCLUDED.document',
+            [doc_id, article_pk, title, body]
+        )
+
+    def remove_article(self, article_pk):
+        self._execute(f'DELETE FROM {SEARCH_TABLE} WHERE doc_id = %s', [article_doc_id(article_pk)])
+
+    def remove_comment(self, comment_pk):
+        self._execute(f'DELETE FROM {SEARCH_TABLE} WHERE doc_id = %s', [comment_pk])
+
+    def _matching(self, include_adult):
+        adult_filter = '' if include_adult else 'AND NOT a.for_adult'
+        return (
+            f"FROM {SEARCH_TABLE} s, to_tsquery('simple', %s) query, blog_entries_article a "
+            f'WHERE s.document @@ query AND a.id = s.article_id {adult_filter}'
+        )
+
+    def hits(self, terms, include_adult, limit, offset):
+        rows = self._execute(
+            f'SELECT s.article_id, MAX(ts_rank(s.document, query)) AS best {self._matching(include_adult)} '
+            'GROUP BY s.article_id ORDER BY best DESC, s.article_id LIMIT %s OFFSET %s',
+            [self._match(terms), limit, offset]
+        )
+        return rows
+
+
+class PythonSearchBackend(BaseSearchBackend):
+    """
+    In-process inverted index (search_engine.SearchEngine) for databases
+    without full-text search, kept current by signals of this process.
+    With SEARCH_INDEX_DIR setting its segments are persisted there and
+    loaded on start. Every document is stamped with the version of its row.
+    Searches never touch the database: maintain() builds an empty index
+    from the database, else compares the documents with it, so changes
+    lost in a crash or made by other processes are indexed again. It runs
+    in a background thread (start_maintenance) every
+    SEARCH_INDEX_RECONCILE_INTERVAL seconds; until the first run ends,
+    searches read the index as it is.
+    """
+
+    def __init__(self, path=None):
+        self._lock = RLock()
+        self._maintenance = None
+        self._adult = set()
+        self._ranking = None
+        self._engine = SearchEngine(
+            path=path or getattr(settings, 'SEARCH_INDEX_DIR', None),
+            buffer_size=getattr(settings, 'SEARCH_INDEX_BUFFER_SIZE', 1000),
+            merge_factor=getattr(settings, 'SEARCH_INDEX_MERGE_FACTOR', 8)
+        )
+        if self._engine.path is not None:
+            atexit.register(self._engine.close)
+
+    def clear(self):
+        self._engine.clear()
+        self._adult = set()
+
+    def rebuild(self):
+        with self._lock:
+            super().rebuild()
+            self._engine.flush()
+
+    def reconcile(self):
+        """
+        Index again documents whose row version differs from their stamp
+        and remove documents of deleted rows.
+        """
+        from .models import Article, Comment
+        indexed = self._engine.stamps()
+        current = {
+            article_doc_id(article_pk): version
+            for article_pk, version in Article.objects.values_list('pk', 'version').iterator()
+        }
+        current.update(Comment.objects.values_list('pk', 'version').iterator())
+        for doc_id in set(indexed) - set(current):
+            self._engine.delete(doc_id)
+        stale = [doc_id for doc_id, version in current.items() if indexed.get(doc_id) != version]
+        for start in range(0, len(stale), RECONCILE_BATCH_SIZE):
+            batch = stale[start:start + RECONCILE_BATCH_SIZE]
+            articles = Article.objects.filter(pk__in=[-doc_id for doc_id in batch if doc_id < 0])
+            for article in articles.only('id', 'title', 'entry', 'for_adult', 'version'):
+                self.index_article(article)
+            comments = Comment.objects.filter(pk__in=[doc_id for doc_id in batch if doc_id > 0])
+            for comment in comments.only('id', 'article', 'content_comment', 'version'):
+                self.index_comment(comment)
+        self._adult = set(Article.objects.filter(for_adult=True).values_list('pk', flat=True))
+        self._engine.flush()
+
+    def maintain(self):
+        """Build the index if it is empty, else reconcile it."""
+        with self._lock:
+            if len(self._engine):
+                self.reconcile()
+            else:
+                self.rebuild()
+
+    def start_maintenance(self):
+        """
+        Run maintain() in a daemon thread now and then every
+        SEARCH_INDEX_RECONCILE_INTERVAL seconds (only once if it is None).
+        """
+        if self._maintenance is None:
+            self._maintenance = Thread(target=self._maintain_periodically, name='search-index', daemon=True)
+            self._maintenance.start()
+
+    def _maintain_periodically(self):
+        interval = getattr(settings, 'SEARCH_INDEX_RECONCILE_INTERVAL', 60)
+        while True:
+            try:
+                self.maintain()
+            except Exception:
+                logger.exception('Search index maintenance failed.')
+            finally:
+                connections.close_all()
+            if interval is None:
+                return
+            sleep(interval)
+
+    def _add(self, doc_id, article_pk, weighted_texts, stamp):
+        frequencies = defaultdict(float)
+        for text, weight in weighted_texts:
+            for term in tokenize(text):
+                frequencies[term] += weight
+        self._engine.add(doc_id, article_pk, dict(frequencies), stamp=stamp)
+
+    def index_article(self, article):
+        if article.for_adult:
+            self._adult.add(article.pk)
+        else:
+            self._adult.discard(article.pk)
+        self._add(
+            article_doc_id(article.pk),
+            article.pk,
+            [(article.title, TITLE_WEIGHT), (article.entry, ENTRY_WEIGHT)],
+            article.version
+        )
+
+    def remove_article(self, article_pk):
+        self._engine.delete(article_doc_id(article_pk))
+        self._adult.discard(article_pk)
+
+    def index_comment(self, comment):
+        if comment.article_id is None:
+            return
+        self._add(comment.pk, comment.article_id, [(comment.content_comment, COMMENT_WEIGHT)], comment.version)
+
+    def remove_comment(self, comment_pk):
+        self._engine.delete(comment_pk)
+
+    def _search(self, terms, include_adult, k=None):
+        exclude = () if include_adult else self._adult
+        key = (tuple(terms), include_adult, self._engine.version)
+        ranking = self._ranking
+        if ranking is not None and ranking[0] == key and (ranking[1] is None or k is not None and k <= ranking[1]):
+            return ranking[2][:k]
+        ranked = self._engine.search(terms, k=k, exclude=exclude)
+        # Paginator asks for count and then for one page of the same query.
+        self._ranking = (key, k, ranked)
+        return ranked
+
+    def hits(self, terms, include_adult, limit, offset):
+        return self._search(terms, include_adult, k=offset + limit)[offset:]
+
+    def count(self, terms, include_adult):
+        return len(self._search(terms, include_adult))
+
+
+_backend = None
+
+
+def search_table_exists():
+    with connection.cursor() as cursor:
+        return SEARCH_TABLE in connection.introspection.table_names(cursor)
+
+
+def get_search_backend():
+    """
+    Return backend set in SEARCH_BACKEND setting (dotted path), else the
+    full-text search of the database when the migration could create
+    its table, else the in-process index, whose maintenance starts here.
+    """
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, 'SEARCH_BACKEND', None)
+        if backend_path:
+            _backend = import_string(backend_path)()
+        elif connection.vendor == 'postgresql':
+            _backend = PostgreSQLSearchBackend()
+        elif connection.vendor == 'sqlite' and search_table_exists():
+            _backend = SQLiteSearchBackend()
+        else:
+            _backend = PythonSearchBackend()
+        if isinstance(_backend, PythonSearchBackend):
+            _backend.start_maintenance()
+    return _backend
+
+
+class SearchResults:
+    """
+    Lazy, sliceable list of found articles, so it works with django Paginator.
+    Every article gets search_score attribute.
+    """
+
+    def __init__(self, query, include_adult, backend=None):
+        self.terms = tokenize(query)
+        self.include_adult = include_adult
+        self.backend = backend or get_search_backend()
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.terms, self.include_adult) if self.terms else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        offset = key.start or 0
+        limit = (key.stop if key.stop is not None else self.count()) - offset
+        if not self.terms or limit <= 0:
+            return []
+        from .models import Article
+        hits = self.backend.hits(self.terms, self.include_adult, limit=limit, offset=offset)
+        articles = Article.objects.summary()
+        if not self.include_adult:
+            # The in-process index knows adult articles only after its maintenance ran.
+            articles = articles.filter(for_adult=False)
+        articles = articles.in_bulk([article_pk for article_pk, _ in hits])
+        results = []
+        for article_pk, score in hits:
+            article = articles.get(article_pk)
+            if article is not None:
+                article.search_score = score
+                results.append(article)
+        return results
@@ -0,0 +1,523 @@
+import heapq
+import json
+import logging
+import mmap
+import os
+import struct
+import uuid
+from array import array
+from collections import defaultdict
+from math import log
+from threading import RLock, Thread
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'BLOGSEG2'
+MANIFEST = 'manifest.json'
+LOCK = 'writer.lock'
+ALIGNMENT = 8
+
+# Array type codes of the segment columns.
+OFFSET_TYPE = 'q'
+POSITION_TYPE = 'i'
+FREQUENCY_TYPE = 'f'
+ID_TYPE = 'q'
+LENGTH_TYPE = 'f'
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class Segment:
+    """
+    Immutable part of the index. Terms are sorted, postings of term i are
+    positions[offsets[i]:offsets[i + 1]] (indexes into the document table)
+    with their weighted term frequencies. Every document has a stamp given
+    by the caller (the row version), to find documents older than their
+    source. All columns are flat arrays, either array.array or memoryview
+    of a memory-mapped segment file.
+    """
+
+    def __init__(self, generation, terms, offsets, positions, frequencies,
+                 doc_ids, article_ids, lengths, stamps, name=None):
+        self.generation = generation
+        self.terms = terms
+        self.term_index = {term: index for index, term in enumerate(terms)}
+        self.offsets = offsets
+        self.positions = positions
+        self.frequencies = frequencies
+        self.doc_ids = doc_ids
+        self.article_ids = article_ids
+        self.lengths = lengths
+        self.stamps = stamps
+        self.name = name
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    @classmethod
+    def build(cls, generation, documents):
+        """
+        documents: {doc_id: (article_id, length, {term: frequency}, stamp)}
+        """
+        doc_ids = array(ID_TYPE, sorted(documents))
+        article_ids = array(ID_TYPE)
+        lengths = array(LENGTH_TYPE)
+        stamps = array(ID_TYPE)
+        postings = defaultdict(list)
+        for position, doc_id in enumerate(doc_ids):
+            article_id, length, term_frequencies, stamp = documents[doc_id]
+            article_ids.append(article_id)
+            lengths.append(length)
+            stamps.append(stamp)
+            for term, frequency in term_frequencies.items():
+                postings[term].append((position, frequency))
+        terms = sorted(postings)
+        offsets = array(OFFSET_TYPE, [0])
+        positions = array(POSITION_TYPE)
+        frequencies = array(FREQUENCY_TYPE)
+        for term in terms:
+            for position, frequency in postings[term]:
+                positions.append(position)
+                frequencies.append(frequency)
+            offsets.append(len(positions))
+        return cls(generation, terms, offsets, positions, frequencies,
+                   doc_ids, article_ids, lengths, stamps)
+
+    def postings(self, term):
+        index = self.term_index.get(term)
+        if index is None:
+            return (), ()
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.positions[start:end], self.frequencies[start:end]
+
+    def documents(self, doc_ids=None):
+        """
+        Rebuild {doc_id: (article_id, length, {term: frequency}, stamp)},
+        only of doc_ids if given. Used by merges.
+        """
+        wanted = None
+        if doc_ids is not None:
+            wanted = {position for position, doc_id in enumerate(self.doc_ids) if doc_id in doc_ids}
+        term_frequencies = defaultdict(dict)
+        for index, term in enumerate(self.terms):
+            start, end = self.offsets[index], self.offsets[index + 1]
+            for position, frequency in zip(self.positions[start:end], self.frequencies[start:end]):
+                if wanted is None or position in wanted:
+                    term_frequencies[position][term] = frequency
+        return {
+            self.doc_ids[position]: (
+                self.article_ids[position],
+                self.lengths[position],
+                term_frequencies.get(position, {}),
+                self.stamps[position]
+            )
+            for position in range(len(self.doc_ids))
+            if wanted is None or position in wanted
+        }
+
+    def _columns(self):
+        return (self.offsets, self.positions, self.frequencies,
+                self.doc_ids, self.article_ids, self.lengths, self.stamps)
+
+    def write(self, path):
+        header = json.dumps({
+            'generation': self.generation,
+            'terms': self.terms,
+            'sizes': [len(column) for column in self._columns()]
+        }).encode()
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as segment_file:
+            segment_file.write(MAGIC)
+            segment_file.write(struct.pack('<Q', len(header)))
+            segment_file.write(header)
+            for column in self._columns():
+                segment_file.write(b'\0' * (_align(segment_file.tell()) - segment_file.tell()))
+                segment_file.write(bytes(memoryview(column).cast('B')))
+            segment_file.flush()
+            os.fsync(segment_file.fileno())
+        os.replace(temporary, path)
+        self.name = os.path.basename(path)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Map segment file to memory. Columns are read by the OS on demand.
+        """
+        with open(path, 'rb') as segment_file:
+            mapped = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not a segment file.')
+        header_length, = struct.unpack_from('<Q', mapped, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(mapped[start:start + header_length].decode())
+        view = memoryview(mapped)
+        offset = start + header_length
+        columns = []
+        type_codes = (OFFSET_TYPE, POSITION_TYPE, FREQUENCY_TYPE, ID_TYPE, ID_TYPE, LENGTH_TYPE, ID_TYPE)
+        for type_code, size in zip(type_codes, header['sizes']):
+            offset = _align(offset)
+            length = size * struct.calcsize(type_code)
+            columns.append(view[offset:offset + length].cast(type_code))
+            offset += length
+        return cls(header['generation'], header['terms'], *columns, name=os.path.basename(path))
+
+
+class SearchEngine:
+    """
+    Incremental inverted index with BM25 ranking.
+
+    New and changed documents go to an in-memory buffer, which is written
+    as an immutable segment when it has buffer_size documents. A document
+    is live only in the newest segment which contains it. When there are
+    merge_factor segments, they are merged into one in a background thread,
+    dropping dead documents. With path, segments are persisted as
+    memory-mapped files and the index is loaded on start. Engines of
+    several processes may share one path: the one holding the writer lock
+    persists, the others load the index and keep their changes in memory.
+    An index which can't be read is loaded empty.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, path=None, buffer_size=1000, merge_factor=8, background_merge=True):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.merge_factor = merge_factor
+        self.background_merge = background_merge
+        self._lock = RLock()
+        self._segments = []
+        self._buffer = {}
+        self._buffer_postings = defaultdict(dict)
+        self._live = {}
+        self._deleted = {}
+        self._total_length = 0.0
+        self._generation = 0
+        self._merging = None
+        self._lock_file = None
+        self.version = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._lock_file = self._acquire_writer_lock()
+            try:
+                self._load()
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning('Search index in %s can not be loaded, starting empty: %s', path, e)
+                self._segments = []
+                self._live = {}
+                self._deleted = {}
+                self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._live)
+
+    def _acquire_writer_lock(self):
+        """
+        Return the open lock file if this engine is the writer of path,
+        None if another process is. Without fcntl every engine writes.
+        """
+        lock_file = open(os.path.join(self.path, LOCK), 'a')
+        if fcntl is None:
+            return lock_file
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    @property
+    def writable(self):
+        """Whether changes are persisted to path."""
+        return self._lock_file is not None
+
+    def _segment_path(self, generation):
+        return os.path.join(self.path, f'segment_{generation}_{uuid.uuid4().hex}.bin')
+
+    @property
+    def segments(self):
+        return list(self._segments)
+
+    def _load(self):
+        manifest_path = os.path.join(self.path, MANIFEST)
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+        self._generation = manifest['generation']
+        self._deleted = {int(doc_id): generation for doc_id, generation in manifest['deleted'].items()}
+        for name in manifest['segments']:
+            segment = Segment.open(os.path.join(self.path, name))
+            self._segments.append(segment)
+            for position, doc_id in enumerate(segment.doc_ids):
+                if self._deleted.get(doc_id, -1) > segment.generation:
+                    continue
+                self._set_live(doc_id, segment, segment.lengths[position])
+
+    def _write_manifest(self):
+        if not self.writable:
+            return
+        manifest_path = os.path.join(self.path, MANIFEST)
+        with open(manifest_path + '.tmp', 'w') as manifest_file:
+            json.dump({
+                'generation': self._generation,
+                'segments': [segment.name for segment in self._segments],
+                'deleted': self._deleted
+            }, manifest_file)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    def _set_live(self, doc_id, segment, length):
+        previous = self._live.get(doc_id)
+        if previous is not None:
+            self._total_length -= previous[1]
+        self._live[doc_id] = (segment, length)
+        self._total_length += length
+
+    def _unset_live(self, doc_id):
+        previous = self._live.pop(doc_id, None)
+        if previous is not None:
+            self._total_length -= previous[1]
+
+    def _drop_from_buffer(self, doc_id):
+        document = self._buffer.pop(doc_id, None)
+        if document is None:
+            return
+        for term in document[2]:
+            postings = self._buffer_postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._buffer_postings[term]
+
+    def add(self, doc_id, article_id, term_frequencies, stamp=0):
+        """
+        Add or replace document. term_frequencies: {term: weighted frequency}.
+        """
+        length = float(sum(term_frequencies.values()))
+        with self._lock:
+            self._drop_from_buffer(doc_id)
+            self._deleted.pop(doc_id, None)
+            self._buffer[doc_id] = (article_id, length, term_frequencies, stamp)
+            for term, frequency in term_frequencies.items():
+                self._buffer_postings[term][doc_id] = frequency
+            self._set_live(doc_id, None, length)
+            self.version += 1
+            if len(self._buffer) >= self.buffer_size:
+                self.flush()
+
+    def delete(self, doc_id):
+        with self._lock:
+            self._drop_from_buffer(doc_id)
+            if doc_id in self._live:
+                self._unset_live(doc_id)
+                # Every segment older than the current buffer loses the document.
+                self._deleted[doc_id] = self._generation
+            self.version += 1
+
+    def flush(self):
+        """
+        Write the buffer as a new segment (and save the manifest).
+        """
+        with self._lock:
+            if self._buffer:
+                segment = Segment.build(self._generation, self._buffer)
+                if self.writable:
+                    segment.write(self._segment_path(self._generation))
+                    segment = Segment.open(os.path.join(self.path, segment.name))
+                for position, doc_id in enumerate(segment.doc_ids):
+                    self._set_live(doc_id, segment, segment.lengths[position])
+                self._segments.append(segment)
+                self._buffer = {}
+                self._buffer_postings = defaultdict(dict)
+                self._generation += 1
+            self._write_manifest()
+            self._maybe_merge()
+
+    def _maybe_merge(self):
+        if len(self._segments) < self.merge_factor:
+            return
+        if self._merging is not None and self._merging.is_alive():
+            return
+        segments = list(self._segments)
+        if self.background_merge:
+            self._merging = Thread(target=self.merge, args=(segments,), daemon=True)
+            self._merging.start()
+        else:
+            self.merge(segments)
+
+    def merge(self, segments=None):
+        """
+        Merge segments (default all) into one. The heavy part runs without
+        the lock; documents changed meanwhile stay live in newer segments.
+        """
+        with self._lock:
+            segments = list(self._segments if segments is None else segments)
+            if len(segments) < 2:
+                return
+            live_docs = [
+                {doc_id for doc_id in segment.doc_ids if self._live.get(doc_id, (None,))[0] is segment}
+                for segment in segments
+            ]
+        documents = {}
+        for segment, doc_ids in zip(segments, live_docs):
+            documents.update(segment.documents(doc_ids))
+        generation = max(segment.generation for segment in segments)
+        merged = Segment.build(generation, documents)
+        if self.writable:
+            merged.write(self._segment_path(generation))
+            merged = Segment.open(os.path.join(self.path, merged.name))
+        with self._lock:
+            old = set(map(id, segments))
+            for position, doc_id in enumerate(merged.doc_ids):
+                current = self._live.get(doc_id)
+                if current is not None and id(current[0]) in old:
+                    self._live[doc_id] = (merged, current[1])
+            index = min(self._segments.index(segment) for segment in segments)
+            self._segments = [segment for segment in self._segments if id(segment) not in old]
+            self._segments.insert(index, merged)
+            # Tombstones older than the merged segment have nothing left to hide.
+            self._deleted = {
+                doc_id: deleted for doc_id, deleted in self._deleted.items() if deleted > generation
+            }
+            self._write_manifest()
+            self.version += 1
+        if self.writable:
+            for segment in segments:
+                try:
+                    os.remove(os.path.join(self.path, segment.name))
+                except (OSError, TypeError):
+                    pass
+
+    def wait_for_merge(self):
+        if self._merging is not None:
+            self._merging.join()
+
+    def _term_scores(self, term, number_documents, average_length, exclude):
+        sources = [(segment, *segment.postings(term)) for segment in self._segments]
+        buffered = self._buffer_postings.get(term, {})
+        document_frequency = sum(len(positions) for _, positions, _ in sources) + len(buffered)
+        if not document_frequency:
+            return {}
+        idf = log(1 + (number_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+        k1, b = self.k1, self.b
+        norm = k1 * (1 - b)
+        norm_length = k1 * b / average_length
+        scores = {}
+        live = self._live
+        for segment, positions, frequencies in sources:
+            doc_ids, article_ids, lengths = segment.doc_ids, segment.article_ids, segment.lengths
+            for position, frequency in zip(positions, frequencies):
+                if exclude and article_ids[position] in exclude:
+                    continue
+                doc_id = doc_ids[position]
+                if live.get(doc_id, (None,))[0] is not segment:
+                    continue
+                scores[doc_id] = idf * frequency * (k1 + 1) / (
+                    frequency + norm + norm_length * lengths[position]
+                )
+        for doc_id, frequency in buffered.items():
+            article_id, length, _, _ = self._buffer[doc_id]
+            if exclude and article_id in exclude:
+                continue
+            scores[doc_id] = idf * frequency * (k1 + 1) / (frequency + norm + norm_length * length)
+        return scores
+
+    def stamps(self):
+        """
+        Return {doc_id: stamp} of all live documents. Segments are read
+        without the lock, so searches don't wait; a document changed
+        meanwhile may get its old stamp.
+        """
+        with self._lock:
+            stamps = {doc_id: document[3] for doc_id, document in self._buffer.items()}
+            segments = list(self._segments)
+        live = self._live
+        for segment in segments:
+            for position, doc_id in enumerate(segment.doc_ids):
+                if live.get(doc_id, (None,))[0] is segment:
+                    stamps[doc_id] = segment.stamps[position]
+        return stamps
+
+    def _article_id(self, doc_id):
+        segment = self._live[doc_id][0]
+        if segment is None:
+            return self._buffer[doc_id][0]
+        return segment.article_ids[_position(segment, doc_id)]
+
+    def search(self, terms, k=None, exclude=()):
+        """
+        Return [(article_id, score)] of articles (not in exclude) whose some
+        document contains all terms, best first, the k best if k is given.
+        """
+        with self._lock:
+            number_documents = len(self._live)
+            if not number_documents or not terms:
+                return []
+            average_length = self._total_length / number_documents or 1.0
+            doc_scores = None
+            for term in sorted(set(terms)):
+                term_scores = self._term_scores(term, number_documents, average_length, exclude)
+                if doc_scores is None:
+                    doc_scores = term_scores
+                else:
+                    doc_scores = {
+                        doc_id: score + term_scores[doc_id]
+                        for doc_id, score in doc_scores.items() if doc_id in term_scores
+                    }
+                if not doc_scores:
+                    return []
+            article_scores = {}
+            for doc_id, score in doc_scores.items():
+                article_id = self._article_id(doc_id)
+                if score > article_scores.get(article_id, 0.0):
+                    article_scores[article_id] = score
+        key = lambda item: (-item[1], item[0])
+        if k is None:
+            return sorted(article_scores.items(), key=key)
+        return heapq.nsmallest(k, article_scores.items(), key=key)
+
+    def clear(self):
+        """Remove all documents (and segment files)."""
+        self.wait_for_merge()
+        with self._lock:
+            segments = self._segments
+            self._segments = []
+            self._buffer = {}
+            self._buffer_postings = defaultdict(dict)
+            self._live = {}
+            self._deleted = {}
+            self._total_length = 0.0
+            self._generation += 1
+            self.version += 1
+            self._write_manifest()
+        if self.writable:
+            for segment in segments:
+                if segment.name is not None:
+                    os.remove(os.path.join(self.path, segment.name))
+
+    def close(self):
+        """Write the buffer, wait for a running merge and give up the writer lock."""
+        self.flush()
+        self.wait_for_merge()
+        with self._lock:
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+
+def _position(segment, doc_id):
+    """Binary search of doc_id in the sorted document table of segment."""
+    doc_ids = segment.doc_ids
+    low, high = 0, len(doc_ids)
+    while low < high:
+        middle = (low + high) // 2
+        if doc_ids[middle] < doc_id:
+            low = middle + 1
+        else:
+            high = middle
+    return low
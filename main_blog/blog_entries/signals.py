@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_article_version, bump_list_version
+from .models import Article, Comment, after_version_saved
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article_pages(sender, instance, **kwargs):
+    bump_article_version(instance.pk)
+    bump_list_version()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    if instance.article_id is not None:
+        bump_article_version(instance.article_id)
+
+
+@receiver(post_delete, sender=Article)
+def count_deleted_article(sender, instance, **kwargs):
+    """
+    Runs inside the transaction of the delete, also for cascade deletes.
+    """
+    Article.objects.count_articles(author_pk=instance.author_id, number=-1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    """
+    Runs inside the transaction of the delete, so DeleteCommentForm.save
+    and cascade deletes (e.g. of the owner) keep comment_count right.
+    """
+    Article.objects.count_comments(article_pk=instance.article_id, number=-1)
+
+
+@receiver(post_save, sender=Article)
+def index_article(sender, instance, **kwargs):
+    after_version_saved(instance, lambda: get_search_backend().index_article(instance))
+
+
+@receiver(post_delete, sender=Article)
+def remove_article_from_index(sender, instance, **kwargs):
+    get_search_backend().remove_article(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, **kwargs):
+    after_version_saved(instance, lambda: get_search_backend().index_comment(instance))
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_index(sender, instance, **kwargs):
+    get_search_backend().remove_comment(instance.pk)
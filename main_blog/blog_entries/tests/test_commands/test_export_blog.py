@@ -0,0 +1,56 @@
+import csv
+import json
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from blog_auth.models import User
+from blog_entries.models import Article, Comment
+
+class TestExportBlog(TestCase):
+
+    def setUp(self):
+        self.user = self._create_user()
+        self.articles = [
+            Article.objects.create_article(
+                author=self.user,
+                title=f'Test article number {number}',
+                entry=50 * 'Test.'
+            ) for number in range(5)
+        ]
+        Comment.objects.create_comment(
+            owner=self.user,
+            article=self.articles[0],
+            content_comment='First, test "comment"'
+        )
+
+    def _create_user(self):
+        return User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy'
+        )
+
+    def _export(self, *args):
+        out = StringIO()
+        call_command('export_blog', *args, stdout=out)
+        return out.getvalue()
+
+    def test_ndjson(self):
+        rows = [json.loads(line) for line in self._export('--chunk-size', '2').splitlines()]
+        self.assertEqual([row['model'] for row in rows], 5 * ['article'] + ['comment'])
+        self.assertEqual([row['id'] for row in rows[:5]], [article.pk for article in self.articles])
+        self.assertEqual(rows[5]['content_comment'], 'First, test "comment"')
+        self.assertEqual(rows[0]['comment_count'], 1)
+
+    def test_csv(self):
+        rows = list(csv.DictReader(StringIO(self._export('--format', 'csv', '--model', 'comment'))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['content_comment'], 'First, test "comment"')
+        self.assertEqual(rows[0]['article_id'], str(self.articles[0].pk))
+
+    def test_csv_needs_one_model(self):
+        with self.assertRaises(CommandError):
+            self._export('--format', 'csv')
@@ -0,0 +1,131 @@
+import json
+from datetime import date
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from blog_auth.models import BlogProfile, User
+from blog_entries.models import Article, Comment
+from blog_entries.search import SearchResults
+
+class TestImportBlog(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = self._create_user()
+
+    def _create_user(self):
+        profile = BlogProfile.objects.create_profile(
+            first_name='Test',
+            last_name='Tester',
+            sex='M',
+            country='PL',
+            date_birth=date(year=1996, month=3, day=12)
+        )
+        return User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+            user_profile=profile
+        )
+
+    def _import(self, rows, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as input_file:
+            for row in rows:
+                input_file.write(row if isinstance(row, str) else json.dumps(row))
+                input_file.write('\n')
+        self.addCleanup(os.remove, input_file.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_blog', input_file.name, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def _article(self, pk, **kwargs):
+        row = {
+            'model': 'article',
+            'id': pk,
+            'author_id': self.user.pk,
+            'title': f'Imported article number {pk}',
+            'entry': 50 * 'Imported.',
+            'pub_date': '2019-09-17'
+        }
+        row.update(kwargs)
+        return row
+
+    def test_import(self):
+        rows = [self._article(pk) for pk in range(100, 105)] + [
+            {'model': 'comment', 'id': 7, 'article_id': 100, 'owner_id': self.user.pk,
+             'content_comment': 'Imported test comment', 'pub_date': '2019-09-18'},
+            {'model': 'comment', 'article_id': 100, 'content_comment': 'Second imported comment'}
+        ]
+        out, err = self._import(rows, '--batch-size', '3')
+        self.assertIn('Imported 5 articles and 2 comments, rejected 0 rows', out)
+        self.assertIn('rows/s', out)
+        article = Article.objects.get(pk=100)
+        self.assertEqual(article.excerpt, Article.make_excerpt(article.entry))
+        self.assertEqual(article.comment_count, 2)
+        self.assertIsNotNone(article.last_comment_at)
+        self.assertGreater(article.version, 1)
+        self.user.user_profile.refresh_from_db()
+        self.assertEqual(self.user.user_profile.number_article, 5)
+        self.assertEqual(
+            [found.pk for found in SearchResults('imported comment', include_adult=False)[0:10]],
+            [100]
+        )
+        # Sequences continue after the imported ids.
+        self.assertGreater(Article.objects.create_article(
+            author=self.user, title='Test is very good.', entry=50 * 'Test.'
+        ).pk, 104)
+
+    def test_invalid_rows_are_rejected(self):
+        rows = [
+            self._article(100),
+            self._article(101, title='Short'),
+            self._article(102, entry=300 * '1'),
+            self._article(103, author_id=999),
+            self._article(104, title=''),
+            self._article(105, entry=None),
+            {'model': 'comment', 'article_id': 100},
+            {'model': 'comment', 'article_id': 999, 'content_comment': 'Imported test comment'},
+            {'model': 'user'},
+            'not json'
+        ]
+        out, err = self._import(rows)
+        self.assertIn('Imported 1 articles and 0 comments, rejected 8 rows', out)
+        self.assertEqual(len(err.splitlines()), 9)
+        self.assertIn('Line 2', err)
+        self.assertIn("Line 5: {'title': ['This field cannot be blank.']}", err)
+        self.assertIn("Line 6: {'entry': ['This field cannot be null.']}", err)
+        self.assertIn("Line 7: {'content_comment': ['This field cannot be null.']}", err)
+        self.assertEqual(list(Article.objects.values_list('pk', flat=True)), [100])
+
+    def test_existing_ids_are_rejected(self):
+        self._import([self._article(100)])
+        out, err = self._import([
+            self._article(100),
+            self._article(101),
+            self._article(101),
+            {'model': 'comment', 'id': 7, 'article_id': 100, 'content_comment': 'Imported test comment'},
+            {'model': 'comment', 'id': 7, 'article_id': 101, 'content_comment': 'Imported test comment'}
+        ])
+        self.assertIn('Imported 1 articles and 1 comments, rejected 3 rows', out)
+        self.assertIn("Line 1: {'id': ['Object 100 already exists.']}", err)
+        self.assertIn("Line 3: {'id': ['Object 101 already exists.']}", err)
+        self.assertEqual(Article.objects.get(pk=100).comment_count, 1)
+        self.assertEqual(Comment.objects.get(pk=7).article_id, 100)
+
+    def test_export_round_trip(self):
+        article = Article.objects.create_article(
+            author=self.user, title='Test is very good.', entry=50 * 'Test.'
+        )
+        Comment.objects.create_comment(owner=self.user, article=article, content_comment='First test comment')
+        dump = StringIO()
+        call_command('export_blog', stdout=dump)
+        Article.objects.all().delete()
+        out, err = self._import(dump.getvalue().splitlines())
+        self.assertIn('Imported 1 articles and 1 comments', out)
+        self.assertEqual(Article.objects.get(pk=article.pk).comment_count, 1)
@@ -0,0 +1,66 @@
+import os
+from tempfile import TemporaryDirectory
+
+from django.db import connections, router
+from django.test import TransactionTestCase, override_settings
+
+from blog_entries.profiling.data import mirror_replicas, seed
+from blog_entries.profiling.load import default_load_paths, load_test
+from blog_entries.models import Article
+from main_blog.db_routers import unpin_primary
+from main_blog.tests.test_db_routers import REPLICA_SETTINGS
+
+class TestLoadTest(TransactionTestCase):
+
+    def test_load_test(self):
+        seed(users=3, articles=3, comments_per_article=2)
+        for interface in ('wsgi', 'asgi'):
+            result = load_test(interface, requests=12, concurrency=4, threads=2)
+            self.assertEqual(result['errors'], 0, interface)
+            self.assertEqual(result['requests'], 12)
+            self.assertGreater(result['requests_per_second'], 0)
+            self.assertLessEqual(result['latency_ms_median'], result['latency_ms_p95'])
+        self.assertEqual(len(default_load_paths()), 6)
+
+    def test_unknown_interface(self):
+        with self.assertRaises(ValueError):
+            load_test('cgi', paths=['/'], requests=1)
+
+
+class TestLoadTestWithReplicas(TransactionTestCase):
+    """
+    The replicas are empty SQLite databases without tables, so any read
+    which reaches them instead of the seeded database fails.
+    """
+
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for alias in REPLICA_SETTINGS['DATABASE_REPLICAS']:
+            connections.databases[alias] = {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(directory.name, f'{alias}.sqlite3')
+            }
+            connections.ensure_defaults(alias)
+            connections.prepare_test_settings(alias)
+            self.addCleanup(self._remove_alias, alias)
+        override = override_settings(**REPLICA_SETTINGS)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _remove_alias(self, alias):
+        connections[alias].close()
+        del connections[alias]
+        del connections.databases[alias]
+
+    def test_reads_of_replicas_see_seeded_rows(self):
+        seed(users=3, articles=3, comments_per_article=2)
+        # The seed wrote, reads of this thread would stay on the primary.
+        unpin_primary()
+        with mirror_replicas(connections['default']):
+            alias = router.db_for_read(Article)
+            self.assertIn(alias, REPLICA_SETTINGS['DATABASE_REPLICAS'])
+            self.assertEqual(Article.objects.using(alias).count(), 3)
+            result = load_test('wsgi', requests=12, concurrency=4, threads=2)
+            self.assertEqual(result['errors'], 0)
+        self.assertNotEqual(connections[alias].settings_dict['NAME'], connections['default'].settings_dict['NAME'])
@@ -0,0 +1,47 @@
+import json
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from blog_entries.profiling.startup import parse_importtime
+
+class TestProfileStartup(SimpleTestCase):
+
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:      1500 |       1500 |     django.utils\n'
+            'import time:       250 |       1750 |   django\n'
+            'Something else\n'
+        )
+        self.assertEqual(
+            parse_importtime(output),
+            {'django.utils': (1.5, 1.5), 'django': (0.25, 1.75)}
+        )
+
+    def test_profile_startup(self):
+        # A 404 page, so the fresh process doesn't touch the database.
+        with TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'startup.json')
+            out = StringIO()
+            call_command(
+                'profile_startup', '--repeat', '1', '--path', '/not-existing-page/',
+                '--output', output, stdout=out
+            )
+            with open(output) as output_file:
+                results = json.load(output_file)
+            call_command(
+                'profile_startup', '--repeat', '1', '--path', '/not-existing-page/',
+                '--compare', output, '--sort', 'cumulative', stdout=out
+            )
+        self.assertEqual(results['meta']['status'], '404')
+        self.assertIn('main_blog.wsgi', results['modules'])
+        self.assertIn('blog_auth', results['packages'])
+        self.assertNotIn('pycountry', results['packages'])
+        self.assertAlmostEqual(
+            results['total_ms'], results['import_ms'] + results['first_response_ms'], places=2
+        )
+        self.assertIn('Modules by cumulative import time', out.getvalue())
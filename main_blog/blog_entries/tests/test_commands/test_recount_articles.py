@@ -0,0 +1,78 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from blog_auth.models import BlogProfile, User
+from blog_entries.forms import CreateArticleForm, DeleteArticleForm
+from blog_entries.models import Article
+
+class TestNumberArticleCounter(TestCase):
+
+    def setUp(self):
+        self.user = self._create_user()
+
+    def _create_user(self):
+        profile = BlogProfile.objects.create_profile(
+            first_name='Test',
+            last_name='Tester',
+            sex='M',
+            country='PL',
+            date_birth=date(year=1996, month=3, day=12)
+        )
+        return User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+            user_profile=profile
+        )
+
+    def _create_article(self):
+        return Article.objects.create_article(
+            author=self.user,
+            title='Test is very good.',
+            entry=50 * 'Test.'
+        )
+
+    def _number_article(self):
+        return BlogProfile.objects.get(pk=self.user.user_profile_id).number_article
+
+    def test_create_article_counts(self):
+        self._create_article()
+        self._create_article()
+        self.assertEqual(self._number_article(), 2)
+
+    def test_create_article_form_counts(self):
+        form = CreateArticleForm(user=self.user, data={
+            'title': 'Tester title',
+            'entry': 20 * 'I am tester. My job is very difficult'
+        })
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.assertEqual(self._number_article(), 1)
+
+    def test_delete_article_form_counts(self):
+        article = self._create_article()
+        form = DeleteArticleForm(data={'delete_article_pk': article.pk})
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.assertEqual(self._number_article(), 0)
+
+    def test_recount_articles(self):
+        self._create_article()
+        self._create_article()
+        BlogProfile.objects.update(number_article=10)
+        other = BlogProfile.objects.create_profile(
+            first_name='Other',
+            last_name='Tester',
+            sex='F',
+            country='PL',
+            date_birth=date(year=1990, month=1, day=1),
+            number_article=3
+        )
+        call_command('recount_articles', stdout=StringIO())
+        self.assertEqual(self._number_article(), 2)
+        other.refresh_from_db()
+        self.assertEqual(other.number_article, 0)
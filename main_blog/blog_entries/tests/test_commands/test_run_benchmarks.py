@@ -0,0 +1,48 @@
+import json
+
+from django.test import TestCase
+
+from blog_auth.models import User
+from blog_entries.profiling.benchmarks import compare, default_scenarios, run_benchmarks
+from blog_entries.profiling.data import seed
+from blog_entries.profiling.startup import measure_startup
+from blog_entries.models import Article
+
+class TestBenchmarks(TestCase):
+
+    def test_seed(self):
+        created = seed(users=3, articles=5, comments_per_article=2)
+        self.assertEqual(created['article'], 5)
+        self.assertEqual(User.objects.get(username='bench1').user_profile.number_article,
+                         Article.objects.filter(author__username='bench1').count())
+        self.assertEqual(Article.objects.get(pk=1).comment_count, 2)
+
+    def test_run_benchmarks(self):
+        seed(users=3, articles=5, comments_per_article=2)
+        scenarios = [
+            scenario for scenario in default_scenarios()
+            if scenario.name in ('main_blog_owner', 'create_article_post')
+        ]
+        results = run_benchmarks(scenarios, repeat=2, warmup=0)
+        json.dumps(results)
+        self.assertEqual(list(results['results']), ['main_blog_owner', 'create_article_post'])
+        owner = results['results']['main_blog_owner']
+        self.assertGreater(owner['queries'], 0)
+        self.assertGreater(owner['peak_allocated_bytes'], 0)
+        self.assertLessEqual(owner['latency_ms_min'], owner['latency_ms_max'])
+        changes = list(compare(results, results))
+        self.assertEqual(len(changes), 4)
+        self.assertTrue(all(change == 0 for *_, change in changes))
+
+    def test_measure_startup(self):
+        startup = measure_startup({
+            'static_choices': 'from blog_auth.countries import COUNTRIES',
+            'broken': 'import not_existing_module'
+        }, repeat=1)
+        self.assertGreater(startup['static_choices'], 0)
+        self.assertIsNone(startup['broken'])
+        changes = list(compare(
+            {'results': {}, 'startup_ms': {'static_choices': 2.0}},
+            {'results': {}, 'startup_ms': startup}
+        ))
+        self.assertEqual(len(changes), 1)
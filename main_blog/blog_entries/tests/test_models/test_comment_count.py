@@ -0,0 +1,119 @@
+from datetime import date, datetime, timedelta
+
+from django.test import TestCase
+from django.utils.timezone import utc
+from django.urls import reverse
+
+from blog_auth.models import User
+from blog_entries.forms import CreateCommentForm, DeleteCommentForm
+from blog_entries.models import Article, Comment
+
+
+class TestCommentCount(TestCase):
+
+    def setUp(self):
+        self.user = self._create_user()
+        self.article = Article.objects.create_article(
+            author=self.user,
+            title='Test is very good.',
+            entry=50 * 'Test.'
+        )
+
+    def _create_user(self):
+        return User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy'
+        )
+
+    def _create_comment(self, owner=None):
+        return Comment.objects.create_comment(
+            owner=owner or self.user,
+            article=self.article,
+            content_comment='First test comment'
+        )
+
+    def test_create_comment(self):
+        self._create_comment()
+        self._create_comment()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 2)
+        self.assertIsNotNone(self.article.last_comment_at)
+
+    def test_last_comment_at_never_moves_back(self):
+        self._create_comment()
+        self.article.refresh_from_db()
+        last_comment_at = self.article.last_comment_at
+        Article.objects.count_comments(
+            article_pk=self.article.pk,
+            number=1,
+            commented_at=last_comment_at - timedelta(days=1)
+        )
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 2)
+        self.assertEqual(self.article.last_comment_at, last_comment_at)
+        Article.objects.count_comments(
+            article_pk=self.article.pk,
+            number=1,
+            commented_at=last_comment_at + timedelta(days=1)
+        )
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.last_comment_at, last_comment_at + timedelta(days=1))
+
+    def test_create_comment_form(self):
+        form = CreateCommentForm(
+            user=self.user,
+            article=self.article,
+            data={'content_comment': 'I am tester. My job is very difficult'}
+        )
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 1)
+        self.assertIsNotNone(self.article.last_comment_at)
+
+    def test_delete_comment_form(self):
+        comment = self._create_comment()
+        self._create_comment()
+        form = DeleteCommentForm(data={'delete_comment_pk': comment.pk})
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 1)
+
+    def test_delete_comment_recomputes_last_comment_at(self):
+        older = self._create_comment()
+        Comment.objects.filter(pk=older.pk).update(pub_date=date(2019, 9, 17))
+        newer = self._create_comment()
+        second_newer = self._create_comment()
+        self.article.refresh_from_db()
+        last_comment_at = self.article.last_comment_at
+        newer.delete()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.last_comment_at, last_comment_at)
+        second_newer.delete()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 1)
+        self.assertEqual(self.article.last_comment_at, datetime(2019, 9, 17, tzinfo=utc))
+        older.delete()
+        self.article.refresh_from_db()
+        self.assertIsNone(self.article.last_comment_at)
+
+    def test_delete_owner_of_comment(self):
+        other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='tester123',
+            nick='other'
+        )
+        self._create_comment(owner=other)
+        self._create_comment()
+        other.delete()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 1)
+
+    def test_article_list_shows_count(self):
+        self._create_comment()
+        response = self.client.get(reverse('blog_entries:all_entries'))
+        self.assertContains(response, 'Comments: 1')
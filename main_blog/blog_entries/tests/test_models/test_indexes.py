@@ -0,0 +1,48 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from blog_auth.models import User
+from blog_entries.models import Article, Comment
+from blog_entries.views import CommentsPageMixin
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plan format of SQLite.')
+class TestHotQueryIndexes(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy'
+        )
+        cls.article = Article.objects.create_article(
+            author=user,
+            title='Test is very good.',
+            entry=50 * 'Test.'
+        )
+        Comment.objects.create_comment(
+            owner=user,
+            article=cls.article,
+            content_comment='First test comment'
+        )
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_public_article_list(self):
+        queryset = Article.objects.summary().filter(for_adult=False).order_by('-pub_date', '-id')[:11]
+        self.assertUsesIndex(queryset, 'article_public_pub_date_idx')
+
+    def test_article_list_by_activity(self):
+        queryset = Article.objects.summary().filter(last_comment_at__isnull=False).order_by('-last_comment_at', '-id')[:11]
+        self.assertUsesIndex(queryset, 'article_activity_idx')
+
+    def test_comments_of_article(self):
+        queryset = CommentsPageMixin().get_all_comments_for_entry(self.article.pk).order_by('-pub_date', '-id')[:11]
+        self.assertUsesIndex(queryset, 'comment_article_pub_date_idx')
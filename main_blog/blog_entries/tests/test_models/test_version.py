@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from blog_auth.models import User
+from blog_entries.forms import ChangeArtilceEntryForm, ChangeCommentForm
+from blog_entries.models import Article, Comment
+
+
+class TestVersion(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy'
+        )
+        self.article = Article.objects.create_article(
+            author=self.user,
+            title='Test is very good.',
+            entry=50 * 'Test.'
+        )
+
+    def test_edit_keeps_counters_changed_meanwhile(self):
+        # The form works on an instance loaded before the vote and the comment.
+        stale = Article.objects.get(pk=self.article.pk)
+        Article.objects.update_votes(self.article.pk, like=1)
+        comment = Comment.objects.create_comment(
+            owner=self.user,
+            article=self.article,
+            content_comment='First test comment'
+        )
+        before = Article.objects.get(pk=self.article.pk)
+        form = ChangeArtilceEntryForm(
+            article=stale,
+            instance=stale,
+            data={'title': 'Changed title is good.', 'entry': 50 * 'Changed.'}
+        )
+        self.assertTrue(form.is_valid())
+        form.save()
+        article = Article.objects.get(pk=self.article.pk)
+        self.assertEqual(article.like, 1)
+        self.assertEqual(article.comment_count, 1)
+        self.assertEqual(article.last_comment_at, before.last_comment_at)
+        self.assertEqual(article.version, before.version + 1)
+        self.assertEqual(stale.version, article.version)
+        self.assertEqual(article.excerpt, Article.make_excerpt(50 * 'Changed.'))
+
+        stale_comment = Comment.objects.get(pk=comment.pk)
+        Comment.objects.filter(pk=comment.pk).update(version=10)
+        form = ChangeCommentForm(
+            instance=stale_comment,
+            data={'content_comment': 'Changed test comment', 'change_comment_pk': comment.pk}
+        )
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.assertEqual(stale_comment.version, 11)
+        self.assertEqual(Comment.objects.get(pk=comment.pk).content_comment, 'Changed test comment')
+
+    def test_excerpt_made_only_when_entry_is_saved(self):
+        article = Article.objects.summary().get(pk=self.article.pk)
+        with mock.patch.object(Article, 'make_excerpt', wraps=Article.make_excerpt) as make_excerpt:
+            article.save(update_fields=['for_adult'])
+            make_excerpt.assert_not_called()
+            article.entry = 50 * 'Changed.'
+            article.save(update_fields=['entry'])
+            make_excerpt.assert_called_once_with(50 * 'Changed.')
+        self.assertEqual(Article.objects.get(pk=self.article.pk).excerpt, Article.make_excerpt(50 * 'Changed.'))
@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+
+from blog_entries.search_engine import SearchEngine, Segment
+
+
+class TestSearchEngine(SimpleTestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+    def _engine(self, **kwargs):
+        options = {'buffer_size': 2, 'merge_factor': 3, 'background_merge': False}
+        options.update(kwargs)
+        return SearchEngine(**options)
+
+    def _fill(self, engine):
+        engine.add(-1, 1, {'python': 10.0, 'snakes': 1.0})
+        engine.add(-2, 2, {'garden': 10.0, 'python': 1.0})
+        engine.add(3, 2, {'python': 1.0, 'tomatoes': 1.0})
+        engine.add(-3, 3, {'tomatoes': 10.0})
+
+    def _articles(self, engine, terms, **kwargs):
+        return [article_id for article_id, _ in engine.search(terms, **kwargs)]
+
+    def test_ranking_and_all_terms(self):
+        engine = self._engine()
+        self._fill(engine)
+        self.assertEqual(self._articles(engine, ['python']), [1, 2])
+        self.assertEqual(self._articles(engine, ['python', 'tomatoes']), [2])
+        self.assertEqual(self._articles(engine, ['python', 'missing']), [])
+        self.assertEqual(self._articles(engine, ['python'], k=1), [1])
+        self.assertEqual(self._articles(engine, ['python'], exclude={1}), [2])
+
+    def test_update_and_delete_across_segments(self):
+        engine = self._engine()
+        self._fill(engine)
+        self.assertEqual(len(engine.segments), 2)
+        engine.add(-1, 1, {'java': 1.0})
+        engine.delete(-3)
+        self.assertEqual(self._articles(engine, ['python']), [2])
+        self.assertEqual(self._articles(engine, ['java']), [1])
+        self.assertEqual(self._articles(engine, ['tomatoes']), [2])
+        self.assertEqual(len(engine), 3)
+
+    def test_merge_drops_dead_documents(self):
+        engine = self._engine(merge_factor=10)
+        self._fill(engine)
+        engine.delete(-1)
+        engine.flush()
+        engine.merge()
+        segment, = engine.segments
+        self.assertEqual(list(segment.doc_ids), [-3, -2, 3])
+        self.assertEqual(self._articles(engine, ['python']), [2])
+
+    def test_background_merge(self):
+        engine = self._engine(background_merge=True)
+        for doc_id in range(1, 7):
+            engine.add(doc_id, doc_id, {'python': float(doc_id)})
+        engine.wait_for_merge()
+        self.assertLess(len(engine.segments), 3)
+        self.assertEqual(sorted(self._articles(engine, ['python'])), list(range(1, 7)))
+
+    def test_persisted_index_is_loaded(self):
+        engine = self._engine(path=self.path)
+        self._fill(engine)
+        engine.delete(-2)
+        engine.close()
+        loaded = self._engine(path=self.path)
+        self.assertTrue(all(isinstance(segment.doc_ids, memoryview) for segment in loaded.segments))
+        self.assertEqual(self._articles(loaded, ['python']), [1, 2])
+        self.assertEqual(self._articles(loaded, ['garden']), [])
+        self.assertEqual(
+            loaded.search(['tomatoes']),
+            engine.search(['tomatoes'])
+        )
+
+    def test_segment_file_round_trip(self):
+        segment = Segment.build(0, {-1: (1, 2.0, {'python': 1.0, 'snakes': 1.0}, 7)})
+        segment.write(f'{self.path}/segment.bin')
+        opened = Segment.open(f'{self.path}/segment.bin')
+        self.assertEqual(opened.terms, ['python', 'snakes'])
+        self.assertEqual(list(opened.postings('snakes')[0]), [0])
+        self.assertEqual(opened.documents(), segment.documents())
+
+    def test_stamps_of_live_documents(self):
+        engine = self._engine()
+        engine.add(-1, 1, {'python': 1.0}, stamp=3)
+        engine.add(2, 1, {'python': 1.0}, stamp=1)
+        engine.add(3, 1, {'python': 1.0}, stamp=5)
+        engine.add(-1, 1, {'java': 1.0}, stamp=4)
+        engine.delete(2)
+        self.assertEqual(engine.stamps(), {-1: 4, 3: 5})
+
+    def test_shared_path_has_one_writer(self):
+        writer = self._engine(path=self.path)
+        self._fill(writer)
+        reader = self._engine(path=self.path)
+        self.assertTrue(writer.writable)
+        self.assertFalse(reader.writable)
+        reader.add(4, 4, {'python': 1.0, 'java': 1.0})
+        reader.flush()
+        writer.add(5, 5, {'java': 1.0})
+        writer.close()
+        self.assertEqual(self._articles(reader, ['java']), [4])
+        segment_files = [name for name in os.listdir(self.path) if name.startswith('segment_')]
+        self.assertEqual(sorted(segment_files), sorted(segment.name for segment in writer.segments))
+        loaded = self._engine(path=self.path)
+        self.assertTrue(loaded.writable)
+        self.assertEqual(self._articles(loaded, ['java']), [5])
+
+    def test_unreadable_index_is_loaded_empty(self):
+        engine = self._engine(path=self.path)
+        self._fill(engine)
+        engine.close()
+        for segment in engine.segments:
+            with open(os.path.join(self.path, segment.name), 'r+b') as segment_file:
+                segment_file.write(b'BLOGSEG1')
+        with self.assertLogs('blog_entries.search_engine', level='WARNING'):
+            loaded = self._engine(path=self.path)
+        self.assertEqual(len(loaded), 0)
+        self.assertEqual(loaded.segments, [])
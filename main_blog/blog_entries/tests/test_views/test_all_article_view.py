@@ -0,0 +1,113 @@
+from datetime import date, datetime, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import utc
+
+from blog_auth.models import User
+from blog_entries.models import Article
+from blog_entries.views import AllArticleView
+
+class TestAllArticleView(TestCase):
+
+    def setUp(self):
+        self.user = self._create_user()
+        self.url = reverse('blog_entries:all_entries')
+        self.page_size = AllArticleView.paginate_by
+        for number in range(2 * self.page_size + 3):
+            self._create_article(number)
+
+    def _create_user(self):
+        return User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+        )
+
+    def _create_article(self, number):
+        return Article.objects.create_article(
+            author=self.user,
+            title=f'Test article number {number}',
+            entry=50 * 'Test.',
+            pub_date=date(2019, 9, 1) + timedelta(days=number // 2)
+        )
+
+    def _walk_forward(self, **params):
+        titles = []
+        response = self.client.get(self.url, params)
+        while True:
+            titles.extend(article.title for article in response.context['article_list'])
+            page = response.context['page_obj']
+            if not page.has_next():
+                return titles, response
+            response = self.client.get(self.url, {**params, 'cursor': page.next_cursor})
+
+    def _comment_some_articles(self):
+        """
+        Give every third article a last comment, the same time for pairs of them.
+        """
+        pks = list(Article.objects.order_by('id').values_list('pk', flat=True))
+        for number, pk in enumerate(pks[::3]):
+            Article.objects.filter(pk=pk).update(
+                last_comment_at=datetime(2019, 10, 1, tzinfo=utc) + timedelta(hours=number // 2)
+            )
+        return list(
+            Article.objects.filter(last_comment_at__isnull=False)
+            .order_by('-last_comment_at', '-id').values_list('title', flat=True)
+        ) + list(
+            Article.objects.filter(last_comment_at__isnull=True)
+            .order_by('-id').values_list('title', flat=True)
+        )
+
+    def test_first_page_has_page_size_articles(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['article_list']), self.page_size)
+        self.assertFalse(response.context['page_obj'].has_previous())
+        self.assertTrue(response.context['page_obj'].has_next())
+
+    def test_walk_all_pages_returns_every_article_once(self):
+        titles, _ = self._walk_forward()
+        expected = list(
+            Article.objects.order_by('-pub_date', '-id').values_list('title', flat=True)
+        )
+        self.assertEqual(titles, expected)
+
+    def test_previous_cursor_returns_previous_page(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url, {'cursor': first.context['page_obj'].next_cursor})
+        back = self.client.get(self.url, {'cursor': second.context['page_obj'].previous_cursor})
+        self.assertEqual(
+            list(back.context['article_list']),
+            list(first.context['article_list'])
+        )
+        self.assertFalse(back.context['page_obj'].has_previous())
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_does_not_load_entry(self):
+        response = self.client.get(self.url)
+        article = response.context['article_list'][0]
+        self.assertIn('entry', article.get_deferred_fields())
+        self.assertEqual(article.excerpt, Article.make_excerpt(50 * 'Test.'))
+
+    def test_sort_by_activity(self):
+        expected = self._comment_some_articles()
+        titles, last = self._walk_forward(sort='activity')
+        self.assertEqual(titles, expected)
+        self.assertIn('?sort=activity&amp;cursor=', last.content.decode())
+        backward = []
+        page = last.context['page_obj']
+        backward[:0] = [article.title for article in page]
+        while page.has_previous():
+            response = self.client.get(self.url, {'sort': 'activity', 'cursor': page.previous_cursor})
+            page = response.context['page_obj']
+            backward[:0] = [article.title for article in page]
+        self.assertEqual(backward, expected)
+
+    def test_unknown_sort(self):
+        response = self.client.get(self.url, {'sort': 'title'})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,205 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from blog_auth.models import User
+from blog_entries.models import Article, Comment
+
+
+class APITestCase(TestCase):
+
+    def setUp(self):
+        self.user = self._create_user()
+        self.other = self._create_user(username='other', email='other@example.com', nick='other')
+        self.article = Article.objects.create_article(
+            author=self.user,
+            title='Test is very good.',
+            entry=50 * 'Test.'
+        )
+        self.comment = Comment.objects.create_comment(
+            owner=self.other,
+            article=self.article,
+            content_comment='First test comment'
+        )
+        self.article.refresh_from_db()
+        self.article_url = reverse('blog_entries:api_article', args=[self.article.pk])
+        self.comment_url = reverse('blog_entries:api_comment', args=[self.comment.pk])
+
+    def _create_user(self, username='tester', email='przemyslaww.rozyckii@gmail.com', nick='testowy'):
+        return User.objects.create_user(
+            username=username,
+            email=email,
+            password='tester123',
+            nick=nick
+        )
+
+    def _send(self, method, url, data):
+        return getattr(self.client, method)(url, data=json.dumps(data), content_type='application/json')
+
+
+class TestArticleAPI(APITestCase):
+
+    def test_list_with_cursor(self):
+        for number in range(25):
+            Article.objects.create_article(
+                author=self.user,
+                title=f'Test article number {number}',
+                entry=50 * 'Test.'
+            )
+        Article.objects.create_article(
+            author=self.user,
+            title='Test article for adult',
+            entry=50 * 'Test.',
+            for_adult=True
+        )
+        first = self.client.get(reverse('blog_entries:api_articles')).json()
+        self.assertEqual(len(first['results']), 20)
+        self.assertNotIn('entry', first['results'][0])
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['results']), 6)
+        self.assertIsNone(second['next'])
+        titles = [article['title'] for article in first['results'] + second['results']]
+        self.assertNotIn('Test article for adult', titles)
+        self.assertEqual(len(set(titles)), 26)
+
+    def test_list_not_modified(self):
+        url = reverse('blog_entries:api_articles')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Article.objects.update_votes(self.article.pk, like=1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('blog_entries:api_articles'), {'cursor': 'broken'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_sorted_by_activity(self):
+        for number in range(25):
+            Article.objects.create_article(
+                author=self.user,
+                title=f'Test article number {number}',
+                entry=50 * 'Test.'
+            )
+        first = self.client.get(reverse('blog_entries:api_articles'), {'sort': 'activity'}).json()
+        self.assertEqual(first['results'][0]['id'], self.article.pk)
+        self.assertIn('sort=activity', first['next'])
+        second = self.client.get(first['next']).json()
+        ids = [article['id'] for article in first['results'] + second['results']]
+        self.assertEqual(ids[1:], sorted(ids[1:], reverse=True))
+        self.assertEqual(len(set(ids)), 26)
+
+    def test_list_unknown_sort(self):
+        response = self.client.get(reverse('blog_entries:api_articles'), {'sort': 'title'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail_not_modified(self):
+        response = self.client.get(self.article_url)
+        self.assertEqual(response.json()['entry'], self.article.entry)
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.article_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Comment.objects.create_comment(
+            owner=self.user,
+            article=self.article,
+            content_comment='Second test comment'
+        )
+        response = self.client.get(self.article_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['comment_count'], 2)
+
+    def test_adult_article_is_hidden(self):
+        self.article.for_adult = True
+        self.article.save()
+        self.assertEqual(self.client.get(self.article_url).status_code, 404)
+
+    def test_create(self):
+        self.client.force_login(self.user)
+        response = self._send('post', reverse('blog_entries:api_articles'), {
+            'title': 'New test article',
+            'entry': 50 * 'Test.'
+        })
+        self.assertEqual(response.status_code, 201)
+        article = Article.objects.get(title='New test article')
+        self.assertEqual(article.author, self.user)
+        self.assertEqual(response['Location'], reverse('blog_entries:api_article', args=[article.pk]))
+        self.assertEqual(response['ETag'], f'"article-{article.pk}-{article.version}"')
+
+    def test_create_invalid(self):
+        self.client.force_login(self.user)
+        response = self._send('post', reverse('blog_entries:api_articles'), {'title': 'Short'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.json()['errors'])
+        self.assertIn('entry', response.json()['errors'])
+
+    def test_create_needs_login(self):
+        response = self._send('post', reverse('blog_entries:api_articles'), {})
+        self.assertEqual(response.status_code, 401)
+
+    def test_patch_by_owner(self):
+        self.client.force_login(self.user)
+        etag = self.client.get(self.article_url)['ETag']
+        response = self._send('patch', self.article_url, {'title': 'Changed test title'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Changed test title')
+        self.assertEqual(response.json()['entry'], self.article.entry)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_stale_if_match(self):
+        self.client.force_login(self.user)
+        etag = self.client.get(self.article_url)['ETag']
+        self._send('patch', self.article_url, {'title': 'Changed test title'})
+        response = self.client.patch(
+            self.article_url,
+            data=json.dumps({'title': 'Other test title'}),
+            content_type='application/json',
+            HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 412)
+
+    def test_patch_by_other_user(self):
+        self.client.force_login(self.other)
+        response = self._send('patch', self.article_url, {'title': 'Changed test title'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_delete(self):
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.delete(self.article_url).status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.delete(self.article_url).status_code, 204)
+        self.assertFalse(Article.objects.filter(pk=self.article.pk).exists())
+
+
+class TestCommentAPI(APITestCase):
+
+    def test_list_and_create(self):
+        url = reverse('blog_entries:api_article_comments', args=[self.article.pk])
+        self.client.force_login(self.user)
+        response = self._send('post', url, {'content_comment': 'Second test comment'})
+        self.assertEqual(response.status_code, 201)
+        results = self.client.get(url).json()['results']
+        self.assertEqual(
+            [comment['content_comment'] for comment in results],
+            ['Second test comment', 'First test comment']
+        )
+
+    def test_detail_not_modified(self):
+        etag = self.client.get(self.comment_url)['ETag']
+        response = self.client.get(self.comment_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_only_owner_edits(self):
+        self.client.force_login(self.user)
+        response = self._send('put', self.comment_url, {'content_comment': 'Changed test comment'})
+        self.assertEqual(response.status_code, 403)
+        self.client.force_login(self.other)
+        response = self._send('put', self.comment_url, {'content_comment': 'Changed test comment'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], self.comment.version + 1)
+
+    def test_author_of_article_deletes(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.delete(self.comment_url).status_code, 204)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 0)
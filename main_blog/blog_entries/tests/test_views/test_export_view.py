@@ -0,0 +1,51 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from blog_auth.models import User
+from blog_entries.models import Article
+
+class TestExportView(TestCase):
+
+    def setUp(self):
+        self.user = self._create_user()
+        self.article = Article.objects.create_article(
+            author=self.user,
+            title='Test is very good.',
+            entry=50 * 'Test.',
+            for_adult=True
+        )
+        self.url = reverse('blog_entries:export')
+
+    def _create_user(self):
+        return User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+            is_active=True
+        )
+
+    def test_only_staff(self):
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_streamed_ndjson(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, {'model': 'article'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(rows[0]['title'], self.article.title)
+        self.assertTrue(rows[0]['for_adult'])
+
+    def test_bad_request(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'format': 'csv'}).status_code, 400)
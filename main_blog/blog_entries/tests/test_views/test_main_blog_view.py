@@ -0,0 +1,101 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog_auth.models import User
+from blog_entries.models import Article, Comment
+from blog_entries.views import MainBlogView
+
+class ArticleWithCommentsTestCase(TestCase):
+
+    def setUp(self):
+        self.author = self._create_user(username='tester', nick='testowy', email='tester@gmail.com')
+        self.commenter = self._create_user(username='commenter', nick='commenter', email='commenter@gmail.com')
+        self.article = Article.objects.create_article(
+            author=self.author,
+            title='Test is very good.',
+            entry=50 * 'Test.'
+        )
+        self.url = reverse('blog_entries:article_details', args=[self.article.pk])
+
+    def _create_user(self, username, nick, email):
+        return User.objects.create_user(
+            username=username,
+            email=email,
+            password='tester123',
+            nick=nick,
+            is_active=True
+        )
+
+    def _create_comments(self, number):
+        for index in range(number):
+            owner = self.author if index % 2 else self.commenter
+            Comment.objects.create_comment(
+                owner=owner,
+                article=self.article,
+                content_comment=f'Test comment number {index}'
+            )
+
+
+class TestMainBlogViewQueries(ArticleWithCommentsTestCase):
+
+    def _count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def _assert_constant_queries(self):
+        self._create_comments(1)
+        queries_for_one = self._count_queries()
+        self._create_comments(20)
+        self.assertEqual(self._count_queries(), queries_for_one)
+
+    def test_anonymous_constant_queries(self):
+        self._assert_constant_queries()
+
+    def test_commenter_constant_queries(self):
+        self.client.force_login(self.commenter)
+        self._assert_constant_queries()
+
+    def test_owner_constant_queries(self):
+        self.client.force_login(self.author)
+        self._assert_constant_queries()
+
+
+class TestArticleCommentsView(ArticleWithCommentsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.comments_url = reverse('blog_entries:article_comments', args=[self.article.pk])
+        self.page_size = MainBlogView.comments_per_page
+        self._create_comments(self.page_size + 5)
+
+    def test_article_page_shows_first_page_of_comments(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['comments']), self.page_size)
+        self.assertTrue(response.context['comments_page'].has_next())
+
+    def test_load_more_returns_remaining_comments(self):
+        response = self.client.get(self.url)
+        next_cursor = response.context['comments_page'].next_cursor
+        response = self.client.get(self.comments_url, {'cursor': next_cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['comments']), 5)
+        self.assertFalse(response.context['comments_page'].has_next())
+        self.assertNotContains(response, '<html>')
+
+    def test_controls_only_for_comment_owner(self):
+        self.client.force_login(self.commenter)
+        response = self.client.get(self.url)
+        for operation in response.context['comments']:
+            is_owner = operation.comment.owner_id == self.commenter.pk
+            self.assertEqual(operation.edit_comment, is_owner)
+            self.assertEqual(operation.delete_comment, is_owner)
+        self.assertContains(response, "name='change_comment_pk'")
+
+    def test_article_owner_can_delete_every_comment(self):
+        self.client.force_login(self.author)
+        response = self.client.get(self.url)
+        self.assertTrue(all(operation.delete_comment for operation in response.context['comments']))
@@ -0,0 +1,120 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from blog_auth.models import User
+from blog_entries.cache import cache_anonymous_page
+from blog_entries.forms import ChangeCommentForm, DeleteArticleForm, DeleteCommentForm
+from blog_entries.models import Article, Comment
+
+class TestAnonymousPageCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = self._create_user()
+        self.article = Article.objects.create_article(
+            author=self.user,
+            title='Test is very good.',
+            entry=50 * 'Test.'
+        )
+        self.comment = Comment.objects.create_comment(
+            owner=self.user,
+            article=self.article,
+            content_comment='First test comment'
+        )
+        self.url = reverse('blog_entries:article_details', args=[self.article.pk])
+        self.list_url = reverse('blog_entries:all_entries')
+
+    def _create_user(self):
+        return User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+            is_active=True
+        )
+
+    def test_cache_hit_without_queries(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(first.content, second.content)
+
+    def test_cache_hit_keeps_headers(self):
+        @cache_anonymous_page(key_func=lambda request: 'test_page')
+        def view(request):
+            response = HttpResponse('{}', content_type='application/json')
+            response['Vary'] = 'Accept-Language'
+            return response
+
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        view(request)
+        response = view(request)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response['Vary'], 'Accept-Language')
+        self.assertEqual(response.content, b'{}')
+
+    def test_list_cache_hit_without_queries(self):
+        self.client.get(self.list_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url)
+        self.assertContains(response, self.article.title)
+
+    def test_authenticated_user_is_not_cached(self):
+        self.client.get(self.url)
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertContains(response, "name='change_comment_pk'")
+
+    def test_new_comment_invalidates_page(self):
+        self.client.get(self.url)
+        Comment.objects.create_comment(
+            owner=self.user,
+            article=self.article,
+            content_comment='Second test comment'
+        )
+        self.assertContains(self.client.get(self.url), 'Second test comment')
+
+    def test_change_comment_form_invalidates_page(self):
+        self.client.get(self.url)
+        form = ChangeCommentForm(
+            data={'content_comment': 'Changed test comment', 'change_comment_pk': self.comment.pk},
+            instance=self.comment
+        )
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.assertContains(self.client.get(self.url), 'Changed test comment')
+
+    def test_delete_comment_form_invalidates_page(self):
+        self.client.get(self.url)
+        form = DeleteCommentForm(data={'delete_comment_pk': self.comment.pk})
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.assertNotContains(self.client.get(self.url), self.comment.content_comment)
+
+    def test_delete_article_form_invalidates_pages(self):
+        self.client.get(self.url)
+        self.client.get(self.list_url)
+        form = DeleteArticleForm(data={'delete_article_pk': self.article.pk})
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertNotContains(self.client.get(self.list_url), self.article.title)
+
+    def test_other_article_stays_cached(self):
+        other = Article.objects.create_article(
+            author=self.user,
+            title='Other test article',
+            entry=50 * 'Test.'
+        )
+        self.client.get(self.url)
+        Comment.objects.create_comment(
+            owner=self.user,
+            article=other,
+            content_comment='Comment for other article'
+        )
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
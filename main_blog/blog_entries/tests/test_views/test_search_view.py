@@ -0,0 +1,132 @@
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from blog_auth.models import BlogProfile, User
+from blog_entries.models import Article, Comment
+from blog_entries.search import PythonSearchBackend, SQLiteSearchBackend, SearchResults, get_search_backend
+
+class TestSearchView(TestCase):
+
+    def setUp(self):
+        self.user = self._create_user()
+        self.url = reverse('blog_entries:search')
+        self.in_title = self._create_article(title='Python is great language', entry=50 * 'Snakes. ')
+        self.in_entry = self._create_article(title='About my garden', entry='Python in garden. ' + 20 * 'Flowers in garden. ')
+        self.adult = self._create_article(title='Python for adults', entry=50 * 'Adult. ', for_adult=True)
+
+    def _create_user(self):
+        profile = BlogProfile.objects.create_profile(
+            first_name='Test',
+            last_name='Tester',
+            sex='M',
+            country='PL',
+            date_birth=date(year=1996, month=3, day=12)
+        )
+        return User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+            user_profile=profile,
+            is_active=True
+        )
+
+    def _create_article(self, title, entry, for_adult=False):
+        return Article.objects.create_article(
+            author=self.user,
+            title=title,
+            entry=entry,
+            for_adult=for_adult
+        )
+
+    def _search(self, query):
+        response = self.client.get(self.url, {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return list(response.context['article_list'])
+
+    def test_database_backend_is_used(self):
+        self.assertIsInstance(get_search_backend(), SQLiteSearchBackend)
+
+    def test_title_match_ranks_first(self):
+        self.assertEqual(self._search('python'), [self.in_title, self.in_entry])
+
+    def test_adult_articles_only_for_adults(self):
+        self.assertNotIn(self.adult, self._search('python'))
+        self.client.force_login(self.user)
+        self.assertIn(self.adult, self._search('python'))
+
+    def test_comment_match_finds_article(self):
+        Comment.objects.create_comment(
+            owner=self.user,
+            article=self.in_entry,
+            content_comment='Nice tomatoes in this garden'
+        )
+        self.assertEqual(self._search('tomatoes'), [self.in_entry])
+
+    def test_index_follows_changes(self):
+        self.in_entry.title = 'About my tomatoes'
+        self.in_entry.save()
+        self.assertEqual(self._search('tomatoes'), [self.in_entry])
+        self.in_entry.delete()
+        self.assertEqual(self._search('tomatoes'), [])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self._search('python garden'), [self.in_entry])
+
+    def test_empty_query(self):
+        self.assertEqual(self._search('  '), [])
+
+    def test_python_backend_gives_same_results(self):
+        backend = PythonSearchBackend()
+        backend.maintain()
+        for query in ['python', 'python garden', 'snakes']:
+            self.assertEqual(
+                list(SearchResults(query, include_adult=False, backend=backend)[0:10]),
+                list(SearchResults(query, include_adult=False)[0:10])
+            )
+
+    def test_python_backend_search_makes_no_queries(self):
+        backend = PythonSearchBackend()
+        with self.assertNumQueries(0):
+            self.assertEqual(backend.count(['python'], include_adult=False), 0)
+        backend.maintain()
+        with self.assertNumQueries(0):
+            self.assertEqual(backend.count(['python'], include_adult=False), 2)
+
+    def test_python_backend_stamps_saved_version(self):
+        backend = PythonSearchBackend()
+        backend.maintain()
+        with mock.patch('blog_entries.search._backend', backend):
+            # UPDATE and reading the version back, the index adds no query.
+            with self.assertNumQueries(2):
+                self.in_title.save()
+        self.in_title.refresh_from_db()
+        self.assertEqual(backend._engine.stamps()[-self.in_title.pk], self.in_title.version)
+
+    def test_persisted_python_index_is_reconciled(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        backend = PythonSearchBackend(path=path)
+        backend.maintain()
+        self.assertEqual(backend.count(['python'], include_adult=False), 2)
+        backend._engine.close()
+        # Changes the closed index didn't see, like after a crash.
+        Article.objects.filter(pk=self.in_title.pk).update(title='About tomatoes', version=50)
+        self.in_entry.delete()
+        comment = Comment.objects.create_comment(
+            owner=self.user,
+            article=self.adult,
+            content_comment='Nice tomatoes'
+        )
+        backend = PythonSearchBackend(path=path)
+        self.addCleanup(backend._engine.close)
+        backend.maintain()
+        self.assertEqual(backend.hits(['tomatoes'], include_adult=True, limit=10, offset=0)[0][0], self.in_title.pk)
+        self.assertEqual(backend.count(['tomatoes'], include_adult=True), 2)
+        self.assertEqual(backend.count(['garden'], include_adult=True), 0)
+        self.assertEqual(backend._engine.stamps()[comment.pk], comment.version)
@@ -0,0 +1,125 @@
+from threading import Event
+from unittest import mock
+
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from blog_auth.models import User
+from blog_entries.models import Article, Vote
+from blog_entries.votes import VoteBuffer
+
+class VoteTestMixin:
+
+    def setUp(self):
+        self.user = self._create_user()
+        self.article = Article.objects.create_article(
+            author=self.user,
+            title='Test is very good.',
+            entry=50 * 'Test.'
+        )
+        self.url = reverse('blog_entries:vote_article', args=[self.article.pk])
+        self.client.force_login(self.user)
+
+    def _create_user(self):
+        return User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+            is_active=True
+        )
+
+    def _counters(self):
+        self.article.refresh_from_db()
+        return self.article.like, self.article.dislike
+
+
+class TestVoteArticleView(VoteTestMixin, TestCase):
+
+    def test_like(self):
+        response = self.client.post(self.url, {'vote': Vote.LIKE})
+        self.assertRedirects(response, reverse('blog_entries:article_details', args=[self.article.pk]))
+        self.assertEqual(self._counters(), (1, 0))
+
+    def test_vote_twice_counts_once(self):
+        self.client.post(self.url, {'vote': Vote.LIKE})
+        self.client.post(self.url, {'vote': Vote.LIKE})
+        self.assertEqual(self._counters(), (1, 0))
+        self.assertEqual(Vote.objects.count(), 1)
+
+    def test_change_vote(self):
+        self.client.post(self.url, {'vote': Vote.LIKE})
+        self.client.post(self.url, {'vote': Vote.DISLIKE})
+        self.assertEqual(self._counters(), (0, 1))
+
+    def test_invalid_vote(self):
+        response = self.client.post(self.url, {'vote': 5})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._counters(), (0, 0))
+
+    def test_anonymous_can_not_vote(self):
+        self.client.logout()
+        self.client.post(self.url, {'vote': Vote.LIKE})
+        self.assertEqual(self._counters(), (0, 0))
+
+    def test_counters_past_small_integer_limit(self):
+        Article.objects.filter(pk=self.article.pk).update(like=32767)
+        self.client.post(self.url, {'vote': Vote.LIKE})
+        self.assertEqual(self._counters(), (32768, 0))
+
+    def test_adult_article_hidden_from_minor(self):
+        Article.objects.filter(pk=self.article.pk).update(for_adult=True)
+        response = self.client.post(self.url, {'vote': Vote.LIKE})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Vote.objects.count(), 0)
+
+
+class TestBufferedVotes(VoteTestMixin, TransactionTestCase):
+    """
+    Buffered votes are added on commit, so these tests commit for real.
+    """
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(Article.objects, 'vote_buffer', VoteBuffer(interval=3600))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_buffered_votes_are_written_on_flush(self):
+        self.client.post(self.url, {'vote': Vote.LIKE})
+        self.assertEqual(self._counters(), (0, 0))
+        Article.objects.flush_votes()
+        self.assertEqual(self._counters(), (1, 0))
+
+    def test_rolled_back_vote_is_not_buffered(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Vote.objects.vote(user=self.user, article=self.article, value=Vote.LIKE)
+                raise RuntimeError
+        Article.objects.flush_votes()
+        self.assertEqual(self._counters(), (0, 0))
+        self.assertEqual(Vote.objects.count(), 0)
+
+
+class TestVoteBuffer(SimpleTestCase):
+
+    def test_scheduled_flush_runs_once(self):
+        buffer = VoteBuffer(interval=0.2)
+        flushed = Event()
+        calls = []
+
+        def flush():
+            calls.append(buffer.drain())
+            flushed.set()
+
+        buffer.add(1, like=1)
+        buffer.schedule(flush)
+        buffer.add(1, dislike=1)
+        buffer.schedule(flush)
+        self.assertTrue(flushed.wait(timeout=5))
+        self.assertEqual(calls, [{1: (1, 1)}])
+        flushed.clear()
+        buffer.schedule(flush)
+        self.assertTrue(flushed.wait(timeout=5))
+        self.assertEqual(calls, [{1: (1, 1)}, {}])
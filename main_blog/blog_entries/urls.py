@@ -1,11 +1,19 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 app_name = 'blog_entries'
 urlpatterns = [
     path(route='entries/', view=views.AllArticleView.as_view(), name='all_entries'),
+    path(route='search/', view=views.SearchView.as_view(), name='search'),
     path(route='create_article/', view=views.CreateArticleView.as_view(), name='creata_article'),
     path(route='entries/<int:pk>', view=views.MainBlogView.as_view(), name='article_details'),
-    path(route='change_article/<int:pk>', view=views.ChangeBlogEntryView.as_view(), name="change_article")
+    path(route='entries/<int:pk>/comments/', view=views.ArticleCommentsView.as_view(), name='article_comments'),
+    path(route='entries/<int:pk>/vote/', view=views.VoteArticleView.as_view(), name='vote_article'),
+    path(route='change_article/<int:pk>', view=views.ChangeBlogEntryView.as_view(), name="change_article"),
+    path(route='export/', view=views.ExportView.as_view(), name='export'),
+    path(route='api/articles/', view=api.ArticleListAPIView.as_view(), name='api_articles'),
+    path(route='api/articles/<int:pk>/', view=api.ArticleAPIView.as_view(), name='api_article'),
+    path(route='api/articles/<int:pk>/comments/', view=api.ArticleCommentListAPIView.as_view(), name='api_article_comments'),
+    path(route='api/comments/<int:pk>/', view=api.CommentAPIView.as_view(), name='api_comment')
 ]
@@ -1,41 +1,161 @@
 from collections import namedtuple
 
+from django.conf import settings
 from django.urls import reverse_lazy, reverse
 from django.shortcuts import redirect
 from django.utils.decorators import method_decorator
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.views.generic import ListView
+from django.views.generic import ListView, View
 from django.views.generic.base import TemplateView, TemplateResponseMixin
 from django.views.generic.detail import BaseDetailView, SingleObjectMixin
-from django.views.generic.edit import FormMixin
-from django.http import Http404
+from django.views.generic.edit import FormMixin, FormView
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.utils.translation import gettext_lazy as _
 
 from blog_auth.views import MyFormView
-from .forms import CreateArticleForm, CreateCommentForm, ChangeArtilceEntryForm, DeleteArticleForm, DeleteCommentForm, ChangeCommentForm
-from .models import Article, Comment
+from .forms import CreateArticleForm, CreateCommentForm, ChangeArtilceEntryForm, DeleteArticleForm, DeleteCommentForm, ChangeCommentForm, VoteForm
+from .cache import article_page_key, cache_anonymous_page, list_page_key
+from .export import CONTENT_TYPES, EXPORTED_MODELS, FORMATS, NDJSON, export_lines
+from .models import Article, Comment, Vote
+from .pagination import InvalidCursor, KeysetPaginator
+from .search import SearchResults
 
 operation_on_comments = namedtuple(
     typename='operation_on_comments',
-    field_names='delete_comment edit_comment comment delete_form edit_form'
+    field_names='delete_comment edit_comment comment'
 )
 
 
+@method_decorator(
+    decorator=cache_anonymous_page(key_func=list_page_key),
+    name='dispatch'
+    )
 class AllArticleView(ListView):
     model = Article
     template_name = 'articles/show_article.html'
-    
+    paginate_by = getattr(settings, 'ARTICLES_PER_PAGE', 20)
+    paginator_class = KeysetPaginator
+    cursor_kwarg = 'cursor'
+    sort_kwarg = 'sort'
+    default_sort = 'date'
+
+    def get_sort(self):
+        sort = self.request.GET.get(self.sort_kwarg) or self.default_sort
+        if sort not in Article.SORT_KEYS:
+            raise Http404(_('Unknown sort.'))
+        return sort
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return self.paginator_class(queryset, per_page, **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginate by (pub_date, id) cursor, or (last_comment_at, id) for
+        ?sort=activity, instead of page number, so deep pages don't pay
+        for an OFFSET scan.
+        """
+        paginator = self.get_paginator(queryset, page_size, key_fields=Article.SORT_KEYS[self.get_sort()])
+        cursor = self.kwargs.get(self.cursor_kwarg) or self.request.GET.get(self.cursor_kwarg)
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
     def get_queryset(self):
         if self.request.user.is_authenticated:
             if not self.request.user.check_is_adult():
-                return Article.objects.all().filter(for_adult=False)
-            return Article.objects.all()
-        return Article.objects.all().filter(for_adult=False)
+                return Article.objects.summary().filter(for_adult=False)
+            return Article.objects.summary()
+        return Article.objects.summary().filter(for_adult=False)
+
+    def get_context_data(self, **kwargs):
+        kwargs.update({
+                'sort': self.get_sort()
+            }
+        )
+        return super().get_context_data(**kwargs)
 
 
-class MainBlogView(SingleObjectMixin, TemplateView):
-    model = Article
+class SearchView(ListView):
+    template_name = 'articles/search.html'
+    context_object_name = 'article_list'
+    paginate_by = getattr(settings, 'SEARCH_RESULTS_PER_PAGE', 20)
+    query_kwarg = 'q'
+
+    def get_query(self):
+        return self.request.GET.get(self.query_kwarg, '').strip()
+
+    def get_queryset(self):
+        user = self.request.user
+        return SearchResults(
+            query=self.get_query(),
+            include_adult=user.is_authenticated and user.check_is_adult()
+        )
+
+    def get_context_data(self, **kwargs):
+        kwargs.update({
+                'query': self.get_query()
+            }
+        )
+        return super().get_context_data(**kwargs)
+
+
+class CommentsPageMixin:
+    """
+    Comments of self.object paginated by (pub_date, id) cursor.
+    Edit and delete controls are rendered by the articles/comment.html
+    template, so no form instances are built per comment.
+    """
     model_comment = Comment
+    comments_per_page = getattr(settings, 'COMMENTS_PER_PAGE', 20)
+    comments_paginator_class = KeysetPaginator
+    cursor_kwarg = 'cursor'
+
+    def get_all_comments_for_entry(self, article_pk):
+        return self.model_comment.objects.filter(article=article_pk).select_related('owner')
+
+    def get_comments_page(self, article_pk):
+        paginator = self.comments_paginator_class(
+            self.get_all_comments_for_entry(article_pk),
+            self.comments_per_page
+        )
+        try:
+            return paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+
+    def get_user_comments(self, all_comments, user, owner_article=False):
+        comments = []
+        for comment in all_comments:
+            is_owner = comment.check_the_owner(user)
+            comments.append(operation_on_comments(
+                    delete_comment=is_owner or owner_article,
+                    edit_comment=is_owner,
+                    comment=comment
+                )
+            )
+        return comments
+
+    def get_comments_context(self):
+        page = self.get_comments_page(self.object.id)
+        return {
+            'comments': self.get_user_comments(
+                all_comments=page,
+                user=self.request.user,
+                owner_article=self.object.check_the_owner(author=self.request.user)
+            ),
+            'comments_page': page
+        }
+
+
+@method_decorator(
+    decorator=cache_anonymous_page(key_func=article_page_key),
+    name='dispatch'
+    )
+class MainBlogView(CommentsPageMixin, SingleObjectMixin, TemplateView):
+    model = Article
     create_comment_form_class = CreateCommentForm
     delete_article_form_class = DeleteArticleForm
     delete_comment_form_class = DeleteCommentForm
@@ -77,61 +197,24 @@ class MainBlogView(SingleObjectMixin, TemplateView):
             })
         return kwargs
 
-    def get_user_comments(self, all_comments, user, owner_article=False):
-        comments = []
-        for comment in all_comments:
-            if comment.check_the_owner(user):
-                comments.append(operation_on_comments(
-                        delete_comment=True,
-                        edit_comment=True,
-                        comment=comment,
-                        edit_form=self.change_comment_form_class(comment=comment),
-                        delete_form=self.delete_comment_form_class(comment=comment)
-                    )
-                )
-            else:
-                delete = False
-                delete_form = None
-                if owner_article:
-                    delete = True
-                    delete_form = self.delete_comment_form_class(comment=comment)
-                comments.append(operation_on_comments(
-                        delete_comment=delete,
-                        edit_comment=False,
-                        comment=comment,
-                        delete_form=delete_form,
-                        edit_form=None
-                    )        
-                )
-        return comments
-
     def get_context_data(self, **kwargs):
-        all_comments = self.get_all_comments_for_entry(self.object.id)
-        print('comments', all_comments)
+        kwargs.update(self.get_comments_context())
         if self.request.user.is_authenticated:
             kwargs.update({
                 'add_comment': True,
                 'create_comment_form': self.get_create_comment_form(),
-                'comments': self.get_user_comments(all_comments=all_comments, user=self.request.user)
+                'like': Vote.LIKE,
+                'dislike': Vote.DISLIKE
                 }
             )
-        else:
-            kwargs.update({
-                    'comments': all_comments
-                }  
-            )
         if self.object.check_the_owner(author=self.request.user):
             kwargs.update({
                     'owner': True,
-                    'delete_article_form': self.get_delete_article_form(),
-                    'comments': self.get_user_comments(all_comments=all_comments, user=self.request.user, owner_article=True)
+                    'delete_article_form': self.get_delete_article_form()
                 }
             )
         return super().get_context_data(**kwargs)
 
-    def get_all_comments_for_entry(self, article_pk):
-        return self.model_comment.objects.all().filter(article=article_pk)
-
     def post(self, request, *args, **kwargs):
         form = self.get_create_comment_form()
         return self.form_valid(form=form) if form.is_valid() else self.form_invalid(form=form)
@@ -164,6 +247,29 @@ class MainBlogView(SingleObjectMixin, TemplateView):
         return redirect(to=reverse('blog_entries:all_entries'))
 
 
+@method_decorator(
+    decorator=cache_anonymous_page(key_func=article_page_key),
+    name='dispatch'
+    )
+class ArticleCommentsView(CommentsPageMixin, SingleObjectMixin, TemplateView):
+    """
+    Next page of article comments as an HTML fragment, for "load more".
+    """
+    model = Article
+    template_name = 'articles/comments.html'
+    http_method_names = ['get']
+
+    def dispatch(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        if not request.user.is_authenticated and self.object.for_adult:
+            raise Http404(_('Not found page. You must log in or there is no such entry'))
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        kwargs.update(self.get_comments_context())
+        return super().get_context_data(**kwargs)
+
+
 @method_decorator(
     decorator=login_required(login_url=reverse_lazy('blog_auth:login')),
     name='dispatch'
@@ -194,11 +300,9 @@ class ChangeBlogEntryView(BaseDetailView, TemplateResponseMixin, FormMixin):
 
     def form_valid(self, form):
         form.save()
-        print('zapisujeeee')
         return redirect(to=reverse('blog_entries:article_details', args=[self.object.pk]))
 
     def form_invalid(self, form):
-        print('print')
         return self.render_to_response(context=self.get_context_data())
 
     def get_context_data(self, **kwargs):
@@ -218,3 +322,57 @@ class CreateArticleView(MyFormView):
         if form_class is None:
             form_class = self.get_form_class()
         return form_class(user=self.request.user, **self.get_form_kwargs()) # add user
+
+
+@method_decorator(
+    decorator=login_required(login_url=reverse_lazy('blog_auth:login')),
+    name='dispatch'
+    )
+class VoteArticleView(SingleObjectMixin, FormView):
+    model = Article
+    form_class = VoteForm
+    http_method_names = ['post']
+
+    def get_queryset(self):
+        return Article.objects.visible_to(self.request.user)
+
+    def dispatch(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form(self, form_class=None):
+        if form_class is None:
+            form_class = self.get_form_class()
+        return form_class(user=self.request.user, article=self.object, **self.get_form_kwargs())
+
+    def form_valid(self, form):
+        form.save()
+        return redirect(to=reverse('blog_entries:article_details', args=[self.object.pk]))
+
+    def form_invalid(self, form):
+        return HttpResponseBadRequest(form.errors.as_text())
+
+
+@method_decorator(
+    decorator=staff_member_required(login_url=reverse_lazy('blog_auth:login')),
+    name='dispatch'
+    )
+class ExportView(View):
+    """
+    All articles and comments for staff, ?format=ndjson|csv&model=article|comment.
+    Rows are streamed as they are read, the response is never built in memory.
+    """
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', NDJSON)
+        models = request.GET.getlist('model') or list(EXPORTED_MODELS)
+        if export_format not in FORMATS or not set(models) <= set(EXPORTED_MODELS):
+            return HttpResponseBadRequest(_('Unknown format or model.'))
+        try:
+            lines = export_lines(export_format, models)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = 'attachment; filename="blog-%s.%s"' % ('-'.join(models), export_format)
+        return response
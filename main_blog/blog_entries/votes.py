@@ -0,0 +1,58 @@
+from threading import Lock, Timer
+from time import monotonic
+
+
+class VoteBuffer:
+    """
+    In-process buffer of like/dislike increments. Votes of a hot article
+    are summed in memory and written with one UPDATE per flush, instead of
+    every voter waiting for the lock on the same row. A flush is due
+    interval seconds after the previous one; schedule() runs it from
+    a timer thread when no later vote comes. interval=0 disables the buffer.
+    """
+
+    def __init__(self, interval=0):
+        self.interval = interval
+        self._lock = Lock()
+        self._deltas = {}
+        self._last_flush = monotonic()
+        self._timer = None
+
+    @property
+    def enabled(self):
+        return self.interval > 0
+
+    def add(self, article_pk, like=0, dislike=0):
+        """
+        Add increments. Return True when the buffer should be flushed.
+        """
+        with self._lock:
+            current_like, current_dislike = self._deltas.get(article_pk, (0, 0))
+            self._deltas[article_pk] = (current_like + like, current_dislike + dislike)
+            return monotonic() - self._last_flush >= self.interval
+
+    def schedule(self, flush):
+        """
+        Call flush in a daemon thread interval seconds from now, unless
+        a call is already scheduled.
+        """
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = Timer(self.interval, self._run_scheduled, args=(flush,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run_scheduled(self, flush):
+        with self._lock:
+            self._timer = None
+        flush()
+
+    def drain(self):
+        """
+        Return buffered increments as {article_pk: (like, dislike)} and empty the buffer.
+        """
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+            self._last_flush = monotonic()
+        return deltas
@@ -0,0 +1,23 @@
+"""
+ASGI config for main_blog project.
+
+It exposes the ASGI callable as a module-level variable named ``application``,
+run it with any ASGI server, e.g. ``uvicorn main_blog.asgi:application``.
+The WSGI application runs in a pool of ASGI_THREADS threads, request
+bodies over ASGI_MAX_BODY_SIZE bytes are refused, see main_blog.asgi_adapter.
+"""
+
+import os
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from main_blog.asgi_adapter import WSGIToASGI
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main_blog.settings')
+
+application = WSGIToASGI(
+    get_wsgi_application(),
+    max_workers=getattr(settings, 'ASGI_THREADS', None),
+    max_body_size=getattr(settings, 'ASGI_MAX_BODY_SIZE', WSGIToASGI.MAX_BODY_SIZE)
+)
@@ -0,0 +1,157 @@
+"""
+ASGI adapter of WSGI applications.
+
+Django 2.2 has neither an ASGI handler nor async views, so the WSGI
+application is adapted: the event loop keeps the connections and reads
+request bodies, views run in a pool of threads. A thread is taken only
+when the whole request has arrived, so slow clients don't hold workers
+and one process keeps many connections open. Bodies are kept in memory,
+a request with a body over max_body_size bytes is answered with 413.
+"""
+
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+
+class RequestBodyTooLarge(Exception):
+    pass
+
+
+class WSGIToASGI:
+    """
+    ASGI 3 application running a WSGI application in threads.
+    """
+    MAX_BODY_SIZE = 10 * 1024 * 1024
+
+    def __init__(self, wsgi_application, max_workers=None, max_body_size=MAX_BODY_SIZE):
+        self.wsgi_application = wsgi_application
+        self.max_body_size = max_body_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported scope type {scope['type']!r}.")
+        try:
+            body = await self.read_body(receive)
+        except RequestBodyTooLarge:
+            return await self.send_too_large(send)
+        if body is None:
+            # The client disconnected before sending the whole request.
+            return
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(
+            self.executor, self.run_wsgi, loop, self.build_environ(scope, body), send
+        )
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        """
+        Return the whole body, None if the client disconnected. Reading
+        stops as soon as the body grows over max_body_size.
+        """
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if self.max_body_size is not None and size > self.max_body_size:
+                raise RequestBodyTooLarge
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    @staticmethod
+    async def send_too_large(send):
+        body = b'Request body is too large.'
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [
+                (b'content-type', b'text/plain'),
+                (b'content-length', str(len(body)).encode()),
+                (b'connection', b'close')
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+
+    @staticmethod
+    def build_environ(scope, body):
+        server_name, server_port = scope.get('server') or ('localhost', 80)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            # PEP 3333: native strings holding the bytes as latin-1.
+            'PATH_INFO': scope['path'].encode().decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server_name,
+            'SERVER_PORT': str(server_port),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        if scope.get('client'):
+            environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+        for name, value in scope.get('headers', []):
+            name, value = name.decode('latin-1').upper().replace('-', '_'), value.decode('latin-1')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = f'HTTP_{name}'
+            if name in environ:
+                # RFC 7540 8.1.2.5: cookie headers are joined with '; ', the others with ','.
+                value = f"{environ[name]}{'; ' if name == 'HTTP_COOKIE' else ','}{value}"
+            environ[name] = value
+        return environ
+
+    def run_wsgi(self, loop, environ, send):
+        """
+        Call the WSGI application in a thread of the executor, messages are
+        sent by the event loop.
+        """
+        def send_message(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response_start = {}
+
+        def start_response(status, headers, exc_info=None):
+            response_start.update({
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+            })
+
+        result = self.wsgi_application(environ, start_response)
+        try:
+            started = False
+            for chunk in result:
+                if not started:
+                    send_message(response_start)
+                    started = True
+                if chunk:
+                    send_message({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not started:
+                send_message(response_start)
+            send_message({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            # Closing the response sends request_finished, which closes old database connections.
+            if hasattr(result, 'close'):
+                result.close()
@@ -0,0 +1,165 @@
+"""
+Read replica routing.
+
+Add 'main_blog.db_routers.ReplicaRouter' to DATABASE_ROUTERS, the aliases
+of the replicas to DATABASE_REPLICAS and
+'main_blog.db_routers.ReplicaMiddleware' to MIDDLEWARE (after the session
+middleware). Reads of REPLICATED_MODELS go to the replicas, round robin;
+a replica failing its health check is skipped for
+REPLICA_CHECK_INTERVAL seconds. Writes go to DATABASE_PRIMARY, and so do
+all reads after a write: for the rest of the request and, by a cookie, in
+requests of the same client for READ_AFTER_WRITE_SECONDS, so nobody reads
+data older than their own change. Data stored in shared caches is read
+inside read_primary(), so a lagging replica never fills a cache entry of
+a newer version. Replicas are copied by the database, migrations run on
+the primary only.
+"""
+import logging
+from contextlib import contextmanager
+from itertools import count
+from threading import local
+from time import monotonic
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICATED_MODELS = ['blog_entries.article', 'blog_entries.comment', 'blog_auth.blogprofile']
+PRIMARY_COOKIE = 'read_primary'
+
+_state = local()
+
+
+def pin_primary():
+    """
+    Send reads of this thread to the primary, called on every write.
+    """
+    _state.pinned = True
+    _state.wrote = True
+
+
+def unpin_primary(pinned=False):
+    """
+    Start a new unit of work (a request), pinned to the primary or not.
+    Return whether the previous one wrote.
+    """
+    wrote = getattr(_state, 'wrote', False)
+    _state.pinned = pinned
+    _state.wrote = False
+    return wrote
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+@contextmanager
+def read_primary():
+    """
+    Send reads of this thread to the primary inside the block.
+    """
+    pinned = is_pinned()
+    _state.pinned = True
+    try:
+        yield
+    finally:
+        # A write in the block keeps the rest of the unit of work pinned.
+        if not getattr(_state, 'wrote', False):
+            _state.pinned = pinned
+
+
+class ReplicaPool:
+    """
+    Round robin over the healthy replicas. Health is checked with a query,
+    at most once per check_interval seconds for every alias.
+    """
+
+    def __init__(self, aliases, check_interval):
+        self.aliases = list(aliases)
+        self.check_interval = check_interval
+        self._counter = count()
+        self._checked = {}
+
+    def check(self, alias):
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError as e:
+            logger.warning('Replica %s is unavailable: %s', alias, e)
+            return False
+        return True
+
+    def is_healthy(self, alias):
+        checked_at, healthy = self._checked.get(alias, (None, False))
+        current_time = monotonic()
+        if checked_at is None or current_time - checked_at >= self.check_interval:
+            healthy = self.check(alias)
+            self._checked[alias] = (current_time, healthy)
+        return healthy
+
+    def choose(self):
+        """
+        Return alias of the next healthy replica, None if there is none.
+        """
+        if not self.aliases:
+            return None
+        start = next(self._counter)
+        for offset in range(len(self.aliases)):
+            alias = self.aliases[(start + offset) % len(self.aliases)]
+            if self.is_healthy(alias):
+                return alias
+        return None
+
+
+class ReplicaRouter:
+
+    def __init__(self):
+        self.primary = getattr(settings, 'DATABASE_PRIMARY', DEFAULT_DB_ALIAS)
+        self.models = set(getattr(settings, 'REPLICATED_MODELS', REPLICATED_MODELS))
+        self.replicas = ReplicaPool(
+            getattr(settings, 'DATABASE_REPLICAS', []),
+            getattr(settings, 'REPLICA_CHECK_INTERVAL', 30)
+        )
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower not in self.models:
+            return None
+        # In a transaction of the primary (e.g. select_for_update) reads must see it.
+        if is_pinned() or connections[self.primary].in_atomic_block:
+            return self.primary
+        return self.replicas.choose() or self.primary
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {self.primary, *self.replicas.aliases}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in self.replicas.aliases:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.read_after_write = getattr(settings, 'READ_AFTER_WRITE_SECONDS', 10)
+
+    def __call__(self, request):
+        unpin_primary(pinned=PRIMARY_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = unpin_primary()
+        if wrote:
+            response.set_cookie(
+                PRIMARY_COOKIE, '1', max_age=self.read_after_write, httponly=True, samesite='Lax'
+            )
+        return response
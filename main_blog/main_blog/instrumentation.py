@@ -0,0 +1,189 @@
+"""
+Per-request instrumentation.
+
+Add 'main_blog.instrumentation.InstrumentationMiddleware' to MIDDLEWARE
+(after the session and authentication middlewares). Every request is
+recorded under its view name: latency, number of queries, time spent in
+the database and in rendering templates. Aggregated histograms of this
+process are shown to staff at the instrumentation view. Requests slower
+than INSTRUMENTATION_SLOW_REQUEST_MS are logged with their queries.
+"""
+import logging
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import ExitStack
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+QUERY_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100]
+SLOW_QUERIES_LOGGED = 50
+
+
+class Histogram:
+    """
+    Counts of values per bucket; bucket i holds values <= bounds[i],
+    the last one everything above.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def as_dict(self):
+        labels = [str(bound) for bound in self.bounds] + ['+Inf']
+        return OrderedDict([
+            ('buckets', OrderedDict(zip(labels, self.counts))),
+            ('sum', round(self.total, 3)),
+        ])
+
+
+class ViewStats:
+
+    def __init__(self):
+        self.count = 0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.db_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.template_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+
+    def add(self, record):
+        self.count += 1
+        self.latency_ms.add(record.latency_ms)
+        self.db_ms.add(record.db_ms)
+        self.template_ms.add(record.template_ms)
+        self.queries.add(len(record.queries))
+
+    def as_dict(self):
+        return OrderedDict([
+            ('count', self.count),
+            ('latency_ms', self.latency_ms.as_dict()),
+            ('db_ms', self.db_ms.as_dict()),
+            ('template_ms', self.template_ms.as_dict()),
+            ('queries', self.queries.as_dict()),
+        ])
+
+
+class RequestStats:
+    """Thread safe registry of ViewStats by view name."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._views = {}
+
+    def add(self, record):
+        with self._lock:
+            stats = self._views.get(record.view_name)
+            if stats is None:
+                stats = self._views[record.view_name] = ViewStats()
+            stats.add(record)
+
+    def as_dict(self):
+        with self._lock:
+            return OrderedDict(
+                (view_name, self._views[view_name].as_dict()) for view_name in sorted(self._views)
+            )
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+
+request_stats = RequestStats()
+
+
+class RequestRecord:
+    """
+    Measurements of one request. Used as connection.execute_wrapper,
+    so every query of the request is timed.
+    """
+
+    def __init__(self):
+        self.view_name = None
+        self.latency_ms = 0.0
+        self.template_ms = 0.0
+        self.queries = []
+        self._render_start = None
+
+    @property
+    def db_ms(self):
+        return sum(duration for _, duration in self.queries)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (perf_counter() - start) * 1000))
+
+    def render_started(self):
+        self._render_start = perf_counter()
+
+    def render_finished(self, response):
+        if self._render_start is not None:
+            self.template_ms += (perf_counter() - self._render_start) * 1000
+
+
+class InstrumentationMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_request_ms = getattr(settings, 'INSTRUMENTATION_SLOW_REQUEST_MS', 500)
+
+    def __call__(self, request):
+        record = RequestRecord()
+        request._instrumentation = record
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record))
+            response = self.get_response(request)
+        record.latency_ms = (perf_counter() - start) * 1000
+        match = getattr(request, 'resolver_match', None)
+        record.view_name = match.view_name if match is not None else '<unresolved>'
+        request_stats.add(record)
+        if self.slow_request_ms is not None and record.latency_ms >= self.slow_request_ms:
+            self.log_slow_request(request, response, record)
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Responses are rendered after the last template response hook, the
+        post render callback ends the measurement.
+        """
+        record = request._instrumentation
+        record.render_started()
+        response.add_post_render_callback(record.render_finished)
+        return response
+
+    def log_slow_request(self, request, response, record):
+        queries = '\n'.join(
+            f'  {duration:.2f} ms  {sql}' for sql, duration in record.queries[:SLOW_QUERIES_LOGGED]
+        )
+        logger.warning(
+            'Slow request %s %s (%s): %.1f ms, %d queries in %.1f ms, templates %.1f ms, status %s\n%s',
+            request.method, request.path, record.view_name, record.latency_ms,
+            len(record.queries), record.db_ms, record.template_ms, response.status_code, queries
+        )
+
+
+@staff_member_required
+def instrumentation_view(request):
+    """
+    Histograms of this process as JSON, POST resets them.
+    """
+    if request.method == 'POST':
+        request_stats.reset()
+    return JsonResponse(request_stats.as_dict())
@@ -0,0 +1,86 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from main_blog.asgi_adapter import WSGIToASGI
+
+def wsgi_echo(environ, start_response):
+    start_response('201 Created', [('Content-Type', 'text/plain'), ('X-Path', environ['PATH_INFO'])])
+    return [
+        environ['REQUEST_METHOD'].encode(),
+        b'',
+        environ['wsgi.input'].read(),
+        environ['QUERY_STRING'].encode(),
+        environ.get('HTTP_X_TEST', '').encode(),
+        environ.get('CONTENT_TYPE', '').encode(),
+        environ.get('HTTP_COOKIE', '').encode()
+    ]
+
+class TestWSGIToASGI(SimpleTestCase):
+
+    def setUp(self):
+        self.application = WSGIToASGI(wsgi_echo, max_workers=2)
+        self.addCleanup(self.application.executor.shutdown)
+
+    def call(self, scope, messages):
+        messages = list(messages)
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self.application(scope, receive, send))
+        finally:
+            loop.close()
+        return sent
+
+    def test_http_request(self):
+        sent = self.call({
+            'type': 'http',
+            'method': 'POST',
+            'path': '/zażółć/',
+            'query_string': b'q=1',
+            'headers': [
+                (b'x-test', b'a'), (b'x-test', b'b'), (b'content-type', b'text/plain'),
+                (b'cookie', b'a=1'), (b'cookie', b'b=2')
+            ],
+        }, [
+            {'type': 'http.request', 'body': b'he', 'more_body': True},
+            {'type': 'http.request', 'body': b'llo', 'more_body': False},
+        ])
+        self.assertEqual(sent[0]['type'], 'http.response.start')
+        self.assertEqual(sent[0]['status'], 201)
+        self.assertIn((b'content-type', b'text/plain'), sent[0]['headers'])
+        self.assertIn((b'x-path', '/zażółć/'.encode()), sent[0]['headers'])
+        body = b''.join(message['body'] for message in sent[1:])
+        self.assertEqual(body, b'POSThelloq=1a,btext/plaina=1; b=2')
+        self.assertFalse(sent[-1]['more_body'])
+        self.assertTrue(all(message['more_body'] for message in sent[1:-1]))
+
+    def test_disconnect_before_body(self):
+        sent = self.call(
+            {'type': 'http', 'method': 'POST', 'path': '/', 'headers': []},
+            [{'type': 'http.disconnect'}]
+        )
+        self.assertEqual(sent, [])
+
+    def test_body_too_large(self):
+        self.application.max_body_size = 4
+        sent = self.call({'type': 'http', 'method': 'POST', 'path': '/', 'headers': []}, [
+            {'type': 'http.request', 'body': b'abc', 'more_body': True},
+            {'type': 'http.request', 'body': b'de', 'more_body': True},
+        ])
+        self.assertEqual(sent[0]['status'], 413)
+        self.assertFalse(sent[-1]['more_body'])
+
+    def test_lifespan(self):
+        sent = self.call({'type': 'lifespan'}, [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+        self.assertEqual(
+            [message['type'] for message in sent],
+            ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+        )
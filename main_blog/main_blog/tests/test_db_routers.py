@@ -0,0 +1,166 @@
+import os
+from tempfile import TemporaryDirectory
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from blog_auth.models import User
+from blog_entries.cache import cache_anonymous_page
+from blog_entries.models import Article
+from main_blog.db_routers import (
+    PRIMARY_COOKIE, ReplicaMiddleware, ReplicaPool, is_pinned, read_primary, unpin_primary
+)
+
+REPLICA_SETTINGS = {
+    'DATABASE_ROUTERS': ['main_blog.db_routers.ReplicaRouter'],
+    'DATABASE_REPLICAS': ['broken', 'replica'],
+    'REPLICA_CHECK_INTERVAL': 60,
+}
+
+class TestReplicaRouter(SimpleTestCase):
+    """
+    The replica is a second SQLite database, so rows written to it directly
+    show which database answered. 'broken' is a replica which can't be opened,
+    so the databases are flushed by the test instead of TransactionTestCase.
+    """
+    databases = {'default', 'replica', 'broken'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = TemporaryDirectory()
+        for alias, name in (
+            ('replica', os.path.join(cls.directory.name, 'replica.sqlite3')),
+            ('broken', os.path.join(cls.directory.name, 'not-existing', 'broken.sqlite3'))
+        ):
+            connections.databases[alias] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': name}
+            connections.ensure_defaults(alias)
+            connections.prepare_test_settings(alias)
+        call_command('migrate', database='replica', verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in ('replica', 'broken'):
+            connections[alias].close()
+            del connections[alias]
+            del connections.databases[alias]
+        cls.directory.cleanup()
+
+    def setUp(self):
+        # Cleanups run in reverse order, the flush after the router is removed.
+        for alias in ('default', 'replica'):
+            self.addCleanup(call_command, 'flush', database=alias, interactive=False, verbosity=0)
+        override = override_settings(**REPLICA_SETTINGS)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = self._create_user('default')
+        self.article = self._create_article('default', 'Primary article is good.')
+        self.replica_user = self._create_user('replica')
+        self._create_article('replica', 'Replica article is good.')
+        unpin_primary()
+        with self.assertLogs('main_blog.db_routers', level='WARNING'):
+            # The first read checks the health of the replicas.
+            self.assertEqual(router.db_for_read(Article), 'replica')
+
+    def _create_user(self, using):
+        return User.objects.db_manager(using).create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+        )
+
+    def _create_article(self, using, title):
+        return Article.objects.using(using).create(
+            author_id=User.objects.using(using).get().pk,
+            title=title,
+            entry=50 * 'Test.'
+        )
+
+    def test_reads_go_to_healthy_replica(self):
+        titles = list(Article.objects.values_list('title', flat=True))
+        self.assertEqual(titles, ['Replica article is good.'])
+        self.assertEqual(Article.objects.get().title, 'Replica article is good.')
+        self.assertFalse(is_pinned())
+
+    def test_not_replicated_models_read_primary(self):
+        self.assertEqual(User.objects.get().pk, self.user.pk)
+
+    def test_read_after_write(self):
+        Article.objects.create(author=self.user, title='Second article is good.', entry=50 * 'Test.')
+        self.assertTrue(is_pinned())
+        self.assertEqual(Article.objects.count(), 2)
+        unpin_primary()
+        self.assertEqual(Article.objects.count(), 1)
+
+    def test_reads_in_transaction_go_to_primary(self):
+        with transaction.atomic():
+            self.assertEqual(Article.objects.get().pk, self.article.pk)
+
+    def test_middleware_pins_client_after_write(self):
+        factory = RequestFactory()
+
+        def write(request):
+            self.article.save()
+            return HttpResponse()
+
+        def read(request):
+            return HttpResponse(Article.objects.get().title)
+
+        response = ReplicaMiddleware(write)(factory.post('/'))
+        self.assertEqual(response.cookies[PRIMARY_COOKIE]['max-age'], 10)
+        self.assertFalse(is_pinned())
+        request = factory.get('/')
+        request.COOKIES[PRIMARY_COOKIE] = '1'
+        response = ReplicaMiddleware(read)(request)
+        self.assertEqual(response.content, b'Primary article is good.')
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+        response = ReplicaMiddleware(read)(factory.get('/'))
+        self.assertEqual(response.content, b'Replica article is good.')
+
+    def test_read_primary(self):
+        with read_primary():
+            self.assertEqual(Article.objects.get().pk, self.article.pk)
+        self.assertFalse(is_pinned())
+        with read_primary():
+            Article.objects.create(author=self.user, title='Second article is good.', entry=50 * 'Test.')
+        self.assertTrue(is_pinned())
+
+    def test_page_cache_is_filled_from_primary(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        @cache_anonymous_page(key_func=lambda request: 'test_page')
+        def view(request):
+            return HttpResponse(Article.objects.get().title)
+
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        self.assertEqual(view(request).content, b'Primary article is good.')
+        self.assertEqual(view(request).content, b'Primary article is good.')
+        self.assertFalse(is_pinned())
+
+class TestReplicaPool(SimpleTestCase):
+
+    def test_round_robin_over_healthy(self):
+        health = {'first': True, 'second': True, 'third': False}
+        checks = []
+
+        class Pool(ReplicaPool):
+            def check(self, alias):
+                checks.append(alias)
+                return health[alias]
+
+        pool = Pool(['first', 'second', 'third'], check_interval=60)
+        self.assertEqual([pool.choose() for _ in range(4)], ['first', 'second', 'first', 'first'])
+        self.assertEqual(sorted(checks), ['first', 'second', 'third'])
+        health['third'] = True
+        self.assertEqual(pool.choose(), 'second')
+        pool.check_interval = 0
+        self.assertEqual(pool.choose(), 'third')
+        self.assertIsNone(Pool([], check_interval=60).choose())
@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase, TestCase, modify_settings, override_settings
+from django.urls import reverse
+
+from blog_auth.models import User
+from blog_entries.models import Article
+from main_blog.instrumentation import Histogram, request_stats
+
+@modify_settings(MIDDLEWARE={'append': 'main_blog.instrumentation.InstrumentationMiddleware'})
+class TestInstrumentationMiddleware(TestCase):
+
+    def setUp(self):
+        request_stats.reset()
+        self.user = User.objects.create_user(
+            username='tester',
+            email='przemyslaww.rozyckii@gmail.com',
+            password='tester123',
+            nick='testowy',
+            is_active=True
+        )
+        self.article = Article.objects.create_article(
+            author=self.user,
+            title='Test is very good.',
+            entry=50 * 'Test.'
+        )
+
+    def test_records_view(self):
+        self.client.get(reverse('blog_entries:article_details', args=[self.article.pk]))
+        stats = request_stats.as_dict()['blog_entries:article_details']
+        self.assertEqual(stats['count'], 1)
+        self.assertGreater(stats['queries']['sum'], 0)
+        self.assertGreater(stats['latency_ms']['sum'], 0)
+        self.assertGreater(stats['template_ms']['sum'], 0)
+        self.assertEqual(sum(stats['latency_ms']['buckets'].values()), 1)
+
+    @override_settings(INSTRUMENTATION_SLOW_REQUEST_MS=0)
+    def test_slow_request_is_logged(self):
+        with self.assertLogs('main_blog.instrumentation', level='WARNING') as logs:
+            self.client.get(reverse('blog_entries:all_entries'))
+        self.assertIn('blog_entries:all_entries', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    def test_endpoint_only_for_staff(self):
+        url = reverse('instrumentation')
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.user.is_staff = True
+        self.user.save()
+        self.client.get(reverse('blog_entries:all_entries'))
+        data = self.client.get(url).json()
+        self.assertEqual(data['blog_entries:all_entries']['count'], 1)
+        self.client.post(url)
+        self.assertNotIn('blog_entries:all_entries', request_stats.as_dict())
+
+
+class TestHistogram(SimpleTestCase):
+
+    def test_buckets(self):
+        histogram = Histogram([1, 10])
+        for value in (0.5, 1, 5, 100):
+            histogram.add(value)
+        self.assertEqual(histogram.as_dict()['buckets'], {'1': 2, '10': 1, '+Inf': 1})
+        self.assertEqual(histogram.as_dict()['sum'], 106.5)
@@ -16,7 +16,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from .instrumentation import instrumentation_view
+
 urlpatterns = [
+    path(route='admin/instrumentation/', view=instrumentation_view, name='instrumentation'),
     path('admin/', admin.site.urls),
     path(route='', view=include('blog_auth.urls')),
     path(route='account/', view=include('user_profile.urls')),